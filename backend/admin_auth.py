@@ -0,0 +1,25 @@
+"""
+Admin Authentication
+Token gate for admin-only endpoints, one token per feature
+"""
+
+import hmac
+import os
+
+from flask import jsonify, request
+
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
+
+
+def admin_denied(token_env: str, feature: str):
+    """
+    None if the request's X-Admin-Token matches the token in environment
+    variable `token_env`, else an error response. Without a configured
+    token the feature is off.
+    """
+    token = os.environ.get(token_env)
+    if not token:
+        return jsonify({'error': f'{feature} is disabled (set {token_env})'}), 404
+    if not hmac.compare_digest(request.headers.get(ADMIN_TOKEN_HEADER, ''), token):
+        return jsonify({'error': 'Admin token required'}), 403
+    return None
@@ -6,6 +6,8 @@ import spacy
 from typing import Dict, List, Any
 import io
 
+from tracing import span, traced
+
 class UniversalResumeParser:
     def __init__(self):
         try:
@@ -48,6 +50,7 @@ class UniversalResumeParser:
             ]
         }
 
+    @traced('parser.parse_resume')
     def parse_resume(self, file_content, filename: str) -> Dict[str, Any]:
         """Main method to parse any resume format"""
         try:
@@ -76,6 +79,7 @@ class UniversalResumeParser:
                 'analysis': {}
             }
 
+    @traced('parser.extract_pdf')
     def _extract_text_from_pdf(self, file_content) -> str:
         """Extract text from PDF using multiple methods for better accuracy"""
         text = ""
@@ -101,6 +105,7 @@ class UniversalResumeParser:
 
         return text.strip()
 
+    @traced('parser.extract_docx')
     def _extract_text_from_docx(self, file_content) -> str:
         """Extract text from DOCX files"""
         try:
@@ -109,6 +114,7 @@ class UniversalResumeParser:
         except:
             return ""
 
+    @traced('parser.analyze_text')
     def _analyze_text(self, text: str) -> Dict[str, Any]:
         """Advanced text analysis using NLP"""
         if not text.strip():
@@ -122,7 +128,8 @@ class UniversalResumeParser:
             }
 
         if self.nlp:
-            doc = self.nlp(text)
+            with span('parser.spacy', chars=len(text)):
+                doc = self.nlp(text)
         else:
             doc = None
 
@@ -135,6 +142,7 @@ class UniversalResumeParser:
             'entities': self._extract_entities(doc) if doc else {}
         }
 
+    @traced('parser.skills')
     def _extract_skills_advanced(self, text: str) -> List[str]:
         """Advanced skill extraction using multiple methods"""
         skills_found = set()
@@ -159,6 +167,7 @@ class UniversalResumeParser:
 
         return list(skills_found)
 
+    @traced('parser.experience')
     def _extract_experience(self, text: str) -> Dict[str, Any]:
         """Extract experience information"""
         experience = {
@@ -213,6 +222,7 @@ class UniversalResumeParser:
 
         return list(set(positions))[:5]
 
+    @traced('parser.education')
     def _extract_education(self, text: str) -> List[str]:
         """Extract education information"""
         education = []
@@ -235,6 +245,7 @@ class UniversalResumeParser:
 
         return education[:3]  # Return top 3 education entries
 
+    @traced('parser.personal_info')
     def _extract_personal_info(self, text: str) -> Dict[str, str]:
         """Extract personal information"""
         # Email
@@ -247,6 +258,7 @@ class UniversalResumeParser:
             'phone': phone_match.group() if phone_match else 'Not found'
         }
 
+    @traced('parser.sections')
     def _identify_sections(self, text: str) -> List[str]:
         """Identify resume sections"""
         sections_found = []
@@ -261,6 +273,7 @@ class UniversalResumeParser:
 
         return sections_found
 
+    @traced('parser.entities')
     def _extract_entities(self, doc) -> Dict[str, List[str]]:
         """Extract named entities using spaCy"""
         entities = {
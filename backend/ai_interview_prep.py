@@ -3,12 +3,21 @@ AI-Powered Interview Preparation Assistant
 Generates targeted interview questions and preparation guidance
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+import hashlib
+import json
 import random
+import threading
 
 
 class AIInterviewPrep:
-    def __init__(self):
+    def __init__(self, cache_size: int = 1024):
+        # Sampled question sets keyed by (role category, skills hash, seed, generation)
+        self.cache_size = cache_size
+        self._question_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
         # Question database organized by category
         self.question_database = {
             'behavioral': [
@@ -114,51 +123,60 @@ class AIInterviewPrep:
             'R': 'Result: Share the outcomes and what you learned'
         }
 
+        # Sections that are identical in every package: built and serialized
+        # once here, shared (read-only) by every response
+        self.static_sections = {
+            'study_plan': self._create_study_plan({}),
+            'star_method': self.star_method,
+            'star_examples': self._create_star_examples(),
+            'common_mistakes': self._common_mistakes(),
+            'tips': self._interview_tips()
+        }
+        self._static_json = json.dumps(self.static_sections, separators=(',', ':'))[1:-1].encode()
+
     def generate_interview_questions(self, job_role: str, job_description: str = "",
-                                    skills: List[str] = None) -> Dict[str, Any]:
+                                    skills: List[str] = None, seed: Optional[str] = None,
+                                    generation: int = 0) -> Dict[str, Any]:
         """
-        Generate comprehensive interview preparation package
+        Generate comprehensive interview preparation package.
+        With a seed (e.g. the session ID) the same questions come back on every
+        call, in any process; a new `generation` (stored by the caller, e.g.
+        on the session) draws a fresh sample that is just as reproducible.
         """
+        package = self._generate_dynamic_sections(job_role, job_description, skills, seed, generation)
+        package.update(self.static_sections)
+        return package
+
+    def generate_interview_questions_json(self, job_role: str, job_description: str = "",
+                                         skills: List[str] = None, seed: Optional[str] = None,
+                                         generation: int = 0) -> bytes:
+        """
+        Same package as generate_interview_questions, as JSON bytes.
+        Only the per-request sections are encoded; the static ones are spliced in.
+        """
+        package = self._generate_dynamic_sections(job_role, job_description, skills, seed, generation)
+        dynamic_json = json.dumps(package, separators=(',', ':')).encode()
+        return b''.join((dynamic_json[:-1], b',', self._static_json, b'}'))
+
+    def _generate_dynamic_sections(self, job_role: str, job_description: str = "",
+                                   skills: List[str] = None, seed: Optional[str] = None,
+                                   generation: int = 0) -> Dict[str, Any]:
+        """Sections that depend on the role and skills of this request"""
 
         # Determine role category
         role_category = self._determine_role_category(job_role.lower())
 
-        # Generate question sets
-        questions = {
-            'behavioral': self._select_questions('behavioral', 10),
-            'technical': self._select_questions('technical', 8),
-            'situational': self._select_questions('situational', 7),
-            'role_specific': self._get_role_specific_questions(role_category, 8),
-            'company_fit': self._select_questions('company_fit', 5)
-        }
-
-        # Generate skill-based questions
-        if skills:
-            questions['skill_based'] = self._generate_skill_questions(skills)
+        if seed is None:
+            questions = self._sample_questions(role_category, skills, random.Random())
+        else:
+            questions = self._cached_questions(role_category, skills, seed, generation)
 
         # Create preparation guide
         preparation_guide = self._create_preparation_guide(questions, job_role)
 
-        # Generate study plan
-        study_plan = self._create_study_plan(questions)
-
-        # STAR method examples
-        star_examples = self._create_star_examples()
-
-        # Common mistakes to avoid
-        mistakes = self._common_mistakes()
-
-        # Tips and best practices
-        tips = self._interview_tips()
-
         return {
             'questions': questions,
             'preparation_guide': preparation_guide,
-            'study_plan': study_plan,
-            'star_method': self.star_method,
-            'star_examples': star_examples,
-            'common_mistakes': mistakes,
-            'tips': tips,
             'total_questions': sum(len(v) if isinstance(v, list) else 0 for v in questions.values())
         }
 
@@ -177,15 +195,72 @@ class AIInterviewPrep:
 
         return 'software_engineer'  # Default
 
-    def _select_questions(self, category: str, count: int) -> List[str]:
+    def _sample_questions(self, role_category: str, skills: Optional[List[str]],
+                          rng: random.Random) -> Dict[str, List[str]]:
+        """Draw every question set from one RNG"""
+        questions = {
+            'behavioral': self._select_questions('behavioral', 10, rng),
+            'technical': self._select_questions('technical', 8, rng),
+            'situational': self._select_questions('situational', 7, rng),
+            'role_specific': self._get_role_specific_questions(role_category, 8, rng),
+            'company_fit': self._select_questions('company_fit', 5, rng)
+        }
+
+        # Generate skill-based questions
+        if skills:
+            questions['skill_based'] = self._generate_skill_questions(skills)
+
+        return questions
+
+    def _cached_questions(self, role_category: str, skills: Optional[List[str]],
+                          seed: str, generation: int) -> Dict[str, List[str]]:
+        """
+        Question sets for (role category, skills, seed, generation), sampled
+        once and cached. The cache only saves work: the sample itself is
+        derived from the seed, so an evicted entry comes back identical.
+        The returned dict is shared between callers and must not be modified.
+        """
+        key = (role_category, self._skills_hash(skills), seed, generation)
+
+        with self._cache_lock:
+            questions = self._question_cache.get(key)
+            if questions is not None:
+                self._question_cache.move_to_end(key)
+                return questions
+
+        # Reproducible sample per seed, role and generation
+        rng = random.Random(self._seed_value(seed, role_category, generation))
+        questions = self._sample_questions(role_category, skills, rng)
+
+        with self._cache_lock:
+            self._question_cache[key] = questions
+            self._question_cache.move_to_end(key)
+            while len(self._question_cache) > self.cache_size:
+                self._question_cache.popitem(last=False)
+
+        return questions
+
+    def _skills_hash(self, skills: Optional[List[str]]) -> str:
+        """Hash of the skills that shape the questions (only the top 5 are used)"""
+        top_skills = '\x1f'.join(skills[:5]) if skills else ''
+        return hashlib.sha1(top_skills.encode()).hexdigest()
+
+    def _seed_value(self, seed: str, role_category: str, generation: int = 0) -> int:
+        """Stable across processes, unlike hash(); generation 0 keeps the original sample"""
+        text = f'{seed}\x1f{role_category}' if not generation else f'{seed}\x1f{role_category}\x1f{generation}'
+        digest = hashlib.sha256(text.encode()).digest()
+        return int.from_bytes(digest[:8], 'big')
+
+    def _select_questions(self, category: str, count: int, rng: random.Random) -> List[str]:
         """Select random questions from a category"""
         questions = self.question_database.get(category, [])
-        return random.sample(questions, min(count, len(questions)))
+        return rng.sample(questions, min(count, len(questions)))
 
-    def _get_role_specific_questions(self, role_category: str, count: int) -> List[str]:
+    def _get_role_specific_questions(self, role_category: str, count: int,
+                                     rng: random.Random) -> List[str]:
         """Get role-specific questions"""
         role_questions = self.question_database['role_specific'].get(role_category, [])
-        return random.sample(role_questions, min(count, len(role_questions)))
+        return rng.sample(role_questions, min(count, len(role_questions)))
 
     def _generate_skill_questions(self, skills: List[str]) -> List[str]:
         """Generate questions based on required skills"""
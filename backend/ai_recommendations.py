@@ -2,6 +2,7 @@ import json
 import random
 from datetime import datetime
 from datasets.skills_dataset import SkillsDataset
+from skill_taxonomy import skill_taxonomy
 
 class AIRecommendationEngine:
     def __init__(self):
@@ -130,9 +131,11 @@ class AIRecommendationEngine:
                 questions.extend(self.interview_questions_db[skill_lower][:2])
 
         # Add job-specific questions for missing skills
+        extra_ids = {}
+        resume_skill_bits = skill_taxonomy.to_bits(resume_skills, extra_ids)
         for skill in job_skills:
             skill_lower = skill.lower()
-            if skill_lower not in [s.lower() for s in resume_skills] and skill_lower in self.interview_questions_db:
+            if not skill_taxonomy.contains(resume_skill_bits, skill, extra_ids) and skill_lower in self.interview_questions_db:
                 questions.append(f"How would you approach learning {skill} quickly?")
 
         return questions[:10]  # Return top 10 questions
@@ -3,13 +3,26 @@ AI-Powered Resume Scoring Engine
 Provides comprehensive 5-dimensional scoring with actionable recommendations
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from collections import Counter
 import re
 
+from score_distribution import ScoreDistribution
+from skill_taxonomy import skill_taxonomy
+from tracing import traced
+
 
 class AIResumeScoringEngine:
-    def __init__(self):
+    # Dimensions tracked for percentile ranking
+    SCORE_DIMENSIONS = [
+        'overall_score', 'ats_score', 'keyword_score', 'impact_score',
+        'completeness_score', 'professional_score'
+    ]
+
+    def __init__(self, score_distribution: Optional[ScoreDistribution] = None):
+        # Streaming histogram of all scores seen so far (percentile ranks)
+        self.score_distribution = score_distribution
+
         self.action_verbs = [
             'achieved', 'implemented', 'developed', 'managed', 'led', 'created',
             'improved', 'increased', 'decreased', 'generated', 'launched', 'designed',
@@ -21,11 +34,13 @@ class AIResumeScoringEngine:
             'professional experience', 'work history', 'employment history'
         ]
 
+    @traced('scoring.score')
     def calculate_comprehensive_score(self, resume_data: Dict[str, Any],
-                                     job_data: Dict[str, Any] = None) -> Dict[str, Any]:
+                                     job_data: Dict[str, Any] = None, rank: bool = True) -> Dict[str, Any]:
         """
         Calculate comprehensive resume score across 5 dimensions
         Returns overall score, category scores, grade, and recommendations
+        With rank=False percentiles are None, for the caller to fill in with rank_scores()
         """
 
         # Calculate 5-dimensional scores
@@ -63,22 +78,50 @@ class AIResumeScoringEngine:
         # Generate prioritized recommendations
         recommendations = self._generate_recommendations(scores_dict, resume_data, job_data)
 
+        scores = {
+            'ats_score': ats_score,
+            'keyword_score': keyword_score,
+            'impact_score': impact_score,
+            'completeness_score': completeness_score,
+            'professional_score': professional_score
+        }
+
         return {
             'overall_score': overall_score,
             'grade': grade,
-            'scores': {
-                'ats_score': ats_score,
-                'keyword_score': keyword_score,
-                'impact_score': impact_score,
-                'completeness_score': completeness_score,
-                'professional_score': professional_score
-            },
+            'scores': scores,
+            'percentiles': self.rank_scores(overall_score, scores) if rank else None,
             'strengths': strengths,
             'weaknesses': weaknesses,
             'critical_issues': critical_issues,
             'recommendations': recommendations
         }
 
+    @traced('scoring.percentiles')
+    def rank_scores(self, overall_score: int, scores: Dict[str, int],
+                    recorded: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        Percentile rank of each score among all other scored resumes. The
+        scores are recorded, unless `recorded` holds the scores recorded
+        earlier for this resume: those are left out instead, so a resume
+        is counted and compared once however often it is scored.
+        """
+        if self.score_distribution is None:
+            return {'sample_size': 0, 'ranks': {}}
+
+        sample_size = self.score_distribution.sample_size('overall_score')
+        if recorded is None:
+            ranks = self.score_distribution.rank_and_record(dict(scores, overall_score=overall_score))
+        else:
+            ranks = self.score_distribution.rank(dict(scores, overall_score=overall_score), exclude=recorded)
+            sample_size = max(sample_size - 1, 0)
+
+        return {
+            'sample_size': sample_size,
+            'ranks': ranks
+        }
+
+    @traced('scoring.ats')
     def _calculate_ats_score(self, resume_data: Dict[str, Any]) -> int:
         """Calculate ATS (Applicant Tracking System) compatibility score"""
         score = 0
@@ -112,34 +155,37 @@ class AIResumeScoringEngine:
 
         return min(score, 100)
 
+    @traced('scoring.keywords')
     def _calculate_keyword_score(self, resume_data: Dict[str, Any],
                                  job_data: Dict[str, Any] = None) -> int:
         """Calculate keyword optimization score"""
         score = 50  # Base score
 
         resume_text = resume_data.get('text', '').lower()
-        resume_skills = set(s.lower() for s in resume_data.get('skills', []))
+        extra_ids = {}  # skills outside the taxonomy, numbered for these two bitsets
+        resume_skills = skill_taxonomy.to_bits(resume_data.get('skills', []), extra_ids)
+        skill_count = resume_skills.bit_count()
 
         # Skills presence (25 points)
-        if len(resume_skills) >= 10:
+        if skill_count >= 10:
             score += 25
-        elif len(resume_skills) >= 5:
+        elif skill_count >= 5:
             score += 15
-        elif len(resume_skills) > 0:
+        elif skill_count > 0:
             score += 10
 
         # Job-specific keyword matching (25 points)
         if job_data:
-            job_skills = set(s.lower() for s in job_data.get('skills', []))
+            job_skills = skill_taxonomy.to_bits(job_data.get('skills', []), extra_ids)
             if job_skills:
-                matching_skills = resume_skills & job_skills
-                match_ratio = len(matching_skills) / len(job_skills)
+                match_ratio = (resume_skills & job_skills).bit_count() / job_skills.bit_count()
                 score += int(match_ratio * 25)
         else:
             score += 15  # Partial credit if no job data
 
         return min(score, 100)
 
+    @traced('scoring.impact')
     def _calculate_impact_score(self, resume_data: Dict[str, Any]) -> int:
         """Calculate impact and achievements score"""
         score = 0
@@ -167,6 +213,7 @@ class AIResumeScoringEngine:
 
         return min(score, 100)
 
+    @traced('scoring.completeness')
     def _calculate_completeness_score(self, resume_data: Dict[str, Any]) -> int:
         """Calculate resume completeness score"""
         score = 0
@@ -197,6 +244,7 @@ class AIResumeScoringEngine:
 
         return min(score, 100)
 
+    @traced('scoring.professional')
     def _calculate_professional_score(self, resume_data: Dict[str, Any]) -> int:
         """Calculate professional quality score"""
         score = 50  # Base score
@@ -291,6 +339,7 @@ class AIResumeScoringEngine:
 
         return critical
 
+    @traced('scoring.recommendations')
     def _generate_recommendations(self, scores: Dict[str, int],
                                  resume_data: Dict[str, Any],
                                  job_data: Dict[str, Any] = None) -> List[Dict[str, Any]]:
@@ -1,6 +1,9 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-from database import db, init_db, UserSession
+from database import (db, init_db, UserSession, SessionSkill, save_cover_letters, load_cover_letters,
+                      set_session_skills, top_skills, sessions_with_skill, session_summaries,
+                      session_validators, history_validators, interview_generation,
+                      next_interview_generation, claim_score_recording, SKILL_ROLE_COLUMNS)
 from advanced_parser import UniversalResumeParser
 from job_analyzer import AdvancedJobAnalyzer
 from cover_letter_generator import AdvancedCoverLetterGenerator
@@ -9,30 +12,253 @@ from ai_scoring_engine import AIResumeScoringEngine
 from nlp_job_classifier import NLPJobClassifier
 from ai_interview_prep import AIInterviewPrep
 from skill_gap_analyzer import SkillGapAnalyzer
+from score_distribution import ScoreDistribution
+from market_demand import MarketDemandTracker
+from skill_taxonomy import skill_taxonomy
+from event_stream import format_event, event_stream_response
+from conditional import make_etag, not_modified, with_validators
+from response_encoding import install_response_encoding
+from metrics import RequestMetrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from tracing import install_tracing, span, trace, traced
+from profiling import RequestProfiler
+from admin_auth import admin_denied
+from staged_executor import Stage, StagedExecutor
+from session_repository import SessionRepository
+from retention import DEFAULT_RETENTION_DAYS, run_retention, enable_incremental_vacuum
+from session_export import export_ndjson, import_ndjson
+from job_queue import JobQueue, QueueFull
+from werkzeug.utils import secure_filename
+import atexit
+import click
+import gzip
+import os
+import time
 import uuid
+from itertools import groupby
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 
 app = Flask(__name__)
 
+# Per-route counts and latency, first so its timing wraps the other hooks
+request_metrics = RequestMetrics()
+request_metrics.install(app)
+
+# Off until an admin opens a window at /api/admin/profile
+profiler = RequestProfiler()
+profiler.install(app)
+# Span tree per request (X-Debug-Trace header, slow-request log)
+install_tracing(app)
+
 # Initialize extensions
 init_db(app)
 CORS(app)
+# Compact JSON, gzip for large responses
+install_response_encoding(app)
 
 # Initialize AI components
 resume_parser = UniversalResumeParser()
 job_analyzer = AdvancedJobAnalyzer()
 cover_generator = AdvancedCoverLetterGenerator()
 ai_engine = AIRecommendationEngine()
-scoring_engine = AIResumeScoringEngine()
+score_distribution = ScoreDistribution(
+    AIResumeScoringEngine.SCORE_DIMENSIONS,
+    persist_path=os.path.join(app.instance_path, 'score_distribution.json')
+)
+atexit.register(score_distribution.flush)
+scoring_engine = AIResumeScoringEngine(score_distribution=score_distribution)
 job_classifier = NLPJobClassifier()
 interview_prep = AIInterviewPrep()
-skill_gap_analyzer = SkillGapAnalyzer()
+market_demand = MarketDemandTracker()
+skill_gap_analyzer = SkillGapAnalyzer(market_demand=market_demand)
+
+# Decoded sessions, cached across requests and written through on commit
+sessions = SessionRepository()
+sessions.install(db.session)
+
+# Runs the independent comprehensive-analysis stages side by side
+# (ANALYSIS_EXECUTOR=thread|process, ANALYSIS_WORKERS, ANALYSIS_STAGE_TIMEOUT)
+def _init_analysis_worker():
+    # A forked worker's score distribution is a stale, partial copy: it must
+    # never overwrite the file the app persists
+    score_distribution.persist_path = None
+
+analysis_executor = StagedExecutor.from_env('ANALYSIS', worker_init=_init_analysis_worker)
+atexit.register(analysis_executor.shutdown)
+
+# Background resume parsing for ?async=1 uploads (UPLOAD_WORKERS, UPLOAD_QUEUE_SIZE)
+upload_jobs = JobQueue(
+    workers=int(os.environ.get('UPLOAD_WORKERS', 2)),
+    max_pending=int(os.environ.get('UPLOAD_QUEUE_SIZE', 100))
+)
+UPLOAD_DIR = os.path.join(app.instance_path, 'uploads')
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+request_metrics.register_collector('session_cache', sessions.cache.stats,
+                                   counters=('hits', 'misses', 'evictions', 'expirations'))
+request_metrics.register_collector('upload_jobs', upload_jobs.metrics,
+                                   counters=('completed', 'failed', 'rejected'))
+request_metrics.register_collector('analysis_executor', analysis_executor.stats,
+                                   counters=('runs', 'stages_ok', 'stages_error', 'stages_timeout'))
+
+
+def _load_market_demand():
+    """
+    Seed the demand counters with postings analyzed within the window: each
+    session's current job skills, at its creation time, as analyze_job counts them
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=market_demand.window_seconds)
+    with app.app_context():
+        # Indexed range scan over session_skill; no JSON decoding
+        rows = db.session.query(SessionSkill.session_id, SessionSkill.created_at, SessionSkill.skill)\
+            .filter(SessionSkill.role == 'job', SessionSkill.created_at >= cutoff)\
+            .order_by(SessionSkill.created_at, SessionSkill.session_id)\
+            .all()
+        for (_, created_at), posting in groupby(rows, key=lambda row: (row.session_id, row.created_at)):
+            market_demand.record_posting([row.skill for row in posting], timestamp=created_at)
+
+
+_load_market_demand()
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'message': 'AI Job Assistant API is running'})
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition of request, process, cache, queue and executor metrics"""
+    return Response(request_metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/api/admin/profile', methods=['POST'])
+def start_profile():
+    """Profile the next `requests` requests and/or `seconds` seconds of traffic"""
+    denied = admin_denied('PROFILING_TOKEN', 'Profiling')
+    if denied:
+        return denied
+    try:
+        data = request.get_json(silent=True) or {}
+        run = profiler.start(
+            mode=data.get('mode', 'cprofile'),
+            requests=int(data['requests']) if data.get('requests') is not None else None,
+            seconds=float(data['seconds']) if data.get('seconds') is not None else None,
+            interval_ms=float(data.get('interval_ms', 5))
+        )
+        return jsonify({'success': True, 'profile': run.to_dict()}), 202
+
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/profile', methods=['GET'])
+def get_profile_status():
+    denied = admin_denied('PROFILING_TOKEN', 'Profiling')
+    if denied:
+        return denied
+    try:
+        run = profiler.status()
+        return jsonify({'success': True, 'profile': run.to_dict() if run else None})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/profile', methods=['DELETE'])
+def stop_profile():
+    denied = admin_denied('PROFILING_TOKEN', 'Profiling')
+    if denied:
+        return denied
+    try:
+        run = profiler.stop()
+        return jsonify({'success': True, 'profile': run.to_dict() if run else None})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/profile/result', methods=['GET'])
+def get_profile_result():
+    """?format=pstats|text for cprofile, collapsed|text for sampling"""
+    denied = admin_denied('PROFILING_TOKEN', 'Profiling')
+    if denied:
+        return denied
+    try:
+        body, mimetype = profiler.result(request.args.get('format', 'text'),
+                                         limit=request.args.get('limit', 50, type=int))
+        return Response(body, mimetype=mimetype)
+
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/cache-stats', methods=['GET'])
+def get_cache_stats():
+    try:
+        return jsonify({
+            'success': True,
+            'session_cache': sessions.cache.stats()
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _process_resume(file_content, filename, user_id):
+    """Parse a resume and store it as a new session; returns the upload response fields"""
+    result = resume_parser.parse_resume(file_content, filename)
+
+    if not result['success']:
+        raise ValueError(result['error'])
+
+    # Create session
+    session_id = str(uuid.uuid4())
+    analysis = result['analysis']
+
+    new_session = UserSession(
+        session_id=session_id,
+        user_id=user_id,
+        resume_text=result['text'],
+        resume_experience=json.dumps(analysis['experience']),
+        resume_education=json.dumps(analysis['education']),
+        resume_personal_info=json.dumps(analysis['personal_info']),
+        resume_sections=json.dumps(analysis['sections']),
+        resume_entities=json.dumps(analysis['entities']),
+        resume_file_name=filename
+    )
+    set_session_skills(new_session, 'resume', analysis['skills'])
+
+    with span('db.commit'):
+        db.session.add(new_session)
+        db.session.commit()
+
+    return {
+        'session_id': session_id,
+        'user_id': user_id,
+        'resume_data': {
+            'skills': analysis['skills'],
+            'experience': analysis['experience'],
+            'education': analysis['education'],
+            'personal_info': analysis['personal_info'],
+            'sections_found': analysis['sections'],
+            'entities': analysis['entities'],
+            'file_name': filename
+        }
+    }
+
+def _process_stored_resume(path, filename, user_id):
+    """Background job: parse an upload saved by the async mode, then delete it"""
+    try:
+        with open(path, 'rb') as stored:
+            file_content = stored.read()
+        with app.app_context(), trace('job parse_resume'):
+            return _process_resume(file_content, filename, user_id)
+    finally:
+        os.remove(path)
+
+upload_jobs.register('parse_resume', _process_stored_resume)
+
 @app.route('/api/upload-resume', methods=['POST'])
 def upload_resume():
     try:
@@ -45,48 +271,54 @@ def upload_resume():
         if resume_file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
 
-        # Read file content
-        file_content = resume_file.read()
-
-        # Parse resume
-        result = resume_parser.parse_resume(file_content, resume_file.filename)
-
-        if not result['success']:
-            return jsonify({'error': result['error']}), 500
-
-        # Create session
-        session_id = str(uuid.uuid4())
-        analysis = result['analysis']
-
-        new_session = UserSession(
-            session_id=session_id,
-            user_id=user_id,
-            resume_text=result['text'][:5000],  # Store first 5000 chars
-            resume_skills=json.dumps(analysis['skills']),
-            resume_experience=json.dumps(analysis['experience']),
-            resume_education=json.dumps(analysis['education']),
-            resume_personal_info=json.dumps(analysis['personal_info']),
-            resume_sections=json.dumps(analysis['sections']),
-            resume_entities=json.dumps(analysis['entities']),
-            resume_file_name=resume_file.filename
-        )
+        # ?async=1: store the file, parse it in the background, poll the job
+        if request.args.get('async', request.form.get('async', '')).lower() in ('1', 'true', 'yes'):
+            path = os.path.join(UPLOAD_DIR, f'{uuid.uuid4().hex}-{secure_filename(resume_file.filename)}')
+            resume_file.save(path)
+            try:
+                job = upload_jobs.submit('parse_resume', path, resume_file.filename, user_id)
+            except QueueFull as e:
+                os.remove(path)
+                return jsonify({'error': f'Too many uploads in progress: {e}'}), 503, {'Retry-After': '5'}
+
+            status_url = f'/api/jobs/{job.id}'
+            return jsonify({
+                'success': True,
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': status_url
+            }), 202, {'Location': status_url}
 
-        db.session.add(new_session)
-        db.session.commit()
+        return jsonify({
+            'success': True,
+            **_process_resume(resume_file.read(), resume_file.filename, user_id)
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/metrics', methods=['GET'])
+def get_job_metrics():
+    try:
+        return jsonify({
+            'success': True,
+            'upload_jobs': upload_jobs.metrics()
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Status of a background upload; the upload response is under `result` once done"""
+    try:
+        job = upload_jobs.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
 
         return jsonify({
             'success': True,
-            'session_id': session_id,
-            'user_id': user_id,
-            'resume_data': {
-                'skills': analysis['skills'],
-                'experience': analysis['experience'],
-                'education': analysis['education'],
-                'personal_info': analysis['personal_info'],
-                'sections_found': analysis['sections'],
-                'entities': analysis['entities'],
-                'file_name': resume_file.filename
-            }
+            'job': job.to_dict()
         })
 
     except Exception as e:
@@ -107,13 +339,19 @@ def analyze_job():
 
         # Update session with job data
         if session_id:
-            session = UserSession.query.filter_by(session_id=session_id).first()
-            if session:
-                session.job_description = job_description
-                session.job_skills = json.dumps(job_analysis['skills'])
-                session.job_experience_level = job_analysis['experience_level']
-                session.job_analysis = json.dumps(job_analysis)
-                db.session.commit()
+            row = sessions.row(session_id)
+            if row:
+                previous_skills = json.loads(row.job_skills) if row.job_skills else []
+                row.job_description = job_description
+                set_session_skills(row, 'job', job_analysis['skills'])
+                row.job_experience_level = job_analysis['experience_level']
+                row.job_analysis = json.dumps(job_analysis)
+                with span('db.commit'):
+                    db.session.commit()
+                # One posting per session, as _load_market_demand() rebuilds
+                # it: re-analysis only applies the change in skills
+                market_demand.record_posting(job_analysis['skills'], timestamp=row.created_at,
+                                             previous=previous_skills)
 
         return jsonify({
             'success': True,
@@ -133,22 +371,20 @@ def analyze_match():
             return jsonify({'error': 'Session ID is required'}), 400
 
         # Get session data
-        session = UserSession.query.filter_by(session_id=session_id).first()
+        session = sessions.get(session_id)
         if not session:
             return jsonify({'error': 'Session not found'}), 404
 
-        resume_skills = json.loads(session.resume_skills) if session.resume_skills else []
-        job_skills = json.loads(session.job_skills) if session.job_skills else []
+        resume_skills = session.resume_skills
+        job_skills = session.job_skills
 
         # Calculate match
         match_score = job_analyzer.calculate_similarity(resume_skills, job_skills)
 
-        # Find matching and missing skills
-        resume_skills_lower = [s.lower() for s in resume_skills]
-        job_skills_lower = [s.lower() for s in job_skills]
-
-        matching_skills = list(set(resume_skills_lower) & set(job_skills_lower))
-        missing_skills = list(set(job_skills_lower) - set(resume_skills_lower))
+        # Find matching and missing skills (taxonomy bitsets, aliases resolved)
+        skill_match = skill_taxonomy.compare(resume_skills, job_skills)
+        matching_skills = skill_match.names(skill_match.matching)
+        missing_skills = skill_match.names(skill_match.missing)
 
         # Get AI recommendations
         skill_recommendations = ai_engine.get_skill_recommendations(missing_skills, resume_skills)
@@ -156,16 +392,17 @@ def analyze_match():
         personalized_questions = ai_engine.generate_personalized_questions(resume_skills, job_skills)
 
         # Get missing sections suggestions
-        existing_sections = json.loads(session.resume_sections) if session.resume_sections else []
-        missing_sections = ai_engine.get_missing_sections_suggestions(existing_sections)
+        missing_sections = ai_engine.get_missing_sections_suggestions(session.resume_sections)
 
         # Update session with analysis results
-        session.match_score = match_score
-        session.matching_skills = json.dumps(matching_skills)
-        session.missing_skills = json.dumps(missing_skills)
-        session.ai_recommendations = json.dumps(skill_recommendations)
-        session.improvement_plan = json.dumps(improvement_plan)
-        db.session.commit()
+        row = sessions.row(session_id)
+        row.match_score = match_score
+        set_session_skills(row, 'matching', matching_skills)
+        set_session_skills(row, 'missing', missing_skills)
+        row.ai_recommendations = json.dumps(skill_recommendations)
+        row.improvement_plan = json.dumps(improvement_plan)
+        with span('db.commit'):
+            db.session.commit()
 
         return jsonify({
             'success': True,
@@ -197,30 +434,12 @@ def generate_cover_letter():
             return jsonify({'error': 'Session ID is required'}), 400
 
         # Get session data
-        session = UserSession.query.filter_by(session_id=session_id).first()
+        session = sessions.get(session_id)
         if not session:
             return jsonify({'error': 'Session not found'}), 404
 
         # Prepare session data for cover letter generation
-        session_data = {
-            'resume_data': {
-                'skills': json.loads(session.resume_skills) if session.resume_skills else [],
-                'experience': json.loads(session.resume_experience) if session.resume_experience else {},
-                'education': json.loads(session.resume_education) if session.resume_education else [],
-                'personal_info': json.loads(session.resume_personal_info) if session.resume_personal_info else {}
-            },
-            'job_data': {
-                'description': session.job_description,
-                'skills': json.loads(session.job_skills) if session.job_skills else [],
-                'experience_level': session.job_experience_level,
-                'full_analysis': json.loads(session.job_analysis) if session.job_analysis else {}
-            },
-            'analysis_results': {
-                'match_score': session.match_score,
-                'matching_skills': json.loads(session.matching_skills) if session.matching_skills else [],
-                'missing_skills': json.loads(session.missing_skills) if session.missing_skills else []
-            }
-        }
+        session_data = session.cover_letter_data()
 
         # Generate cover letter
         cover_letter = cover_generator.generate_cover_letter(
@@ -229,11 +448,9 @@ def generate_cover_letter():
             customizations
         )
 
-        # Update session with generated cover letter
-        current_cover_letters = json.loads(session.cover_letters) if session.cover_letters else {}
-        current_cover_letters[tone] = cover_letter
-        session.cover_letters = json.dumps(current_cover_letters)
-        db.session.commit()
+        # Store as the next version of this tone (single-row insert)
+        row, = save_cover_letters(session_id, [cover_letter])
+        cover_letter['version'] = row.version
 
         return jsonify({
             'success': True,
@@ -254,60 +471,99 @@ def generate_all_cover_letters():
             return jsonify({'error': 'Session ID is required'}), 400
 
         # Get session data
-        session = UserSession.query.filter_by(session_id=session_id).first()
+        session = sessions.get(session_id)
         if not session:
             return jsonify({'error': 'Session not found'}), 404
 
-        # Prepare session data
-        session_data = {
-            'resume_data': {
-                'skills': json.loads(session.resume_skills) if session.resume_skills else [],
-                'experience': json.loads(session.resume_experience) if session.resume_experience else {},
-                'education': json.loads(session.resume_education) if session.resume_education else [],
-                'personal_info': json.loads(session.resume_personal_info) if session.resume_personal_info else {}
-            },
-            'job_data': {
-                'description': session.job_description,
-                'skills': json.loads(session.job_skills) if session.job_skills else [],
-                'experience_level': session.job_experience_level
-            },
-            'analysis_results': {
-                'match_score': session.match_score,
-                'matching_skills': json.loads(session.matching_skills) if session.matching_skills else [],
-                'missing_skills': json.loads(session.missing_skills) if session.missing_skills else []
-            }
-        }
+        session_data = session.cover_letter_data()
 
         # Generate all cover letters
+        start = time.perf_counter()
         all_cover_letters = cover_generator.generate_all_cover_letters(session_data)
+        total_ms = round((time.perf_counter() - start) * 1000, 3)
 
-        # Update session
-        session.cover_letters = json.dumps(all_cover_letters)
-        db.session.commit()
+        # Store every tone as its next version
+        for row in save_cover_letters(session_id, list(all_cover_letters.values())):
+            all_cover_letters[row.tone]['version'] = row.version
 
         return jsonify({
             'success': True,
             'cover_letters': all_cover_letters,
+            'render_times': {
+                'per_tone_ms': {tone: letter['render_ms'] for tone, letter in all_cover_letters.items()},
+                'total_ms': total_ms
+            },
             'session_id': session_id
         })
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/generate-all-cover-letters/stream', methods=['POST'])
+def stream_all_cover_letters():
+    """Server-sent events: one `cover_letter` event per tone as it finishes"""
+    try:
+        data = request.json
+        session_id = data.get('session_id')
+
+        if not session_id:
+            return jsonify({'error': 'Session ID is required'}), 400
+
+        session = sessions.get(session_id)
+        if not session:
+            return jsonify({'error': 'Session not found'}), 404
+
+        session_data = session.cover_letter_data()
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    def events():
+        start = time.perf_counter()
+        all_cover_letters = {}
+        try:
+            for tone, cover_letter in cover_generator.iter_all_cover_letters(session_data):
+                all_cover_letters[tone] = cover_letter
+                yield format_event('cover_letter', {'tone': tone, 'cover_letter': cover_letter})
+
+            # Saved once every tone is in, like the non-streaming endpoint
+            rows = save_cover_letters(session_id, list(all_cover_letters.values()))
+
+            yield format_event('done', {
+                'success': True,
+                'session_id': session_id,
+                'versions': {row.tone: row.version for row in rows},
+                'total_ms': round((time.perf_counter() - start) * 1000, 3)
+            })
+        except Exception as e:
+            yield format_event('error', {'error': str(e)})
+
+    return event_stream_response(events())
+
 @app.route('/api/get-cover-letters/<session_id>', methods=['GET'])
 def get_cover_letters(session_id):
     try:
-        session = UserSession.query.filter_by(session_id=session_id).first()
-        if not session:
+        # Session version only; nothing is loaded or decoded for a 304
+        validators = session_validators(session_id)
+        if not validators:
             return jsonify({'error': 'Session not found'}), 404
+        version, last_modified = validators
 
-        cover_letters = json.loads(session.cover_letters) if session.cover_letters else {}
+        # Optional filter: ?tones=professional,technical (or repeated ?tone=)
+        tones = [t for t in request.args.get('tones', '').split(',') if t] + request.args.getlist('tone')
 
-        return jsonify({
+        etag = make_etag('cover-letters', session_id, version, sorted(tones))
+        unchanged = not_modified(etag, last_modified)
+        if unchanged:
+            return unchanged
+
+        cover_letters = load_cover_letters(session_id, tones or None)
+
+        return with_validators(jsonify({
             'success': True,
             'cover_letters': cover_letters,
             'session_id': session_id
-        })
+        }), etag, last_modified)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -315,19 +571,110 @@ def get_cover_letters(session_id):
 @app.route('/api/session-history/<user_id>', methods=['GET'])
 def get_session_history(user_id):
     try:
-        sessions = UserSession.query.filter_by(user_id=user_id)\
-            .order_by(UserSession.created_at.desc())\
-            .limit(10)\
-            .all()
+        # Versions of the listed sessions decide whether anything changed
+        versions, last_modified = history_validators(user_id, limit=10)
+        etag = make_etag('session-history', user_id, versions)
+        unchanged = not_modified(etag, last_modified)
+        if unchanged:
+            return unchanged
+
+        # Summary projection; full details come from /api/session/<session_id>
+        return with_validators(jsonify({
+            'success': True,
+            'sessions': session_summaries(user_id, limit=10)
+        }), etag, last_modified)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/session/<session_id>', methods=['GET'])
+def get_session_details(session_id):
+    try:
+        row = sessions.row(session_id)
+        if not row:
+            return jsonify({'error': 'Session not found'}), 404
+
+        return jsonify({
+            'success': True,
+            'session': row.to_dict()
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analytics/top-skills', methods=['GET'])
+def get_top_skills():
+    """Most common skills in a role, e.g. ?role=missing&days=7"""
+    try:
+        role = request.args.get('role', 'missing')
+        if role not in SKILL_ROLE_COLUMNS:
+            return jsonify({'error': f"role must be one of: {', '.join(SKILL_ROLE_COLUMNS)}"}), 400
+
+        days = request.args.get('days', type=int)
+        limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+        since = datetime.utcnow() - timedelta(days=days) if days else None
+
+        return jsonify({
+            'success': True,
+            'role': role,
+            'days': days,
+            'skills': [{'skill': skill, 'sessions': count} for skill, count in top_skills(role, since, limit)]
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analytics/skills/<path:skill>/sessions', methods=['GET'])
+def get_sessions_with_skill(skill):
+    """Newest sessions with a skill in a role, e.g. sessions missing kubernetes"""
+    # A session ID opens the whole session, so this is as sensitive as export
+    denied = admin_denied('EXPORT_TOKEN', 'Session lookup')
+    if denied:
+        return denied
+    try:
+        role = request.args.get('role', 'missing')
+        if role not in SKILL_ROLE_COLUMNS:
+            return jsonify({'error': f"role must be one of: {', '.join(SKILL_ROLE_COLUMNS)}"}), 400
+
+        limit = max(1, min(request.args.get('limit', 50, type=int), 500))
 
         return jsonify({
             'success': True,
-            'sessions': [session.to_dict() for session in sessions]
+            'skill': skill,
+            'role': role,
+            'session_ids': sessions_with_skill(skill, role, limit)
         })
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/export/sessions', methods=['GET'])
+def export_sessions():
+    """All sessions as NDJSON, streamed in chunks, e.g. ?since=2024-01-01&user_id=..."""
+    # Full resumes, contact details and cover letters: admins only
+    denied = admin_denied('EXPORT_TOKEN', 'Export')
+    if denied:
+        return denied
+    try:
+        since = request.args.get('since')
+        until = request.args.get('until')
+        filters = {
+            'since': datetime.fromisoformat(since) if since else None,
+            'until': datetime.fromisoformat(until) if until else None,
+            'user_id': request.args.get('user_id'),
+            # yield_per(0) would read the whole table as one batch
+            'batch_size': max(1, min(request.args.get('batch_size', 500, type=int), 5000))
+        }
+
+    except ValueError as e:
+        return jsonify({'error': f'Invalid date: {e}'}), 400
+
+    return Response(
+        stream_with_context(export_ndjson(**filters)),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=sessions.ndjson'}
+    )
+
 # ============== NEW AI ENDPOINTS ==============
 
 @app.route('/api/ai-score-resume', methods=['POST'])
@@ -341,30 +688,16 @@ def ai_score_resume():
             return jsonify({'error': 'Session ID is required'}), 400
 
         # Get session data
-        session = UserSession.query.filter_by(session_id=session_id).first()
+        session = sessions.get(session_id)
         if not session:
             return jsonify({'error': 'Session not found'}), 404
 
-        # Prepare resume data
-        resume_data = {
-            'text': session.resume_text,
-            'skills': json.loads(session.resume_skills) if session.resume_skills else [],
-            'experience': json.loads(session.resume_experience) if session.resume_experience else {},
-            'education': json.loads(session.resume_education) if session.resume_education else [],
-            'personal_info': json.loads(session.resume_personal_info) if session.resume_personal_info else {},
-            'sections': json.loads(session.resume_sections) if session.resume_sections else []
-        }
-
-        # Prepare job data if available
-        job_data = None
-        if session.job_description:
-            job_data = {
-                'description': session.job_description,
-                'skills': json.loads(session.job_skills) if session.job_skills else []
-            }
+        # Job data only if a job description was analyzed
+        job_data = session.job_data if session.job_description else None
 
         # Calculate comprehensive score
-        score_result = scoring_engine.calculate_comprehensive_score(resume_data, job_data)
+        score_result = scoring_engine.calculate_comprehensive_score(session.resume_data, job_data, rank=False)
+        _rank_session_scores(session_id, score_result)
 
         return jsonify({
             'success': True,
@@ -391,13 +724,14 @@ def classify_job():
 
         # Update session if provided
         if session_id:
-            session = UserSession.query.filter_by(session_id=session_id).first()
+            session = sessions.get(session_id)
             if session:
-                # Store classification in session
-                current_analysis = json.loads(session.job_analysis) if session.job_analysis else {}
+                # Store classification in session (cached values are shared: copy)
+                current_analysis = dict(session.job_analysis)
                 current_analysis['classification'] = classification
-                session.job_analysis = json.dumps(current_analysis)
-                db.session.commit()
+                sessions.row(session_id).job_analysis = json.dumps(current_analysis)
+                with span('db.commit'):
+                    db.session.commit()
 
         return jsonify({
             'success': True,
@@ -415,33 +749,44 @@ def generate_interview_questions():
         session_id = data.get('session_id')
         job_role = data.get('job_role', '')
         job_description = data.get('job_description', '')
+        regenerate = bool(data.get('regenerate', False))
 
         if not session_id:
             return jsonify({'error': 'Session ID is required'}), 400
 
         # Get session data
-        session = UserSession.query.filter_by(session_id=session_id).first()
+        session = sessions.get(session_id)
         if not session:
             return jsonify({'error': 'Session not found'}), 404
 
         # Get skills from resume
-        skills = json.loads(session.resume_skills) if session.resume_skills else []
+        skills = session.resume_skills
 
         # Use job description from session if not provided
         if not job_description and session.job_description:
             job_description = session.job_description
 
-        # Generate interview preparation package
-        interview_package = interview_prep.generate_interview_questions(
+        # A regenerated set is stored as the session's next generation, so
+        # reloads (in any process, after restarts) return it
+        with span('db.interview_generation'):
+            if regenerate:
+                generation = next_interview_generation(session_id)
+            else:
+                generation = interview_generation(session_id)
+
+        # Generate interview preparation package (static sections arrive pre-encoded)
+        package_json = interview_prep.generate_interview_questions_json(
             job_role=job_role,
             job_description=job_description,
-            skills=skills
+            skills=skills,
+            seed=session_id,
+            generation=generation
         )
 
-        return jsonify({
-            'success': True,
-            'interview_preparation': interview_package
-        })
+        return app.response_class(
+            b'{"success":true,"interview_preparation":' + package_json + b'}',
+            mimetype='application/json'
+        )
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -457,23 +802,12 @@ def analyze_skill_gaps():
             return jsonify({'error': 'Session ID is required'}), 400
 
         # Get session data
-        session = UserSession.query.filter_by(session_id=session_id).first()
+        session = sessions.get(session_id)
         if not session:
             return jsonify({'error': 'Session not found'}), 404
 
-        # Prepare resume data
-        resume_data = {
-            'skills': json.loads(session.resume_skills) if session.resume_skills else []
-        }
-
-        # Prepare job data
-        job_data = {
-            'description': session.job_description,
-            'skills': json.loads(session.job_skills) if session.job_skills else []
-        }
-
         # Analyze skill gaps
-        gap_analysis = skill_gap_analyzer.analyze_skill_gaps(resume_data, job_data)
+        gap_analysis = skill_gap_analyzer.analyze_skill_gaps(session.resume_data, session.job_data)
 
         return jsonify({
             'success': True,
@@ -483,6 +817,58 @@ def analyze_skill_gaps():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Stage functions are module level (and take plain data) so they also
+# run on a process pool
+@traced('stage.interview_prep')
+def _interview_prep_stage(job_title, job_description, skills, session_id, generation):
+    return interview_prep.generate_interview_questions(
+        job_role=job_title,
+        job_description=job_description,
+        skills=skills,
+        seed=session_id,
+        generation=generation
+    )
+
+@traced('stage.ai_score')
+def _ai_score_stage(resume_data, job_data):
+    # Ranked by the request (_rank_session_scores), not in a worker that
+    # may be another process with its own copy of the distribution
+    return scoring_engine.calculate_comprehensive_score(resume_data, job_data, rank=False)
+
+def _rank_session_scores(session_id, score_result):
+    """Fill in percentile ranks; a session's scores join the distribution on its first scoring only"""
+    scores = dict(score_result['scores'], overall_score=score_result['overall_score'])
+    with span('db.claim_score_recording'):
+        recorded = claim_score_recording(session_id, scores)
+    score_result['percentiles'] = scoring_engine.rank_scores(
+        score_result['overall_score'], score_result['scores'], recorded)
+    return score_result
+
+@traced('stage.skill_gaps')
+def _skill_gaps_stage(resume_data, job_data):
+    return skill_gap_analyzer.analyze_skill_gaps(resume_data, job_data)
+
+@traced('stage.job_classification')
+def _job_classification_stage(job_description, job_title):
+    return job_classifier.classify_job_description(job_description, job_title)
+
+def _comprehensive_stages(session, job_title):
+    """The independent analyses behind comprehensive analysis"""
+    # Decoded here, once, in the request thread; the stages only read them
+    resume_data = dict(session.resume_data)
+    job_data = {'description': session.job_description, 'skills': session.job_skills}
+
+    # Submitted in this order: the cheap stages get going before the
+    # regex-heavy classifier starts competing for the GIL
+    return {
+        'interview_prep': Stage(_interview_prep_stage, job_title, job_data['description'],
+                                resume_data['skills'], session.session_id,
+                                interview_generation(session.session_id)),
+        'ai_score': Stage(_ai_score_stage, resume_data, job_data),
+        'skill_gaps': Stage(_skill_gaps_stage, resume_data, job_data),
+        'job_classification': Stage(_job_classification_stage, job_data['description'], job_title)
+    }
+
 @app.route('/api/comprehensive-analysis', methods=['POST'])
 def comprehensive_analysis():
     """Run all AI analyses in one comprehensive endpoint"""
@@ -494,47 +880,122 @@ def comprehensive_analysis():
         if not session_id:
             return jsonify({'error': 'Session ID is required'}), 400
 
-        # Get session data
-        session = UserSession.query.filter_by(session_id=session_id).first()
+        # Get session data; views are detached, safe on the worker threads
+        session = sessions.get(session_id)
         if not session:
             return jsonify({'error': 'Session not found'}), 404
 
-        # Prepare data
-        resume_data = {
-            'text': session.resume_text,
-            'skills': json.loads(session.resume_skills) if session.resume_skills else [],
-            'experience': json.loads(session.resume_experience) if session.resume_experience else {},
-            'education': json.loads(session.resume_education) if session.resume_education else [],
-            'personal_info': json.loads(session.resume_personal_info) if session.resume_personal_info else {},
-            'sections': json.loads(session.resume_sections) if session.resume_sections else []
-        }
+        # Run all analyses concurrently; failed or timed-out stages are
+        # reported and the rest returned
+        stages = _comprehensive_stages(session, job_title)
+        outcomes = {outcome.name: outcome for outcome in analysis_executor.run(stages)}
+        if outcomes['ai_score'].ok:
+            _rank_session_scores(session_id, outcomes['ai_score'].result)
+        stage_timings = {name: outcomes[name].timing() for name in stages}
+        failed = [name for name in stages if not outcomes[name].ok]
 
-        job_data = {
-            'description': session.job_description,
-            'skills': json.loads(session.job_skills) if session.job_skills else []
-        }
-
-        # Run all analyses
-        results = {
-            'ai_score': scoring_engine.calculate_comprehensive_score(resume_data, job_data),
-            'job_classification': job_classifier.classify_job_description(
-                session.job_description, job_title
-            ),
-            'interview_prep': interview_prep.generate_interview_questions(
-                job_role=job_title,
-                job_description=session.job_description,
-                skills=resume_data['skills']
-            ),
-            'skill_gaps': skill_gap_analyzer.analyze_skill_gaps(resume_data, job_data)
-        }
+        if len(failed) == len(stages):
+            return jsonify({'error': 'All analyses failed', 'stage_timings': stage_timings}), 500
 
         return jsonify({
             'success': True,
-            'comprehensive_analysis': results
+            'comprehensive_analysis': {name: outcomes[name].result for name in stages if outcomes[name].ok},
+            'failed_stages': failed,
+            'stage_timings': stage_timings
         })
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/comprehensive-analysis/stream', methods=['POST'])
+def stream_comprehensive_analysis():
+    """Server-sent events: one `section` event per analysis as it finishes"""
+    try:
+        data = request.json
+        session_id = data.get('session_id')
+        job_title = data.get('job_title', '')
+
+        if not session_id:
+            return jsonify({'error': 'Session ID is required'}), 400
+
+        session = sessions.get(session_id)
+        if not session:
+            return jsonify({'error': 'Session not found'}), 404
+
+        stages = _comprehensive_stages(session, job_title)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    def events():
+        failed = []
+        for outcome in analysis_executor.run(stages):
+            if outcome.ok:
+                if outcome.name == 'ai_score':
+                    _rank_session_scores(session_id, outcome.result)
+                yield format_event('section', {'section': outcome.name, 'result': outcome.result, **outcome.timing()})
+            else:
+                failed.append(outcome.name)
+                yield format_event('error', {'section': outcome.name, **outcome.timing()})
+
+        yield format_event('done', {'success': not failed, 'failed_sections': failed})
+
+    return event_stream_response(events())
+
+@app.cli.command('archive-sessions')
+@click.option('--days', default=DEFAULT_RETENTION_DAYS, show_default=True, help='Archive sessions older than this many days')
+@click.option('--archive-dir', default=None, help='Directory for archive files [default: instance/archive]')
+@click.option('--batch-size', default=200, show_default=True, help='Sessions archived and deleted per transaction')
+@click.option('--pause', default=0.0, show_default=True, help='Seconds to wait between batches')
+@click.option('--enable-incremental-vacuum', 'enable_vacuum', is_flag=True,
+              help='First rebuild an older SQLite file so freed space can be reclaimed (locks it while running)')
+def archive_sessions(days, archive_dir, batch_size, pause, enable_vacuum):
+    """Archive old sessions to gzip NDJSON, delete them and reclaim the space"""
+    if enable_vacuum:
+        enable_incremental_vacuum()
+        print("✅ Enabled incremental vacuum")
+
+    report = run_retention(days=days, archive_dir=archive_dir, batch_size=batch_size, pause=pause)
+    print(f"✅ Archived {report['sessions_archived']} sessions "
+          f"({report['cover_letters_archived']} cover letters) older than {report['cutoff']}")
+    if report['archive_path']:
+        print(f"   {report['archive_path']} ({report['archive_bytes']:,} bytes), "
+              f"longest delete transaction {report['longest_delete_ms']:.1f} ms")
+
+    vacuum = report['vacuum']
+    if vacuum['supported'] and vacuum['incremental_vacuum']:
+        print(f"✅ Reclaimed {vacuum['bytes_reclaimed']:,} bytes "
+              f"({vacuum['bytes_before']:,} -> {vacuum['bytes_after']:,})")
+    elif vacuum['supported']:
+        print(f"⚠️  {vacuum['free_pages_before']} free pages will be reused but not returned to the filesystem; "
+              "run once with --enable-incremental-vacuum")
+
+def _open_ndjson(path, mode):
+    """NDJSON file, gzip-compressed if the name ends in .gz"""
+    return gzip.open(path, mode + 't', encoding='utf-8') if path.endswith('.gz') else open(path, mode, encoding='utf-8')
+
+@app.cli.command('export-sessions')
+@click.argument('path')
+@click.option('--since', type=click.DateTime(), default=None, help='Only sessions created at or after this time')
+@click.option('--until', type=click.DateTime(), default=None, help='Only sessions created before this time')
+@click.option('--user-id', default=None, help="Only this user's sessions")
+@click.option('--batch-size', default=500, show_default=True, help='Sessions read per batch')
+def export_sessions_command(path, since, until, user_id, batch_size):
+    """Export sessions to an NDJSON file (.ndjson or .ndjson.gz)"""
+    with _open_ndjson(path, 'w') as output:
+        for chunk in export_ndjson(since=since, until=until, user_id=user_id, batch_size=batch_size):
+            output.write(chunk)
+    print(f"✅ Exported sessions to {path}")
+
+@app.cli.command('import-sessions')
+@click.argument('path')
+@click.option('--batch-size', default=500, show_default=True, help='Sessions inserted per transaction')
+def import_sessions_command(path, batch_size):
+    """Import sessions from an NDJSON export or archive file"""
+    with _open_ndjson(path, 'r') as lines:
+        counts = import_ndjson(lines, batch_size=batch_size)
+    print(f"✅ Imported {counts['sessions_imported']} sessions ({counts['cover_letters_imported']} cover letters), "
+          f"skipped {counts['sessions_skipped']} that already exist")
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
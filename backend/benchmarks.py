@@ -0,0 +1,856 @@
+"""
+Performance Benchmarks
+Micro-benchmarks for the hot paths of the analyzers. Run from the backend folder:
+
+    python benchmarks.py mentions prerequisites interview cover_letters comprehensive skill_sets skill_analytics
+    python benchmarks.py db_writes session_history session_cache session_storage session_export
+    python benchmarks.py response_encoding request_metrics tracing profiler
+"""
+
+from typing import Callable, Dict, List
+import argparse
+import json
+import os
+import random
+import time
+
+
+def _time_call(func: Callable, repeat: int) -> float:
+    """Average wall time of func() in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _report(title: str, rows: Dict[str, str]):
+    print(f"\n{title}")
+    print('-' * len(title))
+    width = max(len(label) for label in rows)
+    for label, value in rows.items():
+        print(f"  {label.ljust(width)}  {value}")
+
+
+def _synthetic_skills(count: int) -> List[str]:
+    base = [
+        'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'go', 'rust',
+        'swift', 'kotlin', 'scala', 'php', 'perl', 'react', 'angular', 'vue', 'django',
+        'flask', 'spring', 'express', 'laravel', 'rails', 'asp.net', 'node.js',
+        'tensorflow', 'pytorch', 'keras', 'mysql', 'postgresql', 'mongodb', 'redis',
+        'oracle', 'sqlite', 'cassandra', 'dynamodb', 'elasticsearch', 'aws', 'azure',
+        'gcp', 'docker', 'kubernetes', 'terraform', 'jenkins', 'ansible', 'git',
+        'machine learning', 'deep learning', 'data analysis', 'ci/cd', 'microservices',
+        'problem solving', 'critical thinking', 'time management', 'communication'
+    ]
+    skills = list(base)
+    while len(skills) < count:
+        skills.append(f'framework{len(skills)}')
+    return skills[:count]
+
+
+def _synthetic_posting(skills: List[str], words: int = 1500, sentence_words: int = 0) -> str:
+    rng = random.Random(42)
+    filler = ['we', 'are', 'looking', 'for', 'a', 'good', 'engineer', 'with', 'strong',
+              'experience', 'building', 'reliable', 'systems', 'and', 'teams', 'going']
+    tokens = []
+    while len(tokens) < words:
+        tokens.append(rng.choice(skills) if rng.random() < 0.15 else rng.choice(filler))
+        if sentence_words and len(tokens) % sentence_words == 0:
+            tokens[-1] += '.'
+    return ' '.join(tokens) + '.'
+
+
+def bench_mentions(sizes=(50, 100, 250, 500), repeat: int = 100):
+    """Per-skill str.count scans vs one tokenized pass (SkillMentionCounter)"""
+    from skill_mentions import SkillMentionCounter
+
+    for missing in sizes:
+        skills = _synthetic_skills(missing)
+        text = _synthetic_posting(skills).lower()
+
+        def per_skill_scan():
+            return {skill: text.count(skill) for skill in skills}
+
+        def single_pass():
+            return SkillMentionCounter(text).counts(skills)
+
+        old_ms = _time_call(per_skill_scan, repeat)
+        new_ms = _time_call(single_pass, repeat)
+        old_go, new_go = per_skill_scan()['go'], single_pass()['go']
+
+        _report(f'Skill mention counting ({missing} missing skills, {len(text)} chars)', {
+            'str.count per skill': f'{old_ms:.3f} ms',
+            'single tokenized pass': f'{new_ms:.3f} ms',
+            '"go" mentions (old/new)': f'{old_go} / {new_go}'
+        })
+
+
+def bench_prerequisites(taxonomy_size: int = 5000, missing: int = 60, repeat: int = 1000):
+    """Compile a large synthetic prerequisite DAG and time roadmap ordering queries"""
+    from datasets.prerequisite_graph import PrerequisiteGraph
+
+    rng = random.Random(7)
+    prerequisites = {
+        f'skill{i}': [f'skill{rng.randrange(i)}' for _ in range(rng.randint(0, 3))] if i else []
+        for i in range(taxonomy_size)
+    }
+
+    start = time.perf_counter()
+    graph = PrerequisiteGraph(prerequisites)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    queries = [rng.sample(list(prerequisites), missing) for _ in range(20)]
+    query_ms = _time_call(lambda: [graph.learning_order(q, pending=q) for q in queries], repeat // 20) / 20
+    avg_closure = sum(len(a) for a in graph.ancestors.values()) / len(graph.ancestors)
+
+    _report(f'Prerequisite graph ({taxonomy_size} skills, {missing} missing per query)', {
+        'compile (order + closures)': f'{build_ms:.1f} ms',
+        'average closure size': f'{avg_closure:.1f}',
+        'learning_order per query': f'{query_ms:.3f} ms'
+    })
+
+
+def bench_interview_encoding(repeat: int = 500):
+    """Interview-prep response: rebuild + jsonify vs spliced pre-serialized fragments"""
+    from ai_interview_prep import AIInterviewPrep
+
+    prep = AIInterviewPrep()
+    args = ('Software Engineer', '', ['Python', 'React', 'AWS', 'Docker', 'SQL'])
+
+    def rebuild_package():
+        # What every call used to do: rebuild the constant sections too
+        package = prep._generate_dynamic_sections(*args)
+        package.update({
+            'study_plan': prep._create_study_plan(package['questions']),
+            'star_method': prep.star_method,
+            'star_examples': prep._create_star_examples(),
+            'common_mistakes': prep._common_mistakes(),
+            'tips': prep._interview_tips()
+        })
+        return package
+
+    def jsonify_pretty():
+        # jsonify under app.run(debug=True): sorted keys, indent=2
+        return json.dumps({'success': True, 'interview_preparation': rebuild_package()},
+                          indent=2, sort_keys=True).encode()
+
+    def jsonify_compact():
+        return json.dumps({'success': True, 'interview_preparation': rebuild_package()},
+                          separators=(',', ':'), sort_keys=True).encode()
+
+    def spliced():
+        return b'{"success":true,"interview_preparation":' + prep.generate_interview_questions_json(*args) + b'}'
+
+    rows = {}
+    for label, func in (('rebuild + jsonify (debug, pretty)', jsonify_pretty),
+                        ('rebuild + jsonify (compact)', jsonify_compact),
+                        ('spliced static fragments', spliced)):
+        rows[label] = f'{_time_call(func, repeat):.3f} ms, {len(func()):,} bytes'
+
+    _report('Interview-prep response encoding', rows)
+
+
+def bench_cover_letters(repeat: int = 500):
+    """All six tones: rendering each tone separately vs the generator's single pass"""
+    from cover_letter_generator import AdvancedCoverLetterGenerator
+
+    generator = AdvancedCoverLetterGenerator()
+    session_data = {
+        'resume_data': {
+            'skills': _synthetic_skills(12),
+            'experience': {'years': '5 years', 'companies': ['Acme Corp']},
+            'education': ['BSc Computer Science'],
+            'personal_info': {}
+        },
+        'job_data': {'description': '', 'skills': [], 'experience_level': 'Mid-Level'},
+        'analysis_results': {'match_score': 72, 'matching_skills': [], 'missing_skills': []}
+    }
+
+    def per_tone():
+        # Extracts the session's inputs again for every tone
+        return {tone: generator.generate_cover_letter(session_data, tone) for tone in generator.templates}
+
+    letters = generator.generate_all_cover_letters(session_data)
+    render_ms = ', '.join(f"{tone} {letter['render_ms']:.3f}" for tone, letter in letters.items())
+
+    _report('Cover letters, all tones', {
+        'generate_cover_letter per tone': f'{_time_call(per_tone, repeat):.3f} ms',
+        'generate_all_cover_letters': f'{_time_call(lambda: generator.generate_all_cover_letters(session_data), repeat):.3f} ms',
+        'per tone (ms)': render_ms
+    })
+
+
+_comprehensive_analyzers = {}
+
+
+def _comprehensive_stage(name: str, resume_data: Dict, job_data: Dict):
+    # Module level so the process pool can pickle it; analyzers are built
+    # before the pool forks and inherited by the workers
+    analyzers = _comprehensive_analyzers
+    if name == 'interview_prep':
+        return analyzers['prep'].generate_interview_questions(
+            'Software Engineer', job_data['description'], resume_data['skills'], seed='bench')
+    if name == 'ai_score':
+        return analyzers['scoring'].calculate_comprehensive_score(resume_data, job_data)
+    if name == 'skill_gaps':
+        return analyzers['gaps'].analyze_skill_gaps(resume_data, job_data)
+    return analyzers['classifier'].classify_job_description(job_data['description'], 'Software Engineer')
+
+
+def bench_comprehensive_stream(repeat: int = 20):
+    """Comprehensive analysis: sequential vs the staged executor on threads and on processes"""
+    from ai_scoring_engine import AIResumeScoringEngine
+    from nlp_job_classifier import NLPJobClassifier
+    from ai_interview_prep import AIInterviewPrep
+    from skill_gap_analyzer import SkillGapAnalyzer
+    from staged_executor import Stage, StagedExecutor
+
+    skills = _synthetic_skills(40)
+    resume_data = {
+        'text': _synthetic_posting(skills, words=600, sentence_words=15),
+        'skills': skills[:15],
+        'experience': {'years': '5 years', 'companies': ['Acme Corp']},
+        'education': ['BSc Computer Science'],
+        'personal_info': {},
+        'sections': ['experience', 'education', 'skills']
+    }
+    # Real postings are split into sentences; the requirement regexes
+    # scan sentence by sentence
+    job_data = {'description': _synthetic_posting(skills, sentence_words=15), 'skills': skills[5:30]}
+
+    _comprehensive_analyzers.update(scoring=AIResumeScoringEngine(), classifier=NLPJobClassifier(),
+                                    prep=AIInterviewPrep(), gaps=SkillGapAnalyzer())
+    names = ['interview_prep', 'ai_score', 'skill_gaps', 'job_classification']
+    stages = {name: Stage(_comprehensive_stage, name, resume_data, job_data) for name in names}
+
+    rows = {name: f'{_time_call(lambda: _comprehensive_stage(name, resume_data, job_data), repeat):.3f} ms'
+            for name in names}
+    rows['sequential'] = f"{_time_call(lambda: [_comprehensive_stage(name, resume_data, job_data) for name in names], repeat):.3f} ms"
+
+    for kind in ('thread', 'process'):
+        executor = StagedExecutor(kind=kind, max_workers=4)
+        list(executor.run(stages))  # start the workers
+        runs = []
+        for _ in range(repeat):
+            timings = [outcome.elapsed_ms for outcome in executor.run(stages)]
+            runs.append((timings[0], timings[-1]))
+        executor.shutdown()
+        rows[f'{kind} pool: first section'] = f'{sum(r[0] for r in runs) / repeat:.3f} ms'
+        rows[f'{kind} pool: all sections'] = f'{sum(r[1] for r in runs) / repeat:.3f} ms'
+
+    _report(f'Comprehensive analysis stages ({os.cpu_count()} CPUs)', rows)
+
+def bench_skill_sets(sizes=(15, 50, 200), repeat: int = 2000):
+    """Lowercased string sets vs taxonomy bitsets for matching/missing/extra"""
+    from skill_taxonomy import skill_taxonomy
+
+    for size in sizes:
+        skills = [skill.title() for skill in _synthetic_skills(size * 2)]
+        resume_skills, job_skills = skills[:size], skills[size // 2:size // 2 + size]
+        # Resume bits are built once per request and reused by every module;
+        # the synthetic skills are outside the taxonomy, so they share extra IDs
+        extra_ids = {}
+        resume_bits = skill_taxonomy.to_bits(resume_skills, extra_ids)
+
+        def string_sets():
+            resume = set(s.lower() for s in resume_skills)
+            job = set(s.lower() for s in job_skills)
+            return job - resume, resume & job, resume - job
+
+        def bitsets():
+            job = skill_taxonomy.to_bits(job_skills, extra_ids)
+            return job & ~resume_bits, resume_bits & job, resume_bits & ~job
+
+        def bitsets_with_names():
+            match = skill_taxonomy.compare(resume_skills, job_skills)
+            return match.names(match.missing), match.names(match.matching), match.names(match.extra)
+
+        _report(f'Skill set comparison ({size} resume / {size} job skills)', {
+            'lowercased string sets': f'{_time_call(string_sets, repeat) * 1000:.1f} us',
+            'bitsets (resume bits reused)': f'{_time_call(bitsets, repeat) * 1000:.1f} us',
+            'bitsets from names, back to names': f'{_time_call(bitsets_with_names, repeat) * 1000:.1f} us'
+        })
+
+
+def bench_skill_analytics(sessions: int = 20000, repeat: int = 5):
+    """"Top missing skills this week": JSON column scan vs indexed session_skill query"""
+    from collections import Counter
+    from datetime import datetime, timedelta
+    from flask import Flask
+    from sqlalchemy import insert
+    from database import db, UserSession, SessionSkill, top_skills, sessions_with_skill
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+
+    rng = random.Random(3)
+    skills = [skill.lower() for skill in _synthetic_skills(300)]
+    now = datetime.utcnow()
+
+    with app.app_context():
+        db.create_all()
+        session_rows, skill_rows = [], []
+        for i in range(sessions):
+            created_at = now - timedelta(days=rng.random() * 90)
+            missing = rng.sample(skills, 8)
+            session_rows.append({'session_id': f's{i}', 'user_id': 'bench', 'created_at': created_at,
+                                 'missing_skills': json.dumps(missing)})
+            skill_rows.extend({'session_id': f's{i}', 'role': 'missing', 'skill': skill,
+                               'created_at': created_at} for skill in missing)
+        db.session.execute(insert(UserSession), session_rows)
+        db.session.execute(insert(SessionSkill), skill_rows)
+        db.session.commit()
+
+        since = now - timedelta(days=7)
+
+        def json_scan():
+            counts = Counter()
+            rows = db.session.query(UserSession.missing_skills)\
+                .filter(UserSession.created_at >= since).all()
+            for missing_skills, in rows:
+                counts.update(json.loads(missing_skills))
+            return counts.most_common(10)
+
+        def json_scan_by_skill():
+            rows = db.session.query(UserSession.session_id, UserSession.missing_skills).all()
+            return [session_id for session_id, missing in rows if 'kubernetes' in json.loads(missing)]
+
+        _report(f'Skill analytics ({sessions:,} sessions, {len(skill_rows):,} skill rows)', {
+            'top missing this week, JSON scan': f'{_time_call(json_scan, repeat):.2f} ms',
+            'top missing this week, indexed SQL': f'{_time_call(lambda: top_skills("missing", since), repeat):.2f} ms',
+            'sessions missing X, JSON scan': f'{_time_call(json_scan_by_skill, repeat):.2f} ms',
+            'sessions missing X, indexed SQL': f'{_time_call(lambda: sessions_with_skill("kubernetes", "missing"), repeat):.2f} ms'
+        })
+
+
+def bench_db_writes(writers: int = 8, readers: int = 4, transactions: int = 150):
+    """Concurrent session writes (plus readers): default SQLite vs WAL + pragmas + pool"""
+    import tempfile
+    import threading
+    from datetime import datetime
+    from sqlalchemy import create_engine, event, insert, select, func
+    from sqlalchemy.exc import OperationalError
+    from database import UserSession, SessionSkill, engine_options, configure_sqlite
+
+    skills = [skill.lower() for skill in _synthetic_skills(60)]
+
+    def run(label, tuned):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+            if tuned:
+                engine = create_engine(url, **engine_options(url))
+                event.listen(engine, 'connect', configure_sqlite)
+            else:
+                engine = create_engine(url)
+            UserSession.__table__.metadata.create_all(engine, tables=[UserSession.__table__, SessionSkill.__table__])
+
+            write_errors, read_errors, reads = [], [], []
+            done = threading.Event()
+
+            def writer(worker):
+                rng = random.Random(worker)
+                for i in range(transactions):
+                    session_id = f'w{worker}-{i}'
+                    now = datetime.utcnow()
+                    try:
+                        with engine.begin() as conn:
+                            conn.execute(insert(UserSession.__table__), {
+                                'session_id': session_id, 'user_id': 'bench', 'created_at': now,
+                                'resume_text': 'x' * 4000})
+                            conn.execute(insert(SessionSkill.__table__), [
+                                {'session_id': session_id, 'role': 'resume', 'skill': skill, 'created_at': now}
+                                for skill in rng.sample(skills, 15)])
+                    except OperationalError as e:
+                        write_errors.append(str(e.orig))
+
+            def reader():
+                query = select(SessionSkill.skill, func.count()).where(SessionSkill.role == 'resume')\
+                    .group_by(SessionSkill.skill)
+                while not done.is_set():
+                    try:
+                        with engine.connect() as conn:
+                            conn.execute(query).all()
+                        reads.append(1)
+                    except OperationalError as e:
+                        read_errors.append(str(e.orig))
+
+            threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+            reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+            start = time.perf_counter()
+            for thread in threads + reader_threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            done.set()
+            for thread in reader_threads:
+                thread.join()
+            engine.dispose()
+
+            committed = writers * transactions - len(write_errors)
+            return (f'{committed / elapsed:,.0f} commits/s, {len(reads) / elapsed:,.0f} reads/s, '
+                    f'{len(write_errors) + len(read_errors)} lock errors')
+
+    _report(f'Concurrent writes ({writers} writer + {readers} reader threads, {transactions} commits each)', {
+        'default (rollback journal, synchronous=FULL)': run('default', False),
+        'WAL, synchronous=NORMAL, mmap, busy_timeout, pool': run('tuned', True)
+    })
+
+
+def bench_session_history(users: int = 500, sessions_per_user: int = 10, repeat: int = 20):
+    """Session history: full rows + to_dict() vs the summary projection"""
+    from datetime import datetime, timedelta
+    from flask import Flask
+    from sqlalchemy import insert
+    from sqlalchemy.orm import selectinload, undefer_group
+    from database import db, UserSession, SessionSkill, CoverLetter, session_summaries
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+
+    rng = random.Random(5)
+    skills = [skill.lower() for skill in _synthetic_skills(120)]
+    now = datetime.utcnow()
+
+    with app.app_context():
+        db.create_all()
+        session_rows, skill_rows, letter_rows = [], [], []
+        for i in range(users * sessions_per_user):
+            session_id, created_at = f's{i}', now - timedelta(minutes=i)
+            resume, job = rng.sample(skills, 40), rng.sample(skills, 15)
+            session_rows.append({
+                'session_id': session_id, 'user_id': f'u{i % users}', 'created_at': created_at,
+                'resume_file_name': 'resume.pdf', 'match_score': rng.randint(0, 100),
+                'resume_text': _synthetic_posting(skills, words=700),
+                'resume_skills': json.dumps(resume), 'job_skills': json.dumps(job),
+                'resume_experience': json.dumps({'years': '5 years', 'companies': ['Acme']}),
+                'resume_education': json.dumps(['BSc']), 'resume_personal_info': json.dumps({}),
+                'resume_sections': json.dumps(['experience']), 'resume_entities': json.dumps({'ORG': ['Acme'] * 30}),
+                'job_description': _synthetic_posting(skills, words=500),
+                'job_analysis': json.dumps({'skills': job, 'summary': 'x' * 3000}),
+                'matching_skills': json.dumps(sorted(set(resume) & set(job))),
+                'missing_skills': json.dumps(sorted(set(job) - set(resume))),
+                'ai_recommendations': json.dumps([{'skill': s, 'resources': ['x' * 80] * 3} for s in job]),
+                'improvement_plan': json.dumps({'weekly_goals': ['x' * 80] * 8})
+            })
+            for role, names in (('resume', resume), ('job', job)):
+                skill_rows.extend({'session_id': session_id, 'role': role, 'skill': name,
+                                   'created_at': created_at} for name in names)
+            letter_rows.extend({'session_id': session_id, 'tone': tone, 'version': 1,
+                                'content': 'Dear Hiring Manager, ' + 'x' * 1500}
+                               for tone in ('professional', 'technical', 'formal'))
+        db.session.execute(insert(UserSession), session_rows)
+        db.session.execute(insert(SessionSkill), skill_rows)
+        db.session.execute(insert(CoverLetter), letter_rows)
+        db.session.commit()
+
+        def full_rows():
+            # What the endpoint did before: every column of ten sessions, decoded
+            sessions = UserSession.query.filter_by(user_id='u7')\
+                .options(undefer_group('details'), selectinload(UserSession.cover_letter_rows))\
+                .order_by(UserSession.created_at.desc()).limit(10).all()
+            payload = json.dumps([session.to_dict() for session in sessions], default=str).encode()
+            db.session.expunge_all()
+            return payload
+
+        def summaries():
+            return json.dumps(session_summaries('u7', limit=10)).encode()
+
+        _report(f'Session history ({users * sessions_per_user:,} sessions)', {
+            'full rows + to_dict()': f'{_time_call(full_rows, repeat):.2f} ms, {len(full_rows()):,} bytes',
+            'summary projection': f'{_time_call(summaries, repeat):.2f} ms, {len(summaries()):,} bytes'
+        })
+
+
+def bench_session_cache(sessions: int = 200, flows: int = 200):
+    """A five-endpoint user flow per session: DB load + decode per request vs the session cache"""
+    from flask import Flask
+    from sqlalchemy import insert
+    from database import db, UserSession
+    from session_cache import SessionCache
+    from session_repository import SessionRepository
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+
+    rng = random.Random(6)
+    skills = [skill.lower() for skill in _synthetic_skills(120)]
+
+    with app.app_context():
+        db.create_all()
+        rows = []
+        for i in range(sessions):
+            resume, job = rng.sample(skills, 40), rng.sample(skills, 15)
+            rows.append({
+                'session_id': f's{i}', 'user_id': f'u{i}', 'resume_file_name': 'resume.pdf',
+                'resume_text': _synthetic_posting(skills, words=700),
+                'resume_skills': json.dumps(resume), 'job_skills': json.dumps(job),
+                'resume_experience': json.dumps({'years': '5 years', 'companies': ['Acme']}),
+                'resume_education': json.dumps(['BSc']), 'resume_personal_info': json.dumps({}),
+                'resume_sections': json.dumps(['experience']), 'resume_entities': json.dumps({'ORG': ['Acme'] * 30}),
+                'job_description': _synthetic_posting(skills, words=500),
+                'job_analysis': json.dumps({'skills': job, 'summary': 'x' * 3000}),
+                'matching_skills': json.dumps(sorted(set(resume) & set(job))),
+                'missing_skills': json.dumps(sorted(set(job) - set(resume)))
+            })
+        db.session.execute(insert(UserSession), rows)
+        db.session.commit()
+
+    def flow(repository: SessionRepository, session_id: str):
+        # analyze-match, ai-score, skill-gaps, interview questions, cover letter
+        for _ in range(5):
+            with app.test_request_context():
+                session = repository.get(session_id)
+                dict(session.resume_data), session.job_skills, session.job_description
+                dict(session.analysis_results)
+
+    session_ids = [f's{rng.randrange(sessions)}' for _ in range(flows)]
+    uncached = SessionRepository(SessionCache(max_bytes=0))
+    cached = SessionRepository(SessionCache())
+
+    def run(repository):
+        for session_id in session_ids:
+            flow(repository, session_id)
+
+    uncached_ms = _time_call(lambda: run(uncached), 1) / flows
+    cached_ms = _time_call(lambda: run(cached), 1) / flows
+    stats = cached.cache.stats()
+    _report(f'Session cache ({flows} five-request flows over {sessions} sessions)', {
+        'load + decode every request': f'{uncached_ms:.2f} ms per flow',
+        'session cache': f'{cached_ms:.2f} ms per flow',
+        'cache': f"{stats['entries']} entries, {stats['bytes']:,} bytes, hit rate {stats['hit_rate']:.0%}"
+    })
+
+
+def bench_session_storage(copies: int = 20, repeat: int = 3):
+    """Session rows as plain JSON text vs compressed: file size, write and read time per session"""
+    import sqlite3
+    import tempfile
+    from sqlalchemy import Column, MetaData, Table, Text, create_engine, insert, select
+    from database import UserSession, CompressedText
+
+    # Real rows from the bundled database, repeated under new session IDs
+    source = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'job_assistant.db')
+    connection = sqlite3.connect(source)
+    connection.row_factory = sqlite3.Row
+    compressed_table = UserSession.__table__
+    # The bundled file predates later columns (version, ...); those get their defaults
+    existing = {row['name'] for row in connection.execute('PRAGMA table_info(user_session)')}
+    names = [column.name for column in compressed_table.columns
+             if column.name in existing and column.name not in ('id', 'created_at')]
+    corpus = [dict(row) for row in connection.execute(f"SELECT {', '.join(names)} FROM user_session")]
+    connection.close()
+    rows = [{**row, 'session_id': f'{row["session_id"]}-{copy}'} for copy in range(copies) for row in corpus]
+
+    plain_table = Table('user_session', MetaData(), *[
+        Column(column.name, Text if isinstance(column.type, CompressedText) else column.type,
+               primary_key=column.primary_key, unique=column.unique)
+        for column in compressed_table.columns
+    ])
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for label, table in (('plain JSON text', plain_table), ('compressed', compressed_table)):
+            path = os.path.join(directory, label.replace(' ', '_') + '.db')
+            engine = create_engine('sqlite:///' + path)
+            table.create(engine)
+
+            start = time.perf_counter()
+            with engine.begin() as conn:
+                for row in rows:
+                    conn.execute(insert(table), row)
+            write_ms = (time.perf_counter() - start) / len(rows) * 1000
+
+            with engine.connect() as conn:
+                conn.exec_driver_sql('VACUUM')
+            size = os.path.getsize(path)
+
+            session_ids = [row['session_id'] for row in rows]
+
+            def read_all():
+                with engine.connect() as conn:
+                    for session_id in session_ids:
+                        conn.execute(select(table).where(table.c.session_id == session_id)).one()
+            read_ms = _time_call(read_all, repeat) / len(rows)
+            engine.dispose()
+
+            results[label] = f'{size:,} bytes, write {write_ms:.3f} ms, read {read_ms:.3f} ms per session'
+
+    _report(f'Session storage ({len(rows):,} sessions, {len(corpus)} real rows x {copies})', results)
+
+
+def bench_session_export(sizes=(1000, 4000)):
+    """Export: to_dict() of every row vs streaming NDJSON (peak memory); import: ORM objects vs batched inserts"""
+    import tempfile
+    import tracemalloc
+    from flask import Flask
+    from database import db, UserSession, CoverLetter, set_session_skills
+    from session_export import export_ndjson, import_ndjson
+
+    rng = random.Random(7)
+    skills = [skill.lower() for skill in _synthetic_skills(120)]
+
+    def peak_mb(func) -> float:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak / 1024 / 1024
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            app = Flask(__name__)
+            app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(directory, f'{size}.db')
+            db.init_app(app)
+            with app.app_context():
+                db.create_all()
+                records = []
+                for i in range(size):
+                    resume, job = rng.sample(skills, 40), rng.sample(skills, 15)
+                    records.append(json.dumps({
+                        'session_id': f's{i}', 'user_id': f'u{i % 100}',
+                        'created_at': '2024-01-01T00:00:00',
+                        'resume_data': {'file_name': 'resume.pdf', 'text': _synthetic_posting(skills, words=700),
+                                        'skills': resume, 'experience': {'years': '5 years'}},
+                        'job_data': {'description': _synthetic_posting(skills, words=500), 'skills': job,
+                                     'full_analysis': {'skills': job, 'summary': 'x' * 3000}},
+                        'analysis_results': {'match_score': 50, 'matching_skills': sorted(set(resume) & set(job)),
+                                             'missing_skills': sorted(set(job) - set(resume))},
+                        'cover_letters': [{'tone': 'professional', 'version': 1, 'content': 'Dear ' + 'x' * 1500}]
+                    }))
+
+                start = time.perf_counter()
+                import_ndjson(records)
+                batched_ms = (time.perf_counter() - start) * 1000
+
+                def orm_import():
+                    # One ORM object per row, as a hand-written loader would
+                    for line in records[:500]:
+                        record = json.loads(line)
+                        session = UserSession(session_id='orm-' + record['session_id'],
+                                              resume_text=record['resume_data']['text'],
+                                              job_description=record['job_data']['description'],
+                                              job_analysis=json.dumps(record['job_data']['full_analysis']))
+                        db.session.add(session)
+                        set_session_skills(session, 'resume', record['resume_data']['skills'])
+                        set_session_skills(session, 'job', record['job_data']['skills'])
+                        db.session.add(CoverLetter(session_id=session.session_id, tone='professional',
+                                                   content=record['cover_letters'][0]['content']))
+                    db.session.commit()
+                orm_ms = _time_call(orm_import, 1) / 500 * size
+                db.session.execute(db.delete(CoverLetter).where(CoverLetter.session_id.like('orm-%')))
+                db.session.execute(db.text("DELETE FROM session_skill WHERE session_id LIKE 'orm-%'"))
+                db.session.execute(db.delete(UserSession).where(UserSession.session_id.like('orm-%')))
+                db.session.commit()
+                db.session.remove()
+
+                def load_all():
+                    rows = UserSession.query.all()
+                    payload = ''.join(json.dumps(row.to_dict()) + '\n' for row in rows)
+                    db.session.remove()
+                    return payload
+
+                def stream():
+                    for chunk in export_ndjson():
+                        pass
+                    db.session.remove()
+
+                results[f'{size:,} sessions'] = (
+                    f"export peak {peak_mb(load_all):.1f} MB (to_dict all) vs {peak_mb(stream):.1f} MB (streamed); "
+                    f"import {orm_ms:.0f} ms (ORM objects, extrapolated) vs {batched_ms:.0f} ms (batched)"
+                )
+
+    _report('Session export / import', results)
+
+
+def bench_response_encoding(repeat: int = 200):
+    """Large API responses: pretty stdlib JSON vs the compact encoder, with and without gzip"""
+    import gzip
+    from flask import Flask
+    from ai_scoring_engine import AIResumeScoringEngine
+    from nlp_job_classifier import NLPJobClassifier
+    from ai_interview_prep import AIInterviewPrep
+    from skill_gap_analyzer import SkillGapAnalyzer
+    from cover_letter_generator import AdvancedCoverLetterGenerator
+    from response_encoding import CompactJSONProvider, GZIP_LEVEL, orjson
+
+    skills = _synthetic_skills(40)
+    resume_data = {
+        'text': _synthetic_posting(skills, words=600, sentence_words=15),
+        'skills': skills[:15],
+        'experience': {'years': '5 years', 'companies': ['Acme Corp']},
+        'education': ['BSc Computer Science'],
+        'personal_info': {},
+        'sections': ['experience', 'education', 'skills']
+    }
+    job_data = {'description': _synthetic_posting(skills, sentence_words=15), 'skills': skills[5:30]}
+    _comprehensive_analyzers.update(scoring=AIResumeScoringEngine(), classifier=NLPJobClassifier(),
+                                    prep=AIInterviewPrep(), gaps=SkillGapAnalyzer())
+    names = ['interview_prep', 'ai_score', 'skill_gaps', 'job_classification']
+    analysis = {name: _comprehensive_stage(name, resume_data, job_data) for name in names}
+
+    generator = AdvancedCoverLetterGenerator()
+    letters = generator.generate_all_cover_letters({
+        'resume_data': resume_data,
+        'job_data': {**job_data, 'experience_level': 'Mid-Level'},
+        'analysis_results': {'match_score': 72, 'matching_skills': skills[5:15], 'missing_skills': skills[15:30]}
+    })
+
+    payloads = {
+        'interview prep': {'success': True, 'interview_preparation': analysis['interview_prep']},
+        'comprehensive analysis': {'success': True, 'comprehensive_analysis': analysis},
+        'all cover letters': {'success': True, 'cover_letters': letters}
+    }
+
+    provider = CompactJSONProvider(Flask(__name__))
+    encoder = 'orjson' if orjson is not None else 'stdlib'
+    for label, payload in payloads.items():
+        def pretty():
+            # jsonify under app.run(debug=True): sorted keys, indent=2
+            return json.dumps(payload, indent=2, sort_keys=True).encode()
+
+        def compact():
+            return provider._encode(payload)
+
+        def compact_gzip():
+            return gzip.compress(provider._encode(payload), compresslevel=GZIP_LEVEL, mtime=0)
+
+        _report(f'Response encoding: {label}', {
+            'pretty stdlib json': f'{len(pretty()):,} bytes, {_time_call(pretty, repeat):.3f} ms',
+            f'compact ({encoder})': f'{len(compact()):,} bytes, {_time_call(compact, repeat):.3f} ms',
+            f'compact + gzip level {GZIP_LEVEL}': f'{len(compact_gzip()):,} bytes, {_time_call(compact_gzip, repeat):.3f} ms'
+        })
+
+
+def bench_request_metrics(routes: int = 30, repeat: int = 100000):
+    """Metrics hooks: added time per request, and the cost of rendering a scrape"""
+    from flask import Flask, Response
+    from metrics import RequestMetrics
+
+    app = Flask(__name__)
+    metrics = RequestMetrics()
+    for i in range(routes):
+        app.add_url_rule(f'/api/route{i}/<item_id>', f'route{i}', lambda item_id: '')
+    response = Response()
+
+    def hooks():
+        metrics._start()
+        metrics._finish(response)
+
+    with app.test_request_context('/api/route0/abc'):
+        hooks()
+        per_request_us = _time_call(hooks, repeat) * 1000
+    # Fill every route with a few status codes for a realistic scrape
+    for i in range(routes):
+        for status in (200, 400, 500):
+            response.status_code = status
+            with app.test_request_context(f'/api/route{i}/abc'):
+                hooks()
+
+    _report(f'Request metrics ({routes} routes)', {
+        'start + finish hooks': f'{per_request_us:.2f} us per request',
+        'render /api/metrics': f'{_time_call(metrics.render, 200):.3f} ms, {len(metrics.render()):,} bytes'
+    })
+
+
+def bench_tracing(repeat: int = 100000):
+    """Tracing: cost of a traced call outside a trace, inside one, and of a classifier run's span tree"""
+    from nlp_job_classifier import NLPJobClassifier
+    from tracing import trace, traced
+
+    @traced('bench.noop')
+    def noop():
+        pass
+
+    def untraced():
+        pass
+
+    rows = {
+        'plain call': f'{_time_call(untraced, repeat) * 1000:.2f} us',
+        'traced call, no active trace': f'{_time_call(noop, repeat) * 1000:.2f} us'
+    }
+    with trace('bench') as root:
+        rows['traced call, recording'] = f'{_time_call(noop, repeat) * 1000:.2f} us'
+        root.children.clear()
+
+    classifier = NLPJobClassifier()
+    skills = _synthetic_skills(40)
+    posting = _synthetic_posting(skills, sentence_words=15)
+
+    def classify_traced():
+        with trace('bench'):
+            classifier.classify_job_description(posting, 'Software Engineer')
+
+    rows['classify, no trace'] = f"{_time_call(lambda: classifier.classify_job_description(posting, 'Software Engineer'), 50):.3f} ms"
+    rows['classify, traced (10 spans)'] = f'{_time_call(classify_traced, 50):.3f} ms'
+    _report('Tracing overhead', rows)
+
+
+def bench_profiler(repeat: int = 100000):
+    """Profiler hooks: cost per request with no window open, and with cProfile on a classifier request"""
+    from flask import Flask
+    from nlp_job_classifier import NLPJobClassifier
+    from profiling import RequestProfiler
+
+    app = Flask(__name__)
+    app.add_url_rule('/api/classify', 'classify', lambda: '')
+    profiler = RequestProfiler()
+
+    def hooks():
+        profiler._start_request()
+        profiler._end_request(None)
+
+    classifier = NLPJobClassifier()
+    posting = _synthetic_posting(_synthetic_skills(40), sentence_words=15)
+
+    def classify_request():
+        profiler._start_request()
+        classifier.classify_job_description(posting, 'Software Engineer')
+        profiler._end_request(None)
+
+    rows = {}
+    with app.test_request_context('/api/classify'):
+        rows['hooks, profiler off'] = f'{_time_call(hooks, repeat) * 1000:.2f} us per request'
+        rows['classify request, profiler off'] = f'{_time_call(classify_request, 50):.3f} ms'
+        profiler.start('cprofile', requests=1000)
+        rows['classify request, cProfile'] = f'{_time_call(classify_request, 50):.3f} ms'
+        profiler.stop()
+    _report('Profiler overhead', rows)
+
+
+BENCHMARKS = {
+    'mentions': bench_mentions,
+    'prerequisites': bench_prerequisites,
+    'interview': bench_interview_encoding,
+    'cover_letters': bench_cover_letters,
+    'comprehensive': bench_comprehensive_stream,
+    'skill_sets': bench_skill_sets,
+    'skill_analytics': bench_skill_analytics,
+    'db_writes': bench_db_writes,
+    'session_history': bench_session_history,
+    'session_cache': bench_session_cache,
+    'session_storage': bench_session_storage,
+    'session_export': bench_session_export,
+    'response_encoding': bench_response_encoding,
+    'request_metrics': bench_request_metrics,
+    'tracing': bench_tracing,
+    'profiler': bench_profiler
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run backend performance benchmarks')
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
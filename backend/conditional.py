@@ -0,0 +1,36 @@
+"""
+Conditional Responses
+ETag and Last-Modified validators, and 304 Not Modified for polled read endpoints
+"""
+
+from typing import Optional
+from datetime import datetime
+import hashlib
+
+from flask import Response, request
+from werkzeug.http import is_resource_modified
+
+
+def make_etag(*parts) -> str:
+    """Short, stable tag for whatever identifies a response's content"""
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=12).hexdigest()
+
+
+def not_modified(etag: str, last_modified: Optional[datetime]) -> Optional[Response]:
+    """
+    A 304 response if the request's If-None-Match (or, without one,
+    If-Modified-Since) shows the client already has this version, else None.
+    Check this before building the response body.
+    """
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return with_validators(Response(status=304), etag, last_modified)
+
+
+def with_validators(response: Response, etag: str, last_modified: Optional[datetime]) -> Response:
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Browsers may keep the response but must revalidate before reusing it
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
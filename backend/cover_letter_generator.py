@@ -1,107 +1,161 @@
 import random
+import time
 from datetime import datetime
 from datasets.skills_dataset import SkillsDataset
 
+
+class CompiledTemplate:
+    """
+    A cover letter template compiled once into a bound str.format_map.
+    Inputs that are missing fall back to this template's own defaults.
+    """
+    __slots__ = ('defaults', '_format')
+
+    def __init__(self, text, defaults=None):
+        self.defaults = defaults or {}
+        self._format = text.format_map
+
+    def __call__(self, inputs):
+        return self._format({**self.defaults, **inputs})
+
+
 class AdvancedCoverLetterGenerator:
+    # Skills highlighted by the technical template
+    TECHNICAL_KEYWORDS = ['python', 'java', 'react', 'aws', 'docker', 'sql', 'machine learning']
+
     def __init__(self):
         self.skills_dataset = SkillsDataset()
         self.templates = self._load_templates()
 
     def _load_templates(self):
-        """Load comprehensive cover letter templates"""
+        """Load comprehensive cover letter templates, compiled once"""
         return {
             'professional': [
-                self._professional_template_1,
-                self._professional_template_2
+                self._professional_template_1(),
+                self._professional_template_2()
             ],
             'enthusiastic': [
-                self._enthusiastic_template_1,
-                self._enthusiastic_template_2
+                self._enthusiastic_template_1(),
+                self._enthusiastic_template_2()
             ],
             'formal': [
-                self._formal_template_1
+                self._formal_template_1()
             ],
             'conversational': [
-                self._conversational_template_1,
-                self._conversational_template_2
+                self._conversational_template_1(),
+                self._conversational_template_2()
             ],
             'technical': [
-                self._technical_template_1
+                self._technical_template_1()
             ],
             'creative': [
-                self._creative_template_1
+                self._creative_template_1()
             ]
         }
 
     def generate_cover_letter(self, session_data, tone='professional', customizations=None):
         """Generate cover letter based on session data"""
+        return self._render(self._extract_inputs(session_data), tone, customizations)
+
+    def generate_all_cover_letters(self, session_data):
+        """Generate cover letters in all tones for the session"""
+        return dict(self.iter_all_cover_letters(session_data))
+
+    def iter_all_cover_letters(self, session_data):
+        """
+        Render every tone in turn from inputs extracted once. Yields
+        (tone, cover_letter) pairs as each one is ready; a render is a single
+        format call, so threads only added hand-off overhead.
+        """
+        inputs = self._extract_inputs(session_data)
+        for tone in self.templates:
+            yield tone, self._render(inputs, tone)
+
+    def _render(self, inputs, tone, customizations=None):
         if customizations is None:
             customizations = {}
 
-        resume_data = session_data['resume_data']
-        job_data = session_data['job_data']
-        analysis = session_data['analysis_results']
+        start = time.perf_counter()
 
         # Select template based on tone
-        template_func = random.choice(self.templates.get(tone, self.templates['professional']))
+        template = random.choice(self.templates.get(tone, self.templates['professional']))
 
         # Generate cover letter
-        cover_letter = template_func(resume_data, job_data, analysis, customizations)
+        cover_letter = template(inputs)
 
         return {
             'content': cover_letter,
             'tone': tone,
             'customizations': customizations,
             'generated_at': datetime.now().isoformat(),
-            'word_count': len(cover_letter.split())
+            'word_count': len(cover_letter.split()),
+            'render_ms': round((time.perf_counter() - start) * 1000, 3)
         }
 
-    def generate_all_cover_letters(self, session_data):
-        """Generate cover letters in all tones for the session"""
-        all_cover_letters = {}
-
-        for tone in self.templates.keys():
-            all_cover_letters[tone] = self.generate_cover_letter(session_data, tone)
-
-        return all_cover_letters
+    def _extract_inputs(self, session_data):
+        """
+        Everything the templates read from the session, computed once per
+        session. Values that are not available are left out; each template
+        supplies its own default wording for them.
+        """
+        resume_data = session_data['resume_data']
+        analysis = session_data['analysis_results']
 
-    def _professional_template_1(self, resume_data, job_data, analysis, customizations):
         skills = resume_data.get('skills', [])
-        experience = resume_data.get('experience', {}).get('years', 'relevant')
+        experience = resume_data.get('experience', {})
         education = resume_data.get('education', [])
+        companies = experience.get('companies', [])
+        technical_skills = [s for s in skills if any(tech in s.lower() for tech in self.TECHNICAL_KEYWORDS)]
+
+        def joined(items, count):
+            return ', '.join(items[:count]) if items else None
+
+        def nth(items, index):
+            return items[index] if len(items) > index else None
+
+        inputs = {
+            'years': experience.get('years'),
+            'education': education[0] if education else None,
+            'company_experience': f" at {companies[0]}" if companies else "",
+            'match_score': analysis.get('match_score', 0),
+            'skill_1': nth(skills, 0),
+            'skill_2': nth(skills, 1),
+            'skills_2': joined(skills, 2),
+            'skills_3': joined(skills, 3),
+            'skills_4': joined(skills, 4),
+            'technical_skills_4': joined(technical_skills, 4),
+            'technical_skill_1': nth(technical_skills, 0),
+            'technical_skill_2': nth(technical_skills, 1),
+            'technical_skill_3': nth(technical_skills, 2)
+        }
+        return {field: value for field, value in inputs.items() if value is not None}
 
-        # Extract first education entry if available
-        education_text = education[0] if education else "my educational background"
-
-        # Get top matching skills
-        top_skills = skills[:3] if skills else ["technical skills"]
-
-        return f"""Dear Hiring Manager,
+    def _professional_template_1(self):
+        return CompiledTemplate("""Dear Hiring Manager,
 
-I am writing to express my keen interest in the position at your company. With {experience} of professional experience and expertise in {', '.join(top_skills)}, I am confident in my ability to contribute significantly to your team.
+I am writing to express my keen interest in the position at your company. With {years} of professional experience and expertise in {skills_3}, I am confident in my ability to contribute significantly to your team.
 
-My background in {education_text} has provided me with a strong foundation, which I have successfully applied in various professional settings. I have consistently demonstrated my ability to deliver high-quality solutions and adapt to evolving technological landscapes.
+My background in {education} has provided me with a strong foundation, which I have successfully applied in various professional settings. I have consistently demonstrated my ability to deliver high-quality solutions and adapt to evolving technological landscapes.
 
-What particularly excites me about this opportunity is the alignment between your requirements and my skill set. I am eager to bring my experience in {top_skills[0] if top_skills else 'key technologies'} to your organization and contribute to your ongoing success.
+What particularly excites me about this opportunity is the alignment between your requirements and my skill set. I am eager to bring my experience in {skill_1} to your organization and contribute to your ongoing success.
 
 I am enthusiastic about the possibility of discussing how my qualifications can benefit your team. Thank you for considering my application.
 
 Sincerely,
 [Your Name]
-[Your Contact Information]"""
-
-    def _professional_template_2(self, resume_data, job_data, analysis, customizations):
-        skills = resume_data.get('skills', [])
-        experience = resume_data.get('experience', {}).get('years', 'substantial')
-        companies = resume_data.get('experience', {}).get('companies', [])
-
-        company_experience = f" at {companies[0]}" if companies else ""
+[Your Contact Information]""", {
+            'years': 'relevant',
+            'education': 'my educational background',
+            'skills_3': 'technical skills',
+            'skill_1': 'technical skills'
+        })
 
-        return f"""Dear Recruitment Team,
+    def _professional_template_2(self):
+        return CompiledTemplate("""Dear Recruitment Team,
 
-I am excited to submit my application for the position at your esteemed organization. With {experience} of experience{company_experience} and proficiency in {', '.join(skills[:4]) if skills else 'relevant technologies'}, I believe I possess the ideal combination of skills and experience for this role.
+I am excited to submit my application for the position at your esteemed organization. With {years} of experience{company_experience} and proficiency in {skills_4}, I believe I possess the ideal combination of skills and experience for this role.
 
-Throughout my career, I have developed strong capabilities in {', '.join(skills[:2]) if skills else 'key areas'} and have successfully implemented solutions that drive efficiency and innovation. My hands-on experience with {skills[0] if skills else 'modern technologies'} has prepared me to make an immediate impact.
+Throughout my career, I have developed strong capabilities in {skills_2} and have successfully implemented solutions that drive efficiency and innovation. My hands-on experience with {skill_1} has prepared me to make an immediate impact.
 
 I have been following your company's work and am impressed by your commitment to excellence. The opportunity to contribute to your team while growing professionally is genuinely appealing.
 
@@ -109,15 +163,17 @@ I look forward to the possibility of discussing my application further and how I
 
 Best regards,
 [Your Name]
-[Your Email] | [Your Phone] | [Your LinkedIn]"""
-
-    def _enthusiastic_template_1(self, resume_data, job_data, analysis, customizations):
-        skills = resume_data.get('skills', [])
-        match_score = analysis.get('match_score', 0)
+[Your Email] | [Your Phone] | [Your LinkedIn]""", {
+            'years': 'substantial',
+            'skills_4': 'relevant technologies',
+            'skills_2': 'key areas',
+            'skill_1': 'modern technologies'
+        })
 
-        return f"""Dear Hiring Manager,
+    def _enthusiastic_template_1(self):
+        return CompiledTemplate("""Dear Hiring Manager,
 
-I am absolutely thrilled to apply for the position at your innovative company! With my passion for {skills[0] if skills else 'technology'} and demonstrated expertise in {', '.join(skills[:3]) if skills else 'key skills'}, I am incredibly excited about the opportunity to bring my energy and skills to your team.
+I am absolutely thrilled to apply for the position at your innovative company! With my passion for {skill_1} and demonstrated expertise in {skills_3}, I am incredibly excited about the opportunity to bring my energy and skills to your team.
 
 I've been admiring your company's amazing work, and I'm genuinely excited about the chance to contribute to your success! My background aligns {match_score}% with your requirements, and I'm confident I can hit the ground running.
 
@@ -127,21 +183,21 @@ I can't wait to discuss how my skills and enthusiasm can benefit your team. Let'
 
 Warmly,
 [Your Name]
-[Your Contact Details]"""
+[Your Contact Details]""", {
+            'skill_1': 'technology',
+            'skills_3': 'key skills',
+            'match_score': 0
+        })
 
-    def _technical_template_1(self, resume_data, job_data, analysis, customizations):
-        skills = resume_data.get('skills', [])
-        technical_skills = [s for s in skills if any(tech in s.lower() for tech in
-                        ['python', 'java', 'react', 'aws', 'docker', 'sql', 'machine learning'])]
-
-        return f"""Dear Technical Hiring Committee,
+    def _technical_template_1(self):
+        return CompiledTemplate("""Dear Technical Hiring Committee,
 
-I am writing to apply for the technical position at your organization. With extensive experience in {', '.join(technical_skills[:4]) if technical_skills else 'software development'}, I am confident in my ability to contribute to your technical projects and architecture decisions.
+I am writing to apply for the technical position at your organization. With extensive experience in {technical_skills_4}, I am confident in my ability to contribute to your technical projects and architecture decisions.
 
 My technical expertise includes:
-• {technical_skills[0] if len(technical_skills) > 0 else 'Software Development'}
-• {technical_skills[1] if len(technical_skills) > 1 else 'System Architecture'}
-• {technical_skills[2] if len(technical_skills) > 2 else 'Problem Solving'}
+• {technical_skill_1}
+• {technical_skill_2}
+• {technical_skill_3}
 
 I have successfully implemented scalable solutions and optimized system performance in previous roles. My approach combines technical excellence with practical business understanding.
 
@@ -151,16 +207,19 @@ I look forward to the opportunity to discuss my technical qualifications and how
 
 Sincerely,
 [Your Name]
-[GitHub Profile] | [Technical Blog]"""
-
-    def _conversational_template_1(self, resume_data, job_data, analysis, customizations):
-        skills = resume_data.get('skills', [])
+[GitHub Profile] | [Technical Blog]""", {
+            'technical_skills_4': 'software development',
+            'technical_skill_1': 'Software Development',
+            'technical_skill_2': 'System Architecture',
+            'technical_skill_3': 'Problem Solving'
+        })
 
-        return f"""Hello there!
+    def _conversational_template_1(self):
+        return CompiledTemplate("""Hello there!
 
-I came across the opening at your company and was immediately interested! With my experience in {', '.join(skills[:3]) if skills else 'the field'}, I think I could be a great fit for your team.
+I came across the opening at your company and was immediately interested! With my experience in {skills_3}, I think I could be a great fit for your team.
 
-I really enjoy working with {skills[0] if skills else 'technology'} and have built up some solid experience with {skills[1] if len(skills) > 1 else 'various tools'} along the way. I'm always eager to take on new challenges and learn from talented colleagues.
+I really enjoy working with {skill_1} and have built up some solid experience with {skill_2} along the way. I'm always eager to take on new challenges and learn from talented colleagues.
 
 I'd love the chance to chat about how I can help your team succeed. I'm available for a call anytime next week to discuss this opportunity further.
 
@@ -168,10 +227,14 @@ Looking forward to hearing from you!
 
 Best,
 [Your Name]
-[Your Phone Number] | [Your Email]"""
+[Your Phone Number] | [Your Email]""", {
+            'skills_3': 'the field',
+            'skill_1': 'technology',
+            'skill_2': 'various tools'
+        })
 
-    def _formal_template_1(self, resume_data, job_data, analysis, customizations):
-        return f"""Dear Sir/Madam,
+    def _formal_template_1(self):
+        return CompiledTemplate("""Dear Sir/Madam,
 
 I am writing to submit my application for the available position within your organization. My credentials include substantial professional experience and demonstrated proficiency in relevant technologies.
 
@@ -180,16 +243,14 @@ My academic and professional background has provided me with the theoretical fou
 I respectfully request the opportunity to discuss my qualifications further and elaborate on how I may be of service to your esteemed institution.
 
 Yours faithfully,
-[Your Name]"""
+[Your Name]""")
 
-    def _creative_template_1(self, resume_data, job_data, analysis, customizations):
-        skills = resume_data.get('skills', [])
-
-        return f"""Dear Innovative Team,
+    def _creative_template_1(self):
+        return CompiledTemplate("""Dear Innovative Team,
 
-I'm reaching out with genuine excitement about the opportunity to join your forward-thinking organization! With my background in {', '.join(skills[:2]) if skills else 'creative problem-solving'}, I'm confident I can bring fresh perspectives and impactful solutions to your projects.
+I'm reaching out with genuine excitement about the opportunity to join your forward-thinking organization! With my background in {skills_2}, I'm confident I can bring fresh perspectives and impactful solutions to your projects.
 
-What draws me to your company is your reputation for innovation and excellence. I'm passionate about creating meaningful work and believe my skills in {skills[0] if skills else 'technology'} align perfectly with your vision.
+What draws me to your company is your reputation for innovation and excellence. I'm passionate about creating meaningful work and believe my skills in {skill_1} align perfectly with your vision.
 
 I'm not just looking for a job - I'm seeking to join a team where I can make a real difference, grow professionally, and contribute to something extraordinary.
 
@@ -197,24 +258,28 @@ Let's create something amazing together!
 
 Cheers,
 [Your Name]
-[Your Portfolio] | [Your Creative Work]"""
-
-    def _enthusiastic_template_2(self, resume_data, job_data, analysis, customizations):
-        skills = resume_data.get('skills', [])
+[Your Portfolio] | [Your Creative Work]""", {
+            'skills_2': 'creative problem-solving',
+            'skill_1': 'technology'
+        })
 
-        return f"""Dear Team,
+    def _enthusiastic_template_2(self):
+        return CompiledTemplate("""Dear Team,
 
-I couldn't be more excited to apply for this position! The moment I saw your job posting, I knew it was the perfect match for my skills in {', '.join(skills[:2]) if skills else 'technology and innovation'}.
+I couldn't be more excited to apply for this position! The moment I saw your job posting, I knew it was the perfect match for my skills in {skills_2}.
 
-I bring not just technical expertise but also genuine passion for creating exceptional solutions. My experience with {skills[0] if skills else 'modern technologies'} has taught me that the best results come from combining technical skill with creative thinking.
+I bring not just technical expertise but also genuine passion for creating exceptional solutions. My experience with {skill_1} has taught me that the best results come from combining technical skill with creative thinking.
 
 I'm absolutely convinced that I can bring value to your team from day one. Let's schedule a conversation and explore how we can achieve great things together!
 
 Excitedly,
-[Your Name]"""
+[Your Name]""", {
+            'skills_2': 'technology and innovation',
+            'skill_1': 'modern technologies'
+        })
 
-    def _conversational_template_2(self, resume_data, job_data, analysis, customizations):
-        return f"""Hi Team,
+    def _conversational_template_2(self):
+        return CompiledTemplate("""Hi Team,
 
 Hope you're having a great week! I'm reaching out about the position because it looks like an amazing opportunity that aligns perfectly with my background.
 
@@ -225,4 +290,4 @@ I'd love to grab a virtual coffee and chat about how I can contribute to your su
 Looking forward to connecting!
 
 Best,
-[Your Name]"""
+[Your Name]""")
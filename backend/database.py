@@ -1,41 +1,100 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func, exists, or_, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import undefer_group
+from sqlalchemy.orm.attributes import flag_modified
 from datetime import datetime
 import json
 import os
+import zlib
+from skill_taxonomy import skill_taxonomy
 
 db = SQLAlchemy()
 
+class CompressedText(db.TypeDecorator):
+    """
+    Text (plain or JSON) stored as a zlib-compressed blob. The model still
+    reads and writes str. Each blob starts with a format byte: short values
+    that don't shrink are stored uncompressed. Values written before this
+    type existed come back from the database as str and are returned as-is.
+    """
+    impl = db.LargeBinary
+    cache_ok = True
+
+    PLAIN = b'\x00'
+    ZLIB = b'\x01'
+    MIN_COMPRESS_BYTES = 128
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        data = value.encode('utf-8')
+        if len(data) >= self.MIN_COMPRESS_BYTES:
+            compressed = zlib.compress(data)
+            if len(compressed) < len(data):
+                return self.ZLIB + compressed
+        return self.PLAIN + data
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        value = bytes(value)
+        if value[:1] == self.ZLIB:
+            return zlib.decompress(value[1:]).decode('utf-8')
+        return value[1:].decode('utf-8')
+
 class UserSession(db.Model):
+    __table_args__ = (
+        # Session history: one user's sessions, newest first
+        db.Index('ix_user_session_user_created', 'user_id', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.String(100), unique=True, nullable=False)
     user_id = db.Column(db.String(100), nullable=False, default='anonymous')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    # Resume Data (Stored as JSON strings)
-    resume_text = db.Column(db.Text)
-    resume_skills = db.Column(db.Text)
-    resume_experience = db.Column(db.Text)
-    resume_education = db.Column(db.Text)
-    resume_personal_info = db.Column(db.Text)
-    resume_sections = db.Column(db.Text)
-    resume_entities = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # Bumped on every change to the session or its cover letters (ETags)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime)
+    # Bumped by each interview-question regeneration; part of the sampling seed
+    interview_generation = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Scores added to the score distribution (JSON), so a session is counted once
+    recorded_scores = db.Column(db.Text)
+
+    # Large columns are deferred: they load (together, in one query) only
+    # when one of them is first accessed. group='details' below.
+
+    # Resume Data (Stored as JSON strings, compressed)
+    resume_text = db.deferred(db.Column(CompressedText), group='details')
+    resume_skills = db.Column(CompressedText)
+    resume_experience = db.Column(CompressedText)
+    resume_education = db.Column(CompressedText)
+    resume_personal_info = db.Column(CompressedText)
+    resume_sections = db.Column(CompressedText)
+    resume_entities = db.deferred(db.Column(CompressedText), group='details')
     resume_file_name = db.Column(db.String(255))
 
     # Job Data
-    job_description = db.Column(db.Text)
-    job_skills = db.Column(db.Text)
+    job_description = db.deferred(db.Column(CompressedText), group='details')
+    job_skills = db.Column(CompressedText)
     job_experience_level = db.Column(db.String(100))
-    job_analysis = db.Column(db.Text)  # Full job analysis JSON
+    job_analysis = db.deferred(db.Column(CompressedText), group='details')  # Full job analysis JSON
 
     # Analysis Results
     match_score = db.Column(db.Integer)
-    matching_skills = db.Column(db.Text)
-    missing_skills = db.Column(db.Text)
-    ai_recommendations = db.Column(db.Text)
-    improvement_plan = db.Column(db.Text)
+    matching_skills = db.Column(CompressedText)
+    missing_skills = db.Column(CompressedText)
+    ai_recommendations = db.deferred(db.Column(CompressedText), group='details')
+    improvement_plan = db.deferred(db.Column(CompressedText), group='details')
+
+    # Legacy JSON blob of cover letters by tone; moved into CoverLetter rows
+    # at startup and no longer written
+    cover_letters = db.deferred(db.Column(db.Text))
 
-    # Cover Letters (Store multiple versions)
-    cover_letters = db.Column(db.Text)  # JSON of different tone cover letters
+    cover_letter_rows = db.relationship('CoverLetter', backref='session', lazy='select',
+                                        order_by='CoverLetter.version')
+    skill_rows = db.relationship('SessionSkill', lazy='select', cascade='all, delete-orphan')
 
     def to_dict(self):
         return {
@@ -65,29 +124,478 @@ class UserSession(db.Model):
                 'ai_recommendations': json.loads(self.ai_recommendations) if self.ai_recommendations else [],
                 'improvement_plan': json.loads(self.improvement_plan) if self.improvement_plan else {}
             },
-            'cover_letters': json.loads(self.cover_letters) if self.cover_letters else {}
+            'cover_letters': latest_by_tone(self.cover_letter_rows)
         }
 
-def init_db(app):
+@event.listens_for(UserSession, 'before_update')
+def _bump_session_version(mapper, connection, session):
+    # Incremented in SQL as part of the ORM's own UPDATE, not read-modify-write:
+    # the UPDATE takes the write lock, so concurrent writers to one session
+    # each get their own version. The attribute is expired by the flush and
+    # loaded again only if read.
+    session.version = UserSession.version + 1
+    session.updated_at = datetime.utcnow()
+
+class CoverLetter(db.Model):
+    """One generated cover letter; each regeneration of a tone adds a version"""
+    __table_args__ = (
+        db.UniqueConstraint('session_id', 'tone', 'version', name='uq_cover_letter_version'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(100), db.ForeignKey('user_session.session_id'), nullable=False)
+    tone = db.Column(db.String(50), nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    content = db.Column(db.Text, nullable=False)
+    word_count = db.Column(db.Integer)
+    customizations = db.Column(db.Text)  # JSON
+    render_ms = db.Column(db.Float)
+    generated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'content': self.content,
+            'tone': self.tone,
+            'version': self.version,
+            'customizations': json.loads(self.customizations) if self.customizations else {},
+            'generated_at': self.generated_at.isoformat() if self.generated_at else None,
+            'word_count': self.word_count,
+            'render_ms': self.render_ms
+        }
+
+class SessionSkill(db.Model):
+    """
+    One skill of a session in one role (resume, job, matching or missing).
+    Mirrors the JSON skill columns so skill questions are indexed SQL.
+    """
+    __table_args__ = (
+        # "Sessions missing kubernetes", newest first
+        db.Index('ix_session_skill_role_skill', 'role', 'skill', 'created_at'),
+        # "Most common missing skills this week" (covers the GROUP BY)
+        db.Index('ix_session_skill_role_created', 'role', 'created_at', 'skill'),
+    )
+
+    session_id = db.Column(db.String(100), db.ForeignKey('user_session.session_id'), primary_key=True)
+    role = db.Column(db.String(10), primary_key=True)
+    skill = db.Column(db.String(255), primary_key=True)  # canonical, lowercase
+    created_at = db.Column(db.DateTime, nullable=False)  # copy of the session's
+
+# Which JSON column each session_skill role mirrors
+SKILL_ROLE_COLUMNS = {
+    'resume': 'resume_skills',
+    'job': 'job_skills',
+    'matching': 'matching_skills',
+    'missing': 'missing_skills'
+}
+
+def set_session_skills(session, role, skills):
+    """Store a skill list in its JSON column and its session_skill rows"""
+    setattr(session, SKILL_ROLE_COLUMNS[role], json.dumps(skills))
+    _sync_skill_rows(session, role, skills)
+
+def canonical_skill_names(skills):
+    """The session_skill names of a skill list: canonical, deduplicated"""
+    return {skill_taxonomy.canonical(skill)[:255] for skill in skills if skill and skill.strip()}
+
+def _sync_skill_rows(session, role, skills):
+    # Only rows that changed are written; other roles are untouched
+    if session.created_at is None:
+        session.created_at = datetime.utcnow()
+    names = canonical_skill_names(skills)
+
+    current = {row.skill: row for row in session.skill_rows if row.role == role}
+    for name, row in current.items():
+        if name not in names:
+            session.skill_rows.remove(row)
+    for name in sorted(names - set(current)):
+        session.skill_rows.append(SessionSkill(role=role, skill=name, created_at=session.created_at))
+
+def top_skills(role, since=None, limit=10):
+    """[(skill, session count)] for a role, most common first"""
+    sessions = func.count(SessionSkill.session_id)
+    query = db.session.query(SessionSkill.skill, sessions).filter(SessionSkill.role == role)
+    if since is not None:
+        query = query.filter(SessionSkill.created_at >= since)
+    return query.group_by(SessionSkill.skill)\
+        .order_by(sessions.desc(), SessionSkill.skill)\
+        .limit(limit)\
+        .all()
+
+def sessions_with_skill(skill, role, limit=50):
+    """IDs of the newest sessions that have a skill in a role"""
+    rows = db.session.query(SessionSkill.session_id)\
+        .filter(SessionSkill.role == role, SessionSkill.skill == skill_taxonomy.canonical(skill))\
+        .order_by(SessionSkill.created_at.desc())\
+        .limit(limit)\
+        .all()
+    return [session_id for session_id, in rows]
+
+def session_summaries(user_id, limit=10):
+    """
+    Session history rows straight from SQL: a few small columns and
+    indexed counts, no large columns and no JSON decoding
+    """
+    def skill_count(role):
+        return db.select(func.count())\
+            .where(SessionSkill.session_id == UserSession.session_id, SessionSkill.role == role)\
+            .scalar_subquery()
+
+    tones = db.select(func.count(func.distinct(CoverLetter.tone)))\
+        .where(CoverLetter.session_id == UserSession.session_id)\
+        .scalar_subquery()
+
+    rows = db.session.query(
+        UserSession.id,
+        UserSession.session_id,
+        UserSession.resume_file_name,
+        UserSession.created_at,
+        UserSession.match_score,
+        UserSession.job_experience_level,
+        skill_count('resume').label('resume_skills_count'),
+        skill_count('job').label('job_skills_count'),
+        skill_count('matching').label('matching_skills_count'),
+        skill_count('missing').label('missing_skills_count'),
+        tones.label('cover_letter_count')
+    ).filter(UserSession.user_id == user_id)\
+        .order_by(UserSession.created_at.desc())\
+        .limit(limit)\
+        .all()
+
+    return [{
+        **row._asdict(),
+        'created_at': row.created_at.isoformat() if row.created_at else None
+    } for row in rows]
+
+def latest_by_tone(rows):
+    """Newest version of each tone, from rows ordered by version"""
+    return {row.tone: row.to_dict() for row in rows}
+
+def save_cover_letters(session_id, cover_letters, retries=3):
+    """
+    Insert cover letters (dicts from the generator) as the next version of
+    their tone - one row each, no read-modify-write of other tones. If a
+    concurrent request claims the same version first, the unique constraint
+    rejects the insert and the versions are recomputed.
+    """
+    for attempt in range(retries):
+        current = dict(
+            db.session.query(CoverLetter.tone, func.max(CoverLetter.version))
+            .filter(CoverLetter.session_id == session_id,
+                    CoverLetter.tone.in_([letter['tone'] for letter in cover_letters]))
+            .group_by(CoverLetter.tone)
+            .all()
+        )
+        rows = [
+            CoverLetter(
+                session_id=session_id,
+                tone=letter['tone'],
+                version=current.get(letter['tone'], 0) + 1,
+                content=letter['content'],
+                word_count=letter.get('word_count'),
+                customizations=json.dumps(letter.get('customizations') or {}),
+                render_ms=letter.get('render_ms')
+            )
+            for letter in cover_letters
+        ]
+        try:
+            db.session.add_all(rows)
+            # Its query autoflushes the inserts, so a lost race can raise here
+            _touch_session(session_id)
+            db.session.commit()
+            return rows
+        except IntegrityError:
+            db.session.rollback()
+            if attempt == retries - 1:
+                raise
+
+def _touch_session(session_id):
+    """Mark a session changed (new version) when only its child rows changed"""
+    session = UserSession.query.filter_by(session_id=session_id).first()
+    if session is not None:
+        session.updated_at = datetime.utcnow()
+
+def session_validators(session_id):
+    """(version, last modified) of a session, read without its data columns; None if missing"""
+    row = db.session.query(UserSession.version, UserSession.updated_at, UserSession.created_at)\
+        .filter(UserSession.session_id == session_id)\
+        .first()
+    if row is None:
+        return None
+    return row.version, row.updated_at or row.created_at
+
+def interview_generation(session_id):
+    """
+    How many times the session's interview questions were regenerated, read
+    from the database: a cached view in another worker may be behind
+    """
+    generation = db.session.query(UserSession.interview_generation)\
+        .filter(UserSession.session_id == session_id)\
+        .scalar()
+    return generation or 0
+
+def next_interview_generation(session_id):
+    """Count one more regeneration of the session's interview questions and return the new count"""
+    session = UserSession.query.filter_by(session_id=session_id).first()
+    # Incremented in SQL so concurrent regenerations each count
+    session.interview_generation = UserSession.interview_generation + 1
+    db.session.commit()
+    return session.interview_generation
+
+def claim_score_recording(session_id, scores):
+    """
+    Claim the adding of a session's scores to the score distribution: None
+    if this call claimed it (the caller records `scores`), else the scores
+    recorded earlier. One conditional UPDATE, so only one request wins.
+    """
+    # Core statement: a bulk ORM update would clear the whole session cache
+    table = UserSession.__table__
+    claimed = db.session.execute(
+        table.update()
+        .where(table.c.session_id == session_id, table.c.recorded_scores.is_(None))
+        .values(recorded_scores=json.dumps(scores))
+    ).rowcount
+    db.session.commit()
+    if claimed:
+        return None
+    recorded = db.session.execute(
+        db.select(table.c.recorded_scores).where(table.c.session_id == session_id)
+    ).scalar()
+    return json.loads(recorded) if recorded else None
+
+def history_validators(user_id, limit=10):
+    """
+    [(session_id, version)] of the sessions session_summaries() returns,
+    and their latest modification time
+    """
+    rows = db.session.query(UserSession.session_id, UserSession.version,
+                            func.coalesce(UserSession.updated_at, UserSession.created_at))\
+        .filter(UserSession.user_id == user_id)\
+        .order_by(UserSession.created_at.desc())\
+        .limit(limit)\
+        .all()
+    versions = [(session_id, version) for session_id, version, _ in rows]
+    return versions, max((modified for _, _, modified in rows), default=None)
+
+def load_cover_letters(session_id, tones=None):
+    """Latest version of each tone for a session, optionally only some tones"""
+    latest = db.session.query(CoverLetter.tone, func.max(CoverLetter.version).label('version'))\
+        .filter(CoverLetter.session_id == session_id)
+    if tones:
+        latest = latest.filter(CoverLetter.tone.in_(tones))
+    latest = latest.group_by(CoverLetter.tone).subquery()
+
+    rows = CoverLetter.query.join(
+        latest,
+        (CoverLetter.session_id == session_id) &
+        (CoverLetter.tone == latest.c.tone) &
+        (CoverLetter.version == latest.c.version)
+    ).all()
+    return latest_by_tone(rows)
+
+def _migrate_cover_letter_blobs():
+    """Move legacy UserSession.cover_letters JSON into CoverLetter rows"""
+    sessions = UserSession.query.filter(UserSession.cover_letters.isnot(None)).all()
+    for session in sessions:
+        letters = json.loads(session.cover_letters) or {}
+        for tone, letter in letters.items():
+            db.session.add(CoverLetter(
+                session_id=session.session_id,
+                tone=tone,
+                version=1,
+                content=letter.get('content', ''),
+                word_count=letter.get('word_count'),
+                customizations=json.dumps(letter.get('customizations') or {}),
+                render_ms=letter.get('render_ms'),
+                generated_at=datetime.fromisoformat(letter['generated_at']) if letter.get('generated_at') else None
+            ))
+        session.cover_letters = None
+    db.session.commit()
+    if sessions:
+        print(f"✅ Migrated cover letters of {len(sessions)} sessions")
+
+def _compress_session_columns(batch_size=200):
+    """
+    Rewrite session columns stored as plain text before they were
+    compressed. SQLite only: other databases keep the old column type until
+    migrated by hand. The freed pages are reused; VACUUM returns them to
+    the filesystem.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    columns = [column.name for column in UserSession.__table__.columns if isinstance(column.type, CompressedText)]
+    uncompressed = or_(*(func.typeof(UserSession.__table__.c[name]) == 'text' for name in columns))
+
+    total = 0
+    last_id = 0
+    while True:
+        batch = UserSession.query.filter(UserSession.id > last_id, uncompressed)\
+            .options(undefer_group('details'))\
+            .order_by(UserSession.id)\
+            .limit(batch_size)\
+            .all()
+        if not batch:
+            break
+        for session in batch:
+            for name in columns:
+                flag_modified(session, name)
+        db.session.commit()
+        total += len(batch)
+        last_id = batch[-1].id
+
+    if total:
+        print(f"✅ Compressed stored data of {total} sessions")
+
+def _add_missing_columns():
+    """create_all skips tables that already exist, so add their new columns here"""
+    inspector = inspect(db.engine)
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                definition = f'{column.name} {column.type.compile(db.engine.dialect)}'
+                if column.server_default is not None:
+                    definition += f' DEFAULT {column.server_default.arg}'
+                if not column.nullable:
+                    definition += ' NOT NULL'
+                connection.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {definition}')
+                print(f"✅ Added column {table.name}.{column.name}")
+
+def _create_missing_indexes():
+    """create_all skips tables that already exist, so add their new indexes here"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+def _backfill_session_skills(batch_size=500):
+    """Build session_skill rows for sessions stored before the table existed"""
+    has_rows = exists().where(SessionSkill.session_id == UserSession.session_id)
+    has_skills = or_(*(getattr(UserSession, column).isnot(None) for column in SKILL_ROLE_COLUMNS.values()))
+
+    total = 0
+    last_id = 0
+    while True:
+        batch = UserSession.query.filter(UserSession.id > last_id, has_skills, ~has_rows)\
+            .order_by(UserSession.id)\
+            .limit(batch_size)\
+            .all()
+        if not batch:
+            break
+        for session in batch:
+            for role, column in SKILL_ROLE_COLUMNS.items():
+                value = getattr(session, column)
+                if value:
+                    _sync_skill_rows(session, role, json.loads(value))
+        db.session.commit()
+        total += len(batch)
+        last_id = batch[-1].id
+
+    if total:
+        print(f"✅ Indexed skills of {total} sessions")
+
+class SchemaMigration(db.Model):
+    """A one-off data migration that has already run on this database"""
+    name = db.Column(db.String(100), primary_key=True)
+    applied_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+# Data migrations scan whole tables, so each runs once per database and is
+# then recorded in schema_migration; new ones are appended here
+DATA_MIGRATIONS = {
+    'cover_letter_rows': _migrate_cover_letter_blobs,
+    'session_skill_backfill': _backfill_session_skills,
+    'compressed_session_columns': _compress_session_columns
+}
+
+def _run_data_migrations():
+    done = set(db.session.scalars(db.select(SchemaMigration.name)))
+    for name, migrate in DATA_MIGRATIONS.items():
+        if name in done:
+            continue
+        migrate()
+        db.session.add(SchemaMigration(name=name))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # another worker finished it at the same time
+
+def database_url():
+    """
+    DATABASE_URL if set (any SQLAlchemy URL, e.g. postgresql://...),
+    otherwise the SQLite file in backend/instance
+    """
+    url = os.environ.get('DATABASE_URL')
+    if url:
+        # Heroku-style URLs use a scheme SQLAlchemy no longer accepts
+        return 'postgresql://' + url[len('postgres://'):] if url.startswith('postgres://') else url
+
     # Ensure the instance folder exists (use absolute path to avoid relative path issues)
     base_dir = os.path.abspath(os.path.dirname(__file__))
     instance_dir = os.path.join(base_dir, 'instance')
     os.makedirs(instance_dir, exist_ok=True)
 
-    # Configure SQLite database using absolute path
     db_path = os.path.join(instance_dir, 'job_assistant.db')
     # Use forward slashes in the URI to be safe across platforms
-    db_path_unix = db_path.replace('\\', '/')
-    db_uri = 'sqlite:///' + db_path_unix
+    return 'sqlite:///' + db_path.replace('\\', '/')
+
+def engine_options(url):
+    """Connection pool settings for a database URL, tunable through the environment"""
+    url = make_url(url)
+    if url.get_backend_name() != 'sqlite':
+        return {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+            'pool_pre_ping': True,
+            'pool_recycle': 1800
+        }
+
+    # Pooled connections are handed between request threads
+    options = {'connect_args': {'check_same_thread': False}}
+    if url.database not in (None, '', ':memory:'):
+        # In-memory databases use a single shared connection instead
+        options['pool_size'] = int(os.environ.get('DB_POOL_SIZE', 10))
+        options['max_overflow'] = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    return options
+
+def configure_sqlite(dbapi_connection, connection_record=None):
+    """
+    Per-connection SQLite pragmas. WAL lets readers run alongside the one
+    writer; synchronous=NORMAL is durable in WAL mode except for the last
+    transactions before a power loss; mmap serves reads from the page cache;
+    busy_timeout makes writers wait for the lock instead of failing with
+    "database is locked". auto_vacuum only takes effect on a new database
+    file, letting retention hand freed pages back in small steps.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute(f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))}")
+    cursor.execute(f"PRAGMA busy_timeout={int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}")
+    cursor.close()
+
+def init_db(app):
+    db_uri = database_url()
     app.config['SQLALCHEMY_DATABASE_URI'] = db_uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(db_uri)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SQLALCHEMY_ECHO'] = True  # For debugging SQL queries
+    # Set DB_ECHO=1 to log every SQL statement
+    app.config['SQLALCHEMY_ECHO'] = os.environ.get('DB_ECHO', '').lower() in ('1', 'true', 'yes')
 
     db.init_app(app)
 
     with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', configure_sqlite)
+
         try:
             db.create_all()
+            _add_missing_columns()
+            _create_missing_indexes()
+            _run_data_migrations()
             print("✅ Database tables created successfully!")
         except Exception as e:
             print(f"❌ Database error: {e}")
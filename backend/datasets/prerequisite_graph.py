@@ -0,0 +1,94 @@
+from typing import Dict, Iterable, List, Tuple
+
+
+class PrerequisiteGraph:
+    """
+    Skill prerequisites compiled into a DAG once at load time.
+
+    The topological order and the transitive closure of every skill are
+    precomputed, so planning a learning order only needs dict lookups,
+    however large the taxonomy is. Skill names are lowercase.
+    """
+
+    def __init__(self, prerequisites: Dict[str, Iterable[str]]):
+        self.prerequisites = {
+            skill.lower(): tuple(p.lower() for p in prereqs)
+            for skill, prereqs in prerequisites.items()
+        }
+        for prereqs in list(self.prerequisites.values()):
+            for prereq in prereqs:
+                self.prerequisites.setdefault(prereq, ())
+
+        self.order = self._topological_order()
+        self.rank = {skill: i for i, skill in enumerate(self.order)}
+
+        # Transitive closures, built in topological order so every
+        # prerequisite is already resolved
+        self.ancestors: Dict[str, Tuple[str, ...]] = {}
+        for skill in self.order:
+            parents = self.prerequisites[skill]
+            closure = set(parents)
+            for parent in parents:
+                closure.update(self.ancestors[parent])
+
+            self.ancestors[skill] = tuple(sorted(closure, key=self.rank.__getitem__))
+
+    @classmethod
+    def from_skills_data(cls, skills_data: Dict[str, Dict[str, Dict]]) -> 'PrerequisiteGraph':
+        """Build the graph from the `prerequisites` entries of a skills dataset"""
+        prerequisites = {}
+        for skills in skills_data.values():
+            for skill_name, details in skills.items():
+                prerequisites[skill_name] = details.get('prerequisites', [])
+        return cls(prerequisites)
+
+    def prerequisites_of(self, skill: str) -> Tuple[str, ...]:
+        """All direct and indirect prerequisites, foundational skills first"""
+        return self.ancestors.get(skill.lower(), ())
+
+    def learning_order(self, skills: Iterable[str], known: Iterable[str] = (),
+                       pending: Iterable[str] = None) -> List[str]:
+        """
+        Skills in the given (priority) order, each preceded by its prerequisites.
+        Skills in `known` are skipped; if `pending` is given, only prerequisites
+        listed there are pulled in (e.g. the ones still missing from a resume).
+        """
+        skills = [skill.lower() for skill in skills]
+        seen = {skill.lower() for skill in known}
+        allowed = {skill.lower() for skill in pending} if pending is not None else None
+
+        ordered = []
+        for skill in skills:
+            prerequisites = self.prerequisites_of(skill)
+            if allowed is not None:
+                prerequisites = tuple(p for p in prerequisites if p in allowed)
+
+            for step in prerequisites + (skill,):
+                if step not in seen:
+                    seen.add(step)
+                    ordered.append(step)
+        return ordered
+
+    def _topological_order(self) -> Tuple[str, ...]:
+        """Kahn's algorithm; raises ValueError if the prerequisites form a cycle"""
+        remaining = {skill: len(prereqs) for skill, prereqs in self.prerequisites.items()}
+        dependents: Dict[str, List[str]] = {skill: [] for skill in self.prerequisites}
+        for skill, prereqs in self.prerequisites.items():
+            for prereq in prereqs:
+                dependents[prereq].append(skill)
+
+        ready = [skill for skill, count in remaining.items() if count == 0]
+        order = []
+        while ready:
+            skill = ready.pop()
+            order.append(skill)
+            for dependent in dependents[skill]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) != len(self.prerequisites):
+            cyclic = sorted(skill for skill, count in remaining.items() if count > 0)
+            raise ValueError(f"Skill prerequisites contain a cycle: {', '.join(cyclic)}")
+
+        return tuple(order)
@@ -1,9 +1,11 @@
 import json
 import os
+from datasets.prerequisite_graph import PrerequisiteGraph
 
 class SkillsDataset:
     def __init__(self):
         self.skills_data = self._load_skills_data()
+        self.prerequisite_graph = PrerequisiteGraph.from_skills_data(self.skills_data)
 
     def _load_skills_data(self):
         """Load comprehensive skills dataset"""
@@ -0,0 +1,32 @@
+"""
+Server-Sent Events Streaming
+Emits each section of a multi-part result as soon as it is ready
+"""
+
+from typing import Any, Iterable
+import json
+
+from flask import Response, stream_with_context
+
+
+def format_event(event: str, data: Any) -> str:
+    """One SSE frame: named event with a compact JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def event_stream_response(events: Iterable[str]) -> Response:
+    """
+    Wrap a generator of SSE frames in a streaming response. The request
+    context stays available to the generator, so it can still use the
+    database session after the first frame is sent.
+    """
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            # Stop reverse proxies (nginx) from buffering the whole stream
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
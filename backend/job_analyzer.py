@@ -5,6 +5,8 @@ from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 from typing import List, Dict, Any
 
+from tracing import traced
+
 class AdvancedJobAnalyzer:
     def __init__(self):
         try:
@@ -37,6 +39,7 @@ class AdvancedJobAnalyzer:
             ]
         }
 
+    @traced('job_analyzer.analyze')
     def analyze_job_description(self, job_text: str) -> Dict[str, Any]:
         """Comprehensive job description analysis"""
         if not job_text.strip():
@@ -60,6 +63,7 @@ class AdvancedJobAnalyzer:
             'skill_categories': self._categorize_skills(job_text)
         }
 
+    @traced('job_analyzer.skills')
     def _extract_skills(self, text: str) -> List[str]:
         """Extract skills from job description"""
         skills_found = set()
@@ -73,6 +77,7 @@ class AdvancedJobAnalyzer:
 
         return list(skills_found)
 
+    @traced('job_analyzer.experience_level')
     def _determine_experience_level(self, text: str) -> str:
         """Determine required experience level"""
         text_lower = text.lower()
@@ -90,6 +95,7 @@ class AdvancedJobAnalyzer:
         else:
             return "Not specified"
 
+    @traced('job_analyzer.education')
     def _extract_education_requirements(self, text: str) -> List[str]:
         """Extract education requirements"""
         education = []
@@ -109,6 +115,7 @@ class AdvancedJobAnalyzer:
 
         return list(set(education))
 
+    @traced('job_analyzer.responsibilities')
     def _extract_responsibilities(self, text: str) -> List[str]:
         """Extract key responsibilities"""
         responsibilities = []
@@ -133,6 +140,7 @@ class AdvancedJobAnalyzer:
 
         return responsibilities[:8]  # Return top 8 responsibilities
 
+    @traced('job_analyzer.salary')
     def _extract_salary_indicators(self, text: str) -> Dict[str, str]:
         """Extract salary information if available"""
         salary_patterns = [
@@ -148,6 +156,7 @@ class AdvancedJobAnalyzer:
 
         return {'salary_range': 'Not specified'}
 
+    @traced('job_analyzer.culture')
     def _analyze_company_culture(self, text: str) -> List[str]:
         """Analyze company culture keywords"""
         culture_keywords = {
@@ -167,6 +176,7 @@ class AdvancedJobAnalyzer:
 
         return culture_aspects
 
+    @traced('job_analyzer.skill_categories')
     def _categorize_skills(self, text: str) -> Dict[str, List[str]]:
         """Categorize skills found in job description"""
         categorized_skills = {category: [] for category in self.skill_categories.keys()}
@@ -180,6 +190,7 @@ class AdvancedJobAnalyzer:
         # Remove empty categories
         return {k: v for k, v in categorized_skills.items() if v}
 
+    @traced('job_analyzer.similarity')
     def calculate_similarity(self, resume_skills: List[str], job_skills: List[str]) -> float:
         """Calculate similarity between resume and job skills"""
         if not resume_skills or not job_skills:
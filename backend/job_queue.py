@@ -0,0 +1,164 @@
+"""
+Background Job Queue
+In-process queue and worker threads for work that shouldn't hold a request open
+"""
+
+from typing import Any, Callable, Dict, Optional
+from collections import deque
+import queue
+import threading
+import time
+import uuid
+
+
+class QueueFull(Exception):
+    """The queue is at capacity; the client should retry later"""
+
+
+class Job:
+    """One queued call: status is queued, running, done or failed"""
+    __slots__ = ('id', 'kind', 'args', 'status', 'result', 'error',
+                 'created_at', 'started_at', 'finished_at')
+
+    def __init__(self, kind: str, args: tuple):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.args = args
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        job = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if self.status == 'done':
+            job['result'] = self.result
+        elif self.status == 'failed':
+            job['error'] = self.error
+        return job
+
+
+def _percentile(values, fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)], 3)
+
+
+class JobQueue:
+    """
+    FIFO queue served by a fixed pool of daemon worker threads.
+
+    Handlers are registered per job kind and called as handler(*args);
+    their return value becomes the job's result. Finished jobs stay
+    queryable for `retention` seconds. At most `max_pending` jobs wait at
+    once; beyond that submit() raises QueueFull. Jobs live in memory only:
+    queued jobs are lost if the process exits.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 100, retention: float = 600.0,
+                 latency_samples: int = 1000):
+        self.workers = workers
+        self.retention = retention
+
+        self._handlers: Dict[str, Callable] = {}
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_ms = deque(maxlen=latency_samples)
+        self._run_ms = deque(maxlen=latency_samples)
+
+        self._threads = [
+            threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def register(self, kind: str, handler: Callable):
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, *args) -> Job:
+        if kind not in self._handlers:
+            raise ValueError(f'No handler for job kind {kind!r}')
+        job = Job(kind, args)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+                self._rejected += 1
+            raise QueueFull(f'{self._queue.maxsize} jobs already waiting')
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            wait_ms, run_ms = list(self._wait_ms), list(self._run_ms)
+            return {
+                'workers': self.workers,
+                'queue_depth': self._queue.qsize(),
+                'max_pending': self._queue.maxsize,
+                'running': self._running,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                # Over the most recent jobs
+                'wait_ms': {'p50': _percentile(wait_ms, 0.5), 'p95': _percentile(wait_ms, 0.95)},
+                'run_ms': {'p50': _percentile(run_ms, 0.5), 'p95': _percentile(run_ms, 0.95)}
+            }
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                job.status = 'running'
+                job.started_at = time.time()
+                self._running += 1
+                self._wait_ms.append((job.started_at - job.created_at) * 1000)
+
+            try:
+                result, error = self._handlers[job.kind](*job.args), None
+            except Exception as e:
+                result, error = None, str(e) or type(e).__name__
+
+            with self._lock:
+                job.finished_at = time.time()
+                job.args = None  # release the payload
+                job.result, job.error = result, error
+                job.status = 'failed' if error is not None else 'done'
+                self._running -= 1
+                if error is not None:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+                self._run_ms.append((job.finished_at - job.started_at) * 1000)
+            self._queue.task_done()
+
+    def _prune(self):
+        # Called with the lock held
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
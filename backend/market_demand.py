@@ -0,0 +1,138 @@
+"""
+Corpus-Derived Market Demand
+Tracks how many recently analyzed job postings mention each skill
+"""
+
+from typing import Dict, Iterable, Optional
+from collections import Counter, deque
+from datetime import datetime
+import threading
+
+from skill_taxonomy import skill_taxonomy
+
+
+class MarketDemandTracker:
+    """
+    Rolling-window skill counters over analyzed job postings.
+
+    Postings are grouped into fixed time buckets (one day by default) by
+    when they were first analyzed. Each posting adds one to the counter of
+    every skill it mentions, once however often it is re-analyzed; buckets
+    that fall out of the window are subtracted from the running totals. Recording
+    a posting costs O(skills in the posting) and reading a skill's demand is
+    a dict lookup - stored postings are never rescanned.
+
+    Demand is reported on the same 0-100 scale as the static market table:
+    the most frequently requested skill in the window scores 100.
+    """
+
+    def __init__(self, window_days: int = 30, bucket_hours: int = 24, min_postings: int = 20):
+        self.window_seconds = window_days * 86400
+        self.bucket_seconds = bucket_hours * 3600
+        # Below this many postings the corpus is too small to trust
+        self.min_postings = min_postings
+
+        self._buckets = deque()  # [bucket_id, Counter, postings]
+        self._totals = Counter()
+        self._max_count = 0
+        self._postings = 0
+        self._lock = threading.Lock()
+
+    def record_posting(self, skills: Iterable[str], timestamp: Optional[datetime] = None,
+                       previous: Iterable[str] = ()):
+        """
+        Count one analyzed job posting. A posting analyzed again passes the
+        skills it was counted with as `previous` and the same `timestamp`:
+        only the difference is applied, so every posting counts once, with
+        its latest skills. Postings without skills are not counted.
+        """
+        # Naive UTC throughout, matching UserSession.created_at
+        now = datetime.utcnow()
+        bucket_id = self._bucket_id(timestamp or now)
+        # Canonical names, as demand() is looked up (e.g. gcp -> google cloud)
+        skills = {skill_taxonomy.canonical(s) for s in skills if s and s.strip()}
+        previous = {skill_taxonomy.canonical(s) for s in previous if s and s.strip()}
+        added, removed = skills - previous, previous - skills
+        if not added and not removed:
+            return
+
+        with self._lock:
+            self._evict(now)
+            if bucket_id < self._oldest_bucket_id(now):
+                return  # already outside the window
+
+            bucket = self._bucket(bucket_id)
+            counts = bucket[1]
+            removed = {skill for skill in removed if counts[skill] > 0}  # only what this bucket counted
+            postings = int(bool(skills)) - int(bool(previous))
+            counts.update(added)
+            counts.subtract(removed)
+            bucket[2] += postings
+            self._totals.update(added)
+            self._totals.subtract(removed)
+            self._postings += postings
+            for skill in removed:
+                if counts[skill] <= 0:
+                    del counts[skill]
+                if self._totals[skill] <= 0:
+                    del self._totals[skill]
+
+            if removed:
+                self._max_count = max(self._totals.values(), default=0)
+            else:
+                for skill in added:
+                    self._max_count = max(self._max_count, self._totals[skill])
+
+    def demand(self, skill: str) -> Optional[int]:
+        """
+        Demand index (0-100) relative to the most requested skill in the
+        window, or None while fewer than `min_postings` postings have been seen.
+        """
+        with self._lock:
+            self._evict(datetime.utcnow())
+            if self._postings < self.min_postings or not self._max_count:
+                return None
+            return round(self._totals.get(skill_taxonomy.canonical(skill), 0) / self._max_count * 100)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'postings_in_window': self._postings,
+                'skills_tracked': len(self._totals),
+                'buckets': len(self._buckets)
+            }
+
+    def _bucket_id(self, timestamp: datetime) -> int:
+        return int(timestamp.timestamp() // self.bucket_seconds)
+
+    def _bucket(self, bucket_id: int) -> list:
+        """The bucket for an ID, created in order if missing (postings are keyed by creation time)"""
+        buckets = self._buckets
+        if not buckets or bucket_id > buckets[-1][0]:
+            buckets.append([bucket_id, Counter(), 0])
+            return buckets[-1]
+        for index, bucket in enumerate(buckets):
+            if bucket[0] == bucket_id:
+                return bucket
+            if bucket[0] > bucket_id:
+                buckets.insert(index, [bucket_id, Counter(), 0])
+                return buckets[index]
+
+    def _oldest_bucket_id(self, now: datetime) -> int:
+        return self._bucket_id(now) - self.window_seconds // self.bucket_seconds + 1
+
+    def _evict(self, now: datetime):
+        oldest = self._oldest_bucket_id(now)
+        evicted = False
+        while self._buckets and self._buckets[0][0] < oldest:
+            _, counts, postings = self._buckets.popleft()
+            self._totals.subtract(counts)
+            self._postings -= postings
+            for skill in counts:
+                if self._totals[skill] <= 0:
+                    del self._totals[skill]
+            evicted = True
+
+        # At most once per bucket, so the O(skills) rescan stays off the hot path
+        if evicted:
+            self._max_count = max(self._totals.values(), default=0)
@@ -0,0 +1,226 @@
+"""
+Request Metrics
+Per-route request counts, errors, latency histograms and in-flight gauges, exposed in Prometheus text format
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from bisect import bisect_left
+import os
+import sys
+import threading
+import time
+
+from flask import Flask, request
+
+try:
+    import resource
+except ImportError:  # Windows: no CPU or peak memory metrics
+    resource = None
+
+# Upper bounds in seconds, as in the Prometheus client libraries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNMATCHED_ROUTE = '<unmatched>'  # 404s: one label value instead of one per URL
+
+_START_TIME = time.time()
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+
+def _number(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+class RouteStats:
+    """Counters for one (method, route); updated with the registry lock held"""
+    __slots__ = ('statuses', 'errors', 'buckets', 'duration_sum', 'in_flight')
+
+    def __init__(self, bucket_count: int):
+        self.statuses: Dict[int, int] = {}
+        self.errors = 0
+        self.buckets = [0] * (bucket_count + 1)  # the last one is +Inf
+        self.duration_sum = 0.0
+        self.in_flight = 0
+
+
+class RequestMetrics:
+    """
+    Flask hooks that time every request and count it by method, route
+    template and status code, plus a registry of collectors: functions
+    returning a flat dict of numbers (cache, queue and executor stats)
+    that are read when /api/metrics is scraped.
+
+    Latency runs from the first before_request hook to the last
+    after_request hook, so it covers the handler and response encoding;
+    for streamed responses it ends when the handler returns, not when the
+    last chunk is sent. Status 5xx counts as an error.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._routes: Dict[Tuple[str, str], RouteStats] = {}
+        self._collectors: List[Tuple[str, Callable[[], Dict[str, Any]], frozenset]] = []
+        self._lock = threading.Lock()
+
+    def install(self, app: Flask):
+        """Call before registering other hooks so the timing wraps them"""
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+
+    def register_collector(self, prefix: str, collect: Callable[[], Dict[str, Any]],
+                           counters: Iterable[str] = ()):
+        """
+        Export collect()'s numeric values as <prefix>_<key> gauges; keys in
+        `counters` only ever increase and are exported as <prefix>_<key>_total.
+        Nested dicts are flattened with underscores, None and strings skipped.
+        """
+        self._collectors.append((prefix, collect, frozenset(counters)))
+
+    # Request hooks
+
+    # Each proxy lookup (request.x, g.x) costs about a microsecond, so the
+    # hooks resolve the request once and keep their state on it
+
+    def _start(self):
+        req = request._get_current_object()
+        rule = req.url_rule
+        key = (req.method, rule.rule if rule is not None else UNMATCHED_ROUTE)
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = RouteStats(len(self.buckets))
+            stats.in_flight += 1
+        req._metrics_started = (stats, time.perf_counter())
+
+    def _finish(self, response):
+        self._observe(request._get_current_object(), response.status_code)
+        return response
+
+    def _teardown(self, exc):
+        # Only if no response was produced (after_request didn't run)
+        self._observe(request._get_current_object(), 500)
+
+    def _observe(self, req, status: int):
+        started = req.__dict__.pop('_metrics_started', None)
+        if started is None:
+            return
+        stats, start = started
+        duration = time.perf_counter() - start
+        index = bisect_left(self.buckets, duration)
+        with self._lock:
+            stats.in_flight -= 1
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            if status >= 500:
+                stats.errors += 1
+            stats.buckets[index] += 1
+            stats.duration_sum += duration
+
+    # Exposition
+
+    def render(self) -> str:
+        lines: List[str] = []
+        self._render_requests(lines)
+        self._render_process(lines)
+        for prefix, collect, counters in self._collectors:
+            try:
+                values = collect()
+            except Exception as e:
+                print(f"⚠️  Metrics collector {prefix} failed: {e}")
+                continue
+            self._render_collected(lines, prefix, values, counters)
+        return '\n'.join(lines) + '\n'
+
+    def _snapshot(self):
+        with self._lock:
+            return [(method, route, dict(stats.statuses), stats.errors, list(stats.buckets),
+                     stats.duration_sum, stats.in_flight)
+                    for (method, route), stats in sorted(self._routes.items())]
+
+    def _render_requests(self, lines: List[str]):
+        routes = self._snapshot()
+
+        lines.append('# HELP http_requests_total Requests handled, by method, route and status code.')
+        lines.append('# TYPE http_requests_total counter')
+        for method, route, statuses, *_ in routes:
+            for status, count in sorted(statuses.items()):
+                lines.append(f'http_requests_total{_labels(method=method, route=route, status=status)} {count}')
+
+        lines.append('# HELP http_request_errors_total Requests answered with a 5xx status.')
+        lines.append('# TYPE http_request_errors_total counter')
+        for method, route, _, errors, *_ in routes:
+            lines.append(f'http_request_errors_total{_labels(method=method, route=route)} {errors}')
+
+        lines.append('# HELP http_request_duration_seconds Time from the first to the last request hook.')
+        lines.append('# TYPE http_request_duration_seconds histogram')
+        for method, route, _, _, buckets, duration_sum, _ in routes:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket'
+                             f'{_labels(method=method, route=route, le=_number(bound))} {cumulative}')
+            labels = _labels(method=method, route=route)
+            lines.append(f'http_request_duration_seconds_sum{labels} {duration_sum!r}')
+            lines.append(f'http_request_duration_seconds_count{labels} {cumulative}')
+
+        lines.append('# HELP http_requests_in_flight Requests currently being handled.')
+        lines.append('# TYPE http_requests_in_flight gauge')
+        for method, route, *_, in_flight in routes:
+            lines.append(f'http_requests_in_flight{_labels(method=method, route=route)} {in_flight}')
+
+    def _render_process(self, lines: List[str]):
+        process = {
+            'process_start_time_seconds': ('gauge', 'Start time since the epoch.', _START_TIME),
+            'process_threads': ('gauge', 'Live Python threads.', threading.active_count())
+        }
+        if resource is not None:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            # ru_maxrss is in kilobytes, except on macOS
+            max_rss = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+            process['process_cpu_seconds_total'] = ('counter', 'User and system CPU time.',
+                                                    usage.ru_utime + usage.ru_stime)
+            process['process_max_resident_memory_bytes'] = ('gauge', 'Peak resident memory.', max_rss)
+        resident = _resident_memory_bytes()
+        if resident is not None:
+            process['process_resident_memory_bytes'] = ('gauge', 'Current resident memory.', resident)
+
+        for name, (kind, help_text, value) in process.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.append(f'{name} {_number(value)}')
+
+    def _render_collected(self, lines: List[str], prefix: str, values: Dict[str, Any], counters: frozenset):
+        for key, value in _flatten(values):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if key in counters:
+                name, kind = f'{prefix}_{key}_total', 'counter'
+            else:
+                name, kind = f'{prefix}_{key}', 'gauge'
+            lines.append(f'# TYPE {name} {kind}')
+            lines.append(f'{name} {_number(value)}')
+
+
+def _flatten(values: Dict[str, Any], prefix: str = '') -> Iterable[Tuple[str, Any]]:
+    for key, value in values.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f'{prefix}{key}_')
+        else:
+            yield f'{prefix}{key}', value
+
+
+def _resident_memory_bytes():
+    # Linux only; elsewhere just the peak from getrusage is reported
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
@@ -7,6 +7,8 @@ from typing import Dict, List, Any, Tuple
 import re
 from collections import Counter
 
+from tracing import traced
+
 
 class NLPJobClassifier:
     def __init__(self):
@@ -101,6 +103,7 @@ class NLPJobClassifier:
             ]
         }
 
+    @traced('classifier.classify')
     def classify_job_description(self, job_description: str, job_title: str = "") -> Dict[str, Any]:
         """
         Comprehensive NLP-based job description classification
@@ -154,6 +157,7 @@ class NLPJobClassifier:
             'insights': self._generate_insights(primary_industry, job_level, complexity, key_skills)
         }
 
+    @traced('classifier.industry')
     def _classify_industry(self, text: str, title: str) -> Dict[str, int]:
         """Classify job into industry categories"""
         industry_scores = {}
@@ -171,6 +175,7 @@ class NLPJobClassifier:
 
         return industry_scores
 
+    @traced('classifier.job_level')
     def _detect_job_level(self, text: str, title: str) -> str:
         """Detect seniority level of the position"""
         level_scores = {}
@@ -189,6 +194,7 @@ class NLPJobClassifier:
 
         return max(level_scores.items(), key=lambda x: x[1])[0]
 
+    @traced('classifier.requirements')
     def _extract_requirements(self, job_description: str) -> Dict[str, List[str]]:
         """Extract different types of requirements"""
         requirements = {
@@ -247,6 +253,7 @@ class NLPJobClassifier:
 
         return requirements
 
+    @traced('classifier.key_skills')
     def _identify_key_skills(self, text: str) -> List[str]:
         """Identify most important skills from job description"""
         # Common professional skills
@@ -267,6 +274,7 @@ class NLPJobClassifier:
         found_skills.sort(key=lambda x: x[1], reverse=True)
         return [skill for skill, _ in found_skills[:10]]
 
+    @traced('classifier.complexity')
     def _analyze_complexity(self, requirements: Dict[str, List[str]],
                            skills: List[str]) -> Dict[str, Any]:
         """Analyze job complexity based on requirements and skills"""
@@ -294,6 +302,7 @@ class NLPJobClassifier:
             'technical_skills_required': tech_skill_count
         }
 
+    @traced('classifier.must_have')
     def _categorize_requirements(self, job_description: str) -> Tuple[List[str], List[str]]:
         """Separate must-have from nice-to-have requirements"""
         must_have = []
@@ -327,6 +336,7 @@ class NLPJobClassifier:
 
         return must_have[:5], nice_to_have[:5]
 
+    @traced('classifier.work_arrangement')
     def _detect_work_arrangement(self, text: str) -> Dict[str, Any]:
         """Detect work arrangement (remote, hybrid, on-site)"""
         remote_keywords = ['remote', 'work from home', 'wfh', 'distributed', 'anywhere']
@@ -351,6 +361,7 @@ class NLPJobClassifier:
             'confidence': 'High' if max(remote_count, hybrid_count, onsite_count) >= 2 else 'Low'
         }
 
+    @traced('classifier.sentiment')
     def _analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment and tone of job description"""
         # Positive words
@@ -394,6 +405,7 @@ class NLPJobClassifier:
             }
         }
 
+    @traced('classifier.compensation')
     def _extract_compensation_info(self, text: str) -> Dict[str, Any]:
         """Extract compensation and benefits information"""
         compensation = {
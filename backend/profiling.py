@@ -0,0 +1,277 @@
+"""
+On-Demand Profiling
+Profiles live requests with cProfile or a stack sampler for the next N requests or T seconds
+"""
+
+from typing import Any, Dict, Optional, Tuple
+from collections import Counter
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+
+from flask import Flask, request
+
+MODES = ('cprofile', 'sampling')
+MAX_REQUESTS = 10000
+MAX_SECONDS = 600
+# From 3.12 cProfile hooks sys.monitoring, which takes one profiler per
+# process: a second enable() raises instead of profiling its own thread
+SINGLE_PROFILER = sys.version_info >= (3, 12)
+
+
+class ProfileRun:
+    """One profiling window and what it has collected so far"""
+
+    def __init__(self, mode: str, max_requests: Optional[int], seconds: Optional[float], interval_ms: float):
+        self.mode = mode
+        self.max_requests = max_requests
+        self.seconds = seconds
+        self.interval_ms = interval_ms
+        self.started_at = time.time()
+        self.deadline = time.perf_counter() + seconds if seconds else None
+        self.finished_at = None
+        self.active = True
+        self.requests = 0
+        self.skipped = 0  # cprofile: requests that ran while another held the profiler
+        self.stats: Optional[pstats.Stats] = None  # cprofile: aggregated over requests
+        self.samples = Counter()  # sampling: collapsed stack -> count
+
+    def expired(self) -> bool:
+        return ((self.deadline is not None and time.perf_counter() >= self.deadline)
+                or (self.max_requests is not None and self.requests >= self.max_requests))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'active': self.active,
+            'max_requests': self.max_requests,
+            'seconds': self.seconds,
+            'interval_ms': self.interval_ms if self.mode == 'sampling' else None,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'requests_profiled': self.requests,
+            'requests_skipped': self.skipped if self.mode == 'cprofile' else None,
+            'samples': sum(self.samples.values()) if self.mode == 'sampling' else None
+        }
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class RequestProfiler:
+    """
+    Profiles the requests that start inside a window opened by start():
+    until `requests` requests have finished or `seconds` have passed,
+    whichever comes first. Results aggregate over the whole window.
+
+    'cprofile' profiles each request's own thread (work on the analysis
+    executor's threads is not included) and gives a pstats dump. On
+    Python 3.12+ only one request can be profiled at a time; requests
+    that overlap it run unprofiled and are counted as skipped.
+    'sampling' snapshots the stacks of every thread each `interval_ms`,
+    the analysis stages included, and gives collapsed stacks for
+    flamegraphs; idle worker threads show up in their wait calls.
+
+    When no window is open each request costs one attribute check.
+    Admin endpoints (/api/admin/...) are never profiled, and a profiler
+    failure never fails the request being profiled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._run: Optional[ProfileRun] = None  # the open window
+        self._last: Optional[ProfileRun] = None  # the most recent window, open or not
+        self._open_requests = 0  # profiled requests still running
+        self._profiling = False  # a cProfile.Profile is enabled (SINGLE_PROFILER)
+
+    def install(self, app: Flask):
+        app.before_request(self._start_request)
+        app.teardown_request(self._end_request)
+
+    def start(self, mode: str = 'cprofile', requests: Optional[int] = None, seconds: Optional[float] = None,
+              interval_ms: float = 5.0) -> ProfileRun:
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        if requests is None and seconds is None:
+            seconds = 30
+        if requests is not None and not 1 <= requests <= MAX_REQUESTS:
+            raise ValueError(f'requests must be between 1 and {MAX_REQUESTS}')
+        if seconds is not None and not 0 < seconds <= MAX_SECONDS:
+            raise ValueError(f'seconds must be between 0 and {MAX_SECONDS}')
+        if not 1 <= interval_ms <= 1000:
+            raise ValueError('interval_ms must be between 1 and 1000')
+
+        with self._lock:
+            if self._run is not None:
+                raise RuntimeError('A profile is already running')
+            run = self._run = self._last = ProfileRun(mode, requests, seconds, interval_ms)
+
+        if mode == 'sampling':
+            threading.Thread(target=self._sample, args=(run,), name='profile-sampler', daemon=True).start()
+        print(f"✅ Profiling started: {mode}, requests={requests}, seconds={seconds}")
+        return run
+
+    def stop(self) -> Optional[ProfileRun]:
+        with self._lock:
+            if self._run is not None:
+                self._finish(self._run)
+            return self._last
+
+    def status(self) -> Optional[ProfileRun]:
+        with self._lock:
+            if self._run is not None and self._run.expired():
+                self._finish(self._run)
+            return self._last
+
+    def result(self, output: str, limit: int = 50) -> Tuple[bytes, str]:
+        """
+        The latest window's profile as (body, mimetype). `output` is
+        'pstats' (marshal dump, as pstats.Stats.dump_stats writes) or
+        'text' for cprofile, 'collapsed' or 'text' for sampling.
+        """
+        with self._lock:
+            run = self._last
+            if run is None:
+                raise LookupError('No profile has been run')
+            if run.mode == 'cprofile':
+                if output == 'pstats':
+                    return marshal.dumps(run.stats.stats if run.stats else {}), 'application/octet-stream'
+                if output == 'text':
+                    return self._pstats_text(run, limit).encode('utf-8'), 'text/plain'
+            else:
+                if output == 'collapsed':
+                    body = ''.join(f'{stack} {count}\n' for stack, count in run.samples.most_common())
+                    return body.encode('utf-8'), 'text/plain'
+                if output == 'text':
+                    return self._sample_text(run, limit).encode('utf-8'), 'text/plain'
+        raise ValueError(f'{output!r} output is not available for {run.mode} profiles')
+
+    # Request hooks
+
+    def _start_request(self):
+        run = self._run
+        if run is None:
+            return
+        req = request._get_current_object()
+        if req.path.startswith('/api/admin/'):
+            return
+        with self._lock:
+            if not run.active:
+                return
+            if run.expired():
+                self._finish(run)
+                return
+            if run.mode == 'cprofile' and SINGLE_PROFILER:
+                if self._profiling:
+                    run.skipped += 1
+                    return
+                self._profiling = True
+        profile = None
+        if run.mode == 'cprofile':
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as e:  # another profiling tool is active
+                with self._lock:
+                    self._profiling = False
+                    run.skipped += 1
+                print(f"⚠️  Could not profile request: {e}")
+                return
+        with self._lock:
+            self._open_requests += 1
+        req._profile = (run, profile)
+
+    def _end_request(self, exc):
+        if self._open_requests == 0:
+            return
+        started = request._get_current_object().__dict__.pop('_profile', None)
+        if started is None:
+            return
+        run, profile = started
+        try:
+            if profile is not None:
+                profile.disable()
+                profile.create_stats()
+        except Exception as e:
+            print(f"⚠️  Could not collect request profile: {e}")
+            profile = None
+        with self._lock:
+            self._open_requests -= 1
+            if started[1] is not None:
+                self._profiling = False
+            if profile is not None:
+                try:
+                    if run.stats is None:
+                        run.stats = pstats.Stats(profile)
+                    else:
+                        run.stats.add(profile)
+                except Exception as e:
+                    print(f"⚠️  Could not collect request profile: {e}")
+            run.requests += 1
+            if run.active and run.expired():
+                self._finish(run)
+
+    def _finish(self, run: ProfileRun):
+        # Called with the lock held
+        if not run.active:
+            return
+        run.active = False
+        run.finished_at = time.time()
+        if self._run is run:
+            self._run = None
+        print(f"✅ Profiling finished: {run.mode}, {run.requests} requests")
+
+    # Sampling
+
+    def _sample(self, run: ProfileRun):
+        own_id = threading.get_ident()
+        interval = run.interval_ms / 1000
+        while run.active:
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                stacks.append(';'.join(reversed(labels)))
+            with self._lock:
+                run.samples.update(stacks)
+                if run.active and run.expired():
+                    self._finish(run)
+            time.sleep(interval)
+
+    # Text reports
+
+    def _pstats_text(self, run: ProfileRun, limit: int) -> str:
+        if run.stats is None:
+            return 'No requests profiled yet\n'
+        stream = io.StringIO()
+        run.stats.stream = stream
+        run.stats.sort_stats('cumulative').print_stats(limit)
+        return stream.getvalue()
+
+    def _sample_text(self, run: ProfileRun, limit: int) -> str:
+        total = sum(run.samples.values())
+        if not total:
+            return 'No samples yet\n'
+        own, inclusive = Counter(), Counter()
+        for stack, count in run.samples.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+
+        lines = [f'{total} samples every {run.interval_ms} ms', '', 'Own samples:']
+        lines += [f'  {count / total:7.2%}  {label}' for label, count in own.most_common(limit)]
+        lines += ['', 'Including callees:']
+        lines += [f'  {count / total:7.2%}  {label}' for label, count in inclusive.most_common(limit)]
+        return '\n'.join(lines) + '\n'
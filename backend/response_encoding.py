@@ -0,0 +1,99 @@
+"""
+Response Encoding
+Compact JSON (orjson when installed) and negotiated gzip for API responses
+"""
+
+from typing import Any
+import gzip
+import json
+import os
+
+from flask import Flask, request
+from flask.json.provider import DefaultJSONProvider
+
+from tracing import span
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library encoder is used instead
+    orjson = None
+
+
+# Responses smaller than this are sent as-is: gzip saves too little
+GZIP_MIN_BYTES = int(os.environ.get('RESPONSE_GZIP_MIN_BYTES', 1024))
+GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', 6))
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/plain', 'text/html', 'text/csv'}
+
+# Datetimes are passed through to the provider's default, which renders them
+# as HTTP dates just as the standard library path does
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+                   if orjson is not None else 0)
+
+
+class CompactJSONProvider(DefaultJSONProvider):
+    """
+    JSON without indentation or key sorting, also in debug mode. Encodes
+    with orjson when it is installed and can handle the value; anything it
+    rejects goes through the standard library encoder. Both send datetimes
+    through the same default (HTTP dates) and write non-ASCII text as
+    UTF-8, so ordinary responses don't depend on which one is used.
+    """
+    compact = True
+    sort_keys = False
+    ensure_ascii = False
+
+    def dumps(self, obj: Any, **kwargs) -> str:
+        return self._encode(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encode(obj), mimetype=self.mimetype)
+
+    def _encode(self, obj: Any) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS)
+            except TypeError:
+                pass
+        return json.dumps(obj, default=self.default, ensure_ascii=self.ensure_ascii,
+                          separators=(',', ':')).encode('utf-8')
+
+
+def accepts_gzip() -> bool:
+    return request.accept_encodings['gzip'] > 0
+
+
+def gzip_response(response):
+    """
+    after_request hook: gzip buffered responses of a compressible type and
+    at least GZIP_MIN_BYTES when the client accepts it. Streamed responses
+    (server-sent events, NDJSON export) are left alone so each chunk still
+    goes out as soon as it is produced.
+    """
+    if (response.status_code < 200 or response.status_code >= 300
+            or response.is_streamed or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    data = response.get_data()
+    if len(data) < GZIP_MIN_BYTES:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if not accepts_gzip():
+        return response
+
+    with span('response.gzip', bytes=len(data)):
+        response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))
+    response.headers['Content-Encoding'] = 'gzip'
+    # The compressed body is a different representation of the same content
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def install_response_encoding(app: Flask):
+    app.json = CompactJSONProvider(app)
+    app.after_request(gzip_response)
@@ -0,0 +1,184 @@
+"""
+Streaming Score Distribution
+Keeps fixed-bin histograms of resume scores so any score can be ranked against
+every score seen so far in constant time and bounded memory
+"""
+
+from typing import Dict, Iterable, Optional
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class ScoreDistribution:
+    """
+    One 101-bin histogram (scores 0-100) per score dimension.
+
+    Memory is fixed at 101 counters per dimension no matter how many resumes
+    are scored, and ranking a score sums at most 101 bins. Counts are written
+    to `persist_path` every `persist_every` updates or `persist_interval`
+    seconds, whichever comes first, and reloaded on startup.
+    """
+
+    MIN_SCORE = 0
+    MAX_SCORE = 100
+
+    def __init__(self, dimensions: Iterable[str], persist_path: Optional[str] = None,
+                 persist_every: int = 50, persist_interval: float = 300.0):
+        self.dimensions = list(dimensions)
+        self.persist_path = persist_path
+        self.persist_every = persist_every
+        self.persist_interval = persist_interval
+
+        self._bins = {dim: [0] * (self.MAX_SCORE + 1) for dim in self.dimensions}
+        self._totals = {dim: 0 for dim in self.dimensions}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # one writer at a time, held during file I/O
+        self._pending = 0
+        self._last_persist = time.monotonic()
+
+        if persist_path:
+            self._load()
+
+    def rank_and_record(self, scores: Dict[str, int]) -> Dict[str, Optional[float]]:
+        """
+        Rank each score against previously recorded scores, then record it.
+        Returns percentile ranks (0-100); None for a dimension with no history.
+        """
+        with self._lock:
+            ranks = {}
+            for dim in self.dimensions:
+                if dim not in scores:
+                    continue
+                score = self._clamp(scores[dim])
+                ranks[dim] = self._percentile_rank(dim, score)
+                self._bins[dim][score] += 1
+                self._totals[dim] += 1
+
+            self._pending += 1
+            should_persist = self._should_persist()
+
+        if should_persist:
+            # Persistence is best effort: never fail the scoring request
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Could not save score distribution: {e}")
+
+        return ranks
+
+    def percentile_rank(self, dimension: str, score: int) -> Optional[float]:
+        """Percentile rank of a score without recording it"""
+        with self._lock:
+            return self._percentile_rank(dimension, self._clamp(score))
+
+    def rank(self, scores: Dict[str, int], exclude: Optional[Dict[str, int]] = None) -> Dict[str, Optional[float]]:
+        """
+        Percentile ranks without recording the scores. `exclude` holds the
+        scores recorded earlier for the same resume, which are left out so
+        it is not ranked against itself.
+        """
+        exclude = exclude or {}
+        with self._lock:
+            return {
+                dim: self._percentile_rank(dim, self._clamp(scores[dim]),
+                                           self._clamp(exclude[dim]) if dim in exclude else None)
+                for dim in self.dimensions if dim in scores
+            }
+
+    def sample_size(self, dimension: str = 'overall_score') -> int:
+        return self._totals.get(dimension, 0)
+
+    def flush(self):
+        """
+        Write the histograms to disk (atomic replace); raises if the write
+        fails. Either way the next automatic write waits another
+        `persist_every` updates or `persist_interval` seconds, so a broken
+        disk isn't retried on every scoring request.
+        """
+        if not self.persist_path:
+            return
+
+        with self._write_lock:
+            with self._lock:
+                snapshot = {
+                    'bins': {dim: list(bins) for dim, bins in self._bins.items()},
+                    'totals': dict(self._totals)
+                }
+                written = self._pending
+
+            try:
+                self._write(snapshot)
+            finally:
+                with self._lock:
+                    # Updates recorded while writing stay pending
+                    self._pending = max(self._pending - written, 0)
+                    self._last_persist = time.monotonic()
+
+    def _write(self, snapshot: Dict):
+        directory = os.path.dirname(self.persist_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        # A temp file of our own, so a failed or concurrent write never
+        # touches another writer's file
+        with tempfile.NamedTemporaryFile('w', dir=directory, prefix='.score_distribution-',
+                                         suffix='.tmp', delete=False) as f:
+            tmp_path = f.name
+            try:
+                json.dump(snapshot, f)
+                os.chmod(tmp_path, 0o644)  # not the temp file's 0600
+            except BaseException:
+                f.close()
+                os.remove(tmp_path)
+                raise
+        try:
+            os.replace(tmp_path, self.persist_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _percentile_rank(self, dimension: str, score: int, excluded: Optional[int] = None) -> Optional[float]:
+        """Mid-rank percentile: scores below plus half of the ties, less one `excluded` score"""
+        bins = self._bins.get(dimension)
+        if bins is None:
+            return None
+        total = self._totals[dimension]
+        below = sum(bins[:score])
+        ties = bins[score]
+        if excluded is not None and bins[excluded]:
+            total -= 1
+            if excluded < score:
+                below -= 1
+            elif excluded == score:
+                ties -= 1
+        if total == 0:
+            return None
+
+        return round((below + ties * 0.5) / total * 100, 1)
+
+    def _should_persist(self) -> bool:
+        if not self.persist_path:
+            return False
+        return (self._pending >= self.persist_every or
+                time.monotonic() - self._last_persist >= self.persist_interval)
+
+    def _clamp(self, score) -> int:
+        return max(self.MIN_SCORE, min(self.MAX_SCORE, int(round(score))))
+
+    def _load(self):
+        if not os.path.exists(self.persist_path):
+            return
+
+        try:
+            with open(self.persist_path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load score distribution: {e}")
+            return
+
+        for dim in self.dimensions:
+            bins = snapshot.get('bins', {}).get(dim)
+            if bins and len(bins) == self.MAX_SCORE + 1:
+                self._bins[dim] = [int(count) for count in bins]
+                self._totals[dim] = sum(self._bins[dim])
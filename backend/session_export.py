@@ -0,0 +1,175 @@
+"""
+Session Export and Import
+Streams sessions out as NDJSON in constant memory and loads them back with batched inserts
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from datetime import datetime
+import json
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import selectinload, undefer_group
+
+from database import db, UserSession, CoverLetter, SessionSkill, SKILL_ROLE_COLUMNS, canonical_skill_names
+
+
+def session_record(session: UserSession) -> Dict[str, Any]:
+    """
+    Everything stored for a session as one JSON-ready dict: to_dict() plus
+    the resume text, its version and interview-question generation, and
+    every cover letter version, not just the latest
+    """
+    record = session.to_dict()
+    del record['id']
+    record['version'] = session.version
+    record['updated_at'] = session.updated_at.isoformat() if session.updated_at else None
+    record['interview_generation'] = session.interview_generation
+    record['resume_data']['text'] = session.resume_text
+    record['cover_letters'] = [row.to_dict() for row in session.cover_letter_rows]
+    return record
+
+
+def iter_session_batches(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                         user_id: Optional[str] = None, batch_size: int = 500) -> Iterator[List[UserSession]]:
+    """
+    Sessions in batches of `batch_size`, read through a streaming cursor
+    (yield_per), so only one batch is in memory at a time. Cover letters
+    are loaded with one extra query per batch.
+    """
+    query = select(UserSession)\
+        .options(undefer_group('details'), selectinload(UserSession.cover_letter_rows))\
+        .order_by(UserSession.id)
+    if since is not None:
+        query = query.where(UserSession.created_at >= since)
+    if until is not None:
+        query = query.where(UserSession.created_at < until)
+    if user_id is not None:
+        query = query.where(UserSession.user_id == user_id)
+
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+    for batch in result.scalars().partitions():
+        yield batch
+        # Drop the batch from the session so it can be garbage collected
+        for session in batch:
+            for row in session.cover_letter_rows:
+                db.session.expunge(row)
+            db.session.expunge(session)
+
+
+def export_ndjson(**filters) -> Iterator[str]:
+    """NDJSON text of the matching sessions, one chunk per batch"""
+    for batch in iter_session_batches(**filters):
+        yield ''.join(json.dumps(session_record(session), separators=(',', ':')) + '\n' for session in batch)
+
+
+def _json_column(value) -> Optional[str]:
+    return json.dumps(value) if value else None
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _session_columns(record: Dict[str, Any]) -> Dict[str, Any]:
+    resume = record.get('resume_data') or {}
+    job = record.get('job_data') or {}
+    analysis = record.get('analysis_results') or {}
+    return {
+        'session_id': record['session_id'],
+        'user_id': record.get('user_id') or 'anonymous',
+        'created_at': _parse_datetime(record.get('created_at')) or datetime.utcnow(),
+        'version': record.get('version') or 1,
+        'updated_at': _parse_datetime(record.get('updated_at')),
+        'interview_generation': record.get('interview_generation') or 0,
+        'resume_text': resume.get('text'),
+        'resume_file_name': resume.get('file_name'),
+        'resume_skills': _json_column(resume.get('skills')),
+        'resume_experience': _json_column(resume.get('experience')),
+        'resume_education': _json_column(resume.get('education')),
+        'resume_personal_info': _json_column(resume.get('personal_info')),
+        'resume_sections': _json_column(resume.get('sections')),
+        'resume_entities': _json_column(resume.get('entities')),
+        'job_description': job.get('description'),
+        'job_skills': _json_column(job.get('skills')),
+        'job_experience_level': job.get('experience_level'),
+        'job_analysis': _json_column(job.get('full_analysis')),
+        'match_score': analysis.get('match_score'),
+        'matching_skills': _json_column(analysis.get('matching_skills')),
+        'missing_skills': _json_column(analysis.get('missing_skills')),
+        'ai_recommendations': _json_column(analysis.get('ai_recommendations')),
+        'improvement_plan': _json_column(analysis.get('improvement_plan'))
+    }
+
+
+def _cover_letter_rows(session_id: str, record: Dict[str, Any]) -> List[Dict[str, Any]]:
+    letters = record.get('cover_letters') or []
+    if isinstance(letters, dict):  # to_dict() shape: latest version by tone
+        letters = list(letters.values())
+    return [{
+        'session_id': session_id,
+        'tone': letter['tone'],
+        'version': letter.get('version') or 1,
+        'content': letter.get('content', ''),
+        'word_count': letter.get('word_count'),
+        'customizations': json.dumps(letter.get('customizations') or {}),
+        'render_ms': letter.get('render_ms'),
+        'generated_at': _parse_datetime(letter.get('generated_at'))
+    } for letter in letters]
+
+
+def _skill_rows(columns: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    for role, column in SKILL_ROLE_COLUMNS.items():
+        skills = json.loads(columns[column]) if columns[column] else []
+        rows.extend({
+            'session_id': columns['session_id'],
+            'role': role,
+            'skill': name,
+            'created_at': columns['created_at']
+        } for name in sorted(canonical_skill_names(skills)))
+    return rows
+
+
+def import_ndjson(lines: Iterable, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Load sessions from NDJSON lines (str or bytes), such as export or
+    archive files. Each batch is inserted with one multi-row INSERT per
+    table and committed. Sessions that already exist are skipped.
+    """
+    counts = {'sessions_imported': 0, 'sessions_skipped': 0, 'cover_letters_imported': 0}
+    batch = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            batch.append(json.loads(line))
+        if len(batch) >= batch_size:
+            _import_batch(batch, counts)
+            batch = []
+    if batch:
+        _import_batch(batch, counts)
+    return counts
+
+
+def _import_batch(records: List[Dict[str, Any]], counts: Dict[str, int]):
+    ids = {record['session_id'] for record in records}
+    existing = set(db.session.scalars(select(UserSession.session_id).where(UserSession.session_id.in_(ids))))
+
+    sessions, cover_letters, skills = [], [], []
+    for record in records:
+        session_id = record['session_id']
+        if session_id in existing:
+            counts['sessions_skipped'] += 1
+            continue
+        existing.add(session_id)  # duplicates within the file
+        columns = _session_columns(record)
+        sessions.append(columns)
+        cover_letters.extend(_cover_letter_rows(session_id, record))
+        skills.extend(_skill_rows(columns))
+
+    for model, rows in ((UserSession, sessions), (CoverLetter, cover_letters), (SessionSkill, skills)):
+        if rows:
+            db.session.execute(insert(model), rows)
+    db.session.commit()
+
+    counts['sessions_imported'] += len(sessions)
+    counts['cover_letters_imported'] += len(cover_letters)
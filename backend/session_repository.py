@@ -0,0 +1,255 @@
+"""
+Session Repository
+Loads a session once, caches it decoded, and drops it from the cache when a commit changes it
+"""
+
+from typing import Any, Dict, List, Optional
+from collections.abc import Mapping
+from datetime import datetime
+import json
+import os
+import sys
+
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import undefer_group
+
+from database import UserSession
+from session_cache import SessionCache
+from tracing import span
+
+
+# Every column a view exposes; the legacy cover_letters blob and the score
+# bookkeeping (read straight from the database) are not among them
+COLUMNS = tuple(name for name in UserSession.__table__.columns.keys()
+                if name not in ('cover_letters', 'recorded_scores'))
+
+# Decoded JSON takes about 4x the memory of its text, and a view keeps the
+# text too: a fully decoded view measured 2.4-3.1x its raw column bytes
+# (median 2.6) over the bundled sessions, so an entry is charged its raw
+# column bytes times the top of that range
+DECODED_SIZE_FACTOR = 3.0
+
+_NOT_DECODED = object()
+
+
+class JsonColumn:
+    """A JSON text column of the session, decoded on first access"""
+    __slots__ = ('column', 'default', 'slot')
+
+    def __init__(self, column: str, default: type):
+        self.column = column
+        self.default = default
+
+    def __set_name__(self, owner, name):
+        self.slot = '_' + name
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        value = getattr(view, self.slot, _NOT_DECODED)
+        if value is _NOT_DECODED:
+            raw = view.values[self.column]
+            value = json.loads(raw) if raw else self.default()
+            setattr(view, self.slot, value)
+        return value
+
+
+class RowColumn:
+    """A plain (non-JSON) column of the session"""
+    __slots__ = ('column',)
+
+    def __init__(self, column: str):
+        self.column = column
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        return view.values[self.column]
+
+
+class SessionSection(Mapping):
+    """
+    Read-only dict-like slice of a session (resume_data, job_data, ...) as
+    the analyzers expect it. Values are decoded only when a key is read.
+    """
+    __slots__ = ('_view', '_fields')
+
+    def __init__(self, view: 'SessionView', fields: Dict[str, str]):
+        self._view = view
+        self._fields = fields
+
+    def __getitem__(self, key):
+        return getattr(self._view, self._fields[key])
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+
+class SessionView:
+    """
+    Typed, read-only snapshot of one UserSession row. JSON columns decode
+    lazily, once. Views are shared between requests through the cache, so
+    decoded values must not be modified in place.
+    """
+    __slots__ = (
+        'values', 'size',
+        '_resume_skills', '_resume_experience', '_resume_education', '_resume_personal_info',
+        '_resume_sections', '_resume_entities', '_job_skills', '_job_analysis',
+        '_matching_skills', '_missing_skills', '_ai_recommendations', '_improvement_plan'
+    )
+
+    session_id: str = RowColumn('session_id')
+    user_id: str = RowColumn('user_id')
+    created_at: datetime = RowColumn('created_at')
+    resume_text: Optional[str] = RowColumn('resume_text')
+    resume_file_name: Optional[str] = RowColumn('resume_file_name')
+    job_description: Optional[str] = RowColumn('job_description')
+    job_experience_level: Optional[str] = RowColumn('job_experience_level')
+    match_score: Optional[float] = RowColumn('match_score')
+    interview_generation: int = RowColumn('interview_generation')
+
+    resume_skills: List[str] = JsonColumn('resume_skills', list)
+    resume_experience: Dict[str, Any] = JsonColumn('resume_experience', dict)
+    resume_education: List[str] = JsonColumn('resume_education', list)
+    resume_personal_info: Dict[str, Any] = JsonColumn('resume_personal_info', dict)
+    resume_sections: List[str] = JsonColumn('resume_sections', list)
+    resume_entities: Dict[str, Any] = JsonColumn('resume_entities', dict)
+    job_skills: List[str] = JsonColumn('job_skills', list)
+    job_analysis: Dict[str, Any] = JsonColumn('job_analysis', dict)
+    matching_skills: List[str] = JsonColumn('matching_skills', list)
+    missing_skills: List[str] = JsonColumn('missing_skills', list)
+    ai_recommendations: List[Dict[str, Any]] = JsonColumn('ai_recommendations', list)
+    improvement_plan: Dict[str, Any] = JsonColumn('improvement_plan', dict)
+
+    RESUME_FIELDS = {
+        'text': 'resume_text',
+        'skills': 'resume_skills',
+        'experience': 'resume_experience',
+        'education': 'resume_education',
+        'personal_info': 'resume_personal_info',
+        'sections': 'resume_sections'
+    }
+    JOB_FIELDS = {
+        'description': 'job_description',
+        'skills': 'job_skills',
+        'experience_level': 'job_experience_level',
+        'full_analysis': 'job_analysis'
+    }
+    ANALYSIS_FIELDS = {
+        'match_score': 'match_score',
+        'matching_skills': 'matching_skills',
+        'missing_skills': 'missing_skills'
+    }
+
+    def __init__(self, values: Dict[str, Any]):
+        self.values = values
+        self.size = int(sum(sys.getsizeof(value) for value in values.values()) * DECODED_SIZE_FACTOR)
+
+    @classmethod
+    def from_row(cls, row: UserSession) -> 'SessionView':
+        return cls({column: getattr(row, column) for column in COLUMNS})
+
+    @property
+    def resume_data(self) -> SessionSection:
+        return SessionSection(self, self.RESUME_FIELDS)
+
+    @property
+    def job_data(self) -> SessionSection:
+        return SessionSection(self, self.JOB_FIELDS)
+
+    @property
+    def analysis_results(self) -> SessionSection:
+        return SessionSection(self, self.ANALYSIS_FIELDS)
+
+    def cover_letter_data(self) -> Dict[str, SessionSection]:
+        """The session_data shape the cover letter generator reads"""
+        return {
+            'resume_data': self.resume_data,
+            'job_data': self.job_data,
+            'analysis_results': self.analysis_results
+        }
+
+
+class SessionRepository:
+    """
+    Session lookups: per request (flask.g), then the shared cache, then the
+    database. Views are detached snapshots, safe to hand to worker threads;
+    writes go through row(), and sessions changed by a commit are dropped
+    from the cache and reloaded on their next read.
+    """
+
+    def __init__(self, cache: Optional[SessionCache] = None):
+        self.cache = cache or SessionCache(
+            max_bytes=int(os.environ.get('SESSION_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+            ttl=float(os.environ.get('SESSION_CACHE_TTL', 300))
+        )
+
+    def get(self, session_id: str) -> Optional[SessionView]:
+        """The session's view, or None"""
+        views = g.setdefault('session_views', {})
+        view = views.get(session_id)
+        if view is None:
+            view = self.cache.get(session_id)
+        if view is None:
+            with span('db.load_session'):
+                row = UserSession.query.filter_by(session_id=session_id)\
+                    .options(undefer_group('details'))\
+                    .first()
+                if row is None:
+                    return None
+                view = SessionView.from_row(row)
+            self.cache.put(session_id, view, view.size)
+
+        views[session_id] = view
+        return view
+
+    def row(self, session_id: str) -> Optional[UserSession]:
+        """The ORM row, for endpoints that write to the session"""
+        rows = g.setdefault('session_rows', {})
+        if session_id not in rows:
+            rows[session_id] = UserSession.query.filter_by(session_id=session_id).first()
+        return rows[session_id]
+
+    def install(self, db_session):
+        """Drop committed UserSession changes from the cache"""
+        event.listen(db_session, 'after_flush', self._collect_changes)
+        event.listen(db_session, 'do_orm_execute', self._collect_bulk_changes)
+        event.listen(db_session, 'after_commit', self._apply_changes)
+        event.listen(db_session, 'after_rollback', self._discard_changes)
+
+    def _collect_changes(self, db_session, flush_context):
+        # The row in this request may be older than the committed one in the
+        # columns it didn't change, so changed sessions are reloaded, not
+        # rebuilt from it
+        pending = db_session.info.setdefault('session_cache_pending', set())
+        for obj in db_session.new | db_session.dirty | db_session.deleted:
+            if isinstance(obj, UserSession):
+                pending.add(obj.session_id)
+
+    def _collect_bulk_changes(self, execute_state):
+        # Bulk UPDATE/DELETE statements don't say which sessions they touched
+        mapper = execute_state.bind_mapper
+        if (execute_state.is_update or execute_state.is_delete) and mapper is not None \
+                and mapper.class_ is UserSession:
+            execute_state.session.info['session_cache_clear'] = True
+
+    def _apply_changes(self, db_session):
+        pending = db_session.info.pop('session_cache_pending', set())
+        views = g.get('session_views') if has_app_context() else None
+        if db_session.info.pop('session_cache_clear', False):
+            self.cache.clear()
+            if views is not None:
+                views.clear()
+        for session_id in pending:
+            self.cache.invalidate(session_id)
+            # Later reads in the same request load the committed values
+            if views is not None:
+                views.pop(session_id, None)
+
+    def _discard_changes(self, db_session):
+        db_session.info.pop('session_cache_pending', None)
+        db_session.info.pop('session_cache_clear', None)
@@ -3,12 +3,22 @@ AI-Powered Skill Gap Analyzer
 Analyzes skill gaps between resume and job requirements, provides learning roadmaps
 """
 
-from typing import Dict, List, Any, Set
+from typing import Dict, List, Any, Set, Optional
 import re
 
+from skill_mentions import SkillMentionCounter
+from skill_taxonomy import skill_taxonomy
+from datasets.skills_dataset import SkillsDataset
+from market_demand import MarketDemandTracker
+
 
 class SkillGapAnalyzer:
-    def __init__(self):
+    def __init__(self, market_demand: Optional[MarketDemandTracker] = None):
+        self.skills_dataset = SkillsDataset()
+
+        # Demand measured from analyzed job postings (falls back to market_data)
+        self.market_demand = market_demand
+
         # Learning resources by skill category
         self.learning_resources = {
             'python': {
@@ -50,7 +60,8 @@ class SkillGapAnalyzer:
             'advanced': {'weeks': 12, 'hours_per_week': 15}
         }
 
-        # Industry demand data (simulated market data)
+        # Industry demand data (simulated market data, used until enough
+        # postings have been analyzed; growth and salary boost always)
         self.market_data = {
             'python': {'demand': 95, 'growth': 'High', 'avg_salary_boost': '15%'},
             'javascript': {'demand': 92, 'growth': 'High', 'avg_salary_boost': '12%'},
@@ -70,22 +81,27 @@ class SkillGapAnalyzer:
         Comprehensive skill gap analysis with learning roadmap
         """
 
-        # Extract skills
-        resume_skills = set(s.lower().strip() for s in resume_data.get('skills', []))
-        job_skills = set(s.lower().strip() for s in job_data.get('skills', []))
-
-        # Identify gaps
-        missing_skills = job_skills - resume_skills
-        matching_skills = resume_skills & job_skills
-        extra_skills = resume_skills - job_skills
+        # Identify gaps with bitwise operations over taxonomy IDs
+        skill_match = skill_taxonomy.compare(resume_data.get('skills', []), job_data.get('skills', []))
+        missing_skills = skill_match.names(skill_match.missing)
+        matching_skills = skill_match.names(skill_match.matching)
+        extra_skills = skill_match.names(skill_match.extra)
+
+        # Count every job skill's mentions (under any of its spellings) in a
+        # single pass over the description
+        mentions = SkillMentionCounter(job_data.get('description'))
+        mention_counts = {
+            skill: sum(mentions.count(spelling) for spelling in skill_taxonomy.spellings(skill))
+            for skill in missing_skills + matching_skills
+        }
 
         # Calculate readiness score
         readiness_score = self._calculate_readiness_score(
-            len(matching_skills), len(missing_skills), len(job_skills)
+            len(matching_skills), len(missing_skills), skill_match.job.bit_count()
         )
 
         # Prioritize missing skills
-        prioritized_gaps = self._prioritize_skills(missing_skills, job_data)
+        prioritized_gaps = self._prioritize_skills(missing_skills, mention_counts)
 
         # Generate learning paths
         learning_paths = self._generate_learning_paths(prioritized_gaps)
@@ -97,7 +113,7 @@ class SkillGapAnalyzer:
         time_estimate = self._estimate_time_to_ready(prioritized_gaps)
 
         # Market insights
-        market_insights = self._get_market_insights(missing_skills, matching_skills)
+        market_insights = self._get_market_insights(missing_skills, matching_skills, mention_counts)
 
         # Transferable skills analysis
         transferable = self._identify_transferable_skills(extra_skills, missing_skills)
@@ -109,10 +125,10 @@ class SkillGapAnalyzer:
 
         return {
             'readiness_score': readiness_score,
-            'matching_skills': list(matching_skills),
-            'missing_skills': list(missing_skills),
+            'matching_skills': matching_skills,
+            'missing_skills': missing_skills,
             'prioritized_gaps': prioritized_gaps,
-            'extra_skills': list(extra_skills),
+            'extra_skills': extra_skills,
             'learning_paths': learning_paths,
             'roadmap': roadmap,
             'time_estimate': time_estimate,
@@ -152,21 +168,19 @@ class SkillGapAnalyzer:
             'total_required': total_required
         }
 
-    def _prioritize_skills(self, missing_skills: Set[str],
-                          job_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _prioritize_skills(self, missing_skills: List[str],
+                          mention_counts: Dict[str, int]) -> List[Dict[str, Any]]:
         """Prioritize missing skills by importance and market demand"""
         prioritized = []
 
-        job_text = job_data.get('description', '').lower()
-
         for skill in missing_skills:
-            # Count mentions in job description (importance indicator)
-            mentions = job_text.count(skill)
+            # Mentions in job description (importance indicator)
+            mentions = mention_counts.get(skill, 0)
 
             # Get market data
-            market_info = self.market_data.get(skill, {
+            market_info = self._market_info(skill) or {
                 'demand': 50, 'growth': 'Medium', 'avg_salary_boost': '10%'
-            })
+            }
 
             # Determine priority
             if mentions >= 3 or market_info['demand'] >= 85:
@@ -251,9 +265,14 @@ class SkillGapAnalyzer:
         """Create a detailed learning roadmap"""
         roadmap = {
             'overview': 'Week-by-week skill development plan',
+            'learning_order': self._order_by_prerequisites(prioritized_gaps, set()),
             'phases': []
         }
 
+        # Missing prerequisites are pulled into the phase of the first skill
+        # that needs them, so no phase asks for a skill before its foundations
+        scheduled = set()
+
         # Phase 1: Critical skills (weeks 1-8)
         critical_skills = [g for g in prioritized_gaps if g['priority'] == 'Critical'][:2]
         if critical_skills:
@@ -261,7 +280,7 @@ class SkillGapAnalyzer:
                 'phase': 1,
                 'duration': '8 weeks',
                 'focus': 'Critical Skills Development',
-                'skills': [s['skill'] for s in critical_skills],
+                'skills': self._order_by_prerequisites(critical_skills, scheduled, prioritized_gaps),
                 'milestones': [
                     'Week 2: Complete foundational courses',
                     'Week 4: Build first practice project',
@@ -272,13 +291,14 @@ class SkillGapAnalyzer:
             })
 
         # Phase 2: High priority skills (weeks 9-16)
-        high_priority = [g for g in prioritized_gaps if g['priority'] == 'High'][:2]
+        high_priority = [g for g in prioritized_gaps
+                         if g['priority'] == 'High' and g['skill'] not in scheduled][:2]
         if high_priority:
             roadmap['phases'].append({
                 'phase': 2,
                 'duration': '8 weeks',
                 'focus': 'High Priority Skills',
-                'skills': [s['skill'] for s in high_priority],
+                'skills': self._order_by_prerequisites(high_priority, scheduled, prioritized_gaps),
                 'milestones': [
                     'Week 10: Start second skill development',
                     'Week 12: Integrate multiple skills in project',
@@ -289,13 +309,14 @@ class SkillGapAnalyzer:
             })
 
         # Phase 3: Ongoing development (weeks 17+)
-        medium_priority = [g for g in prioritized_gaps if g['priority'] == 'Medium'][:3]
+        medium_priority = [g for g in prioritized_gaps
+                           if g['priority'] == 'Medium' and g['skill'] not in scheduled][:3]
         if medium_priority:
             roadmap['phases'].append({
                 'phase': 3,
                 'duration': 'Ongoing',
                 'focus': 'Continuous Learning',
-                'skills': [s['skill'] for s in medium_priority],
+                'skills': self._order_by_prerequisites(medium_priority, scheduled, prioritized_gaps),
                 'milestones': [
                     'Continue building projects',
                     'Stay updated with industry trends',
@@ -307,6 +328,20 @@ class SkillGapAnalyzer:
 
         return roadmap
 
+    def _order_by_prerequisites(self, gaps: List[Dict[str, Any]], scheduled: Set[str],
+                                all_gaps: List[Dict[str, Any]] = None) -> List[str]:
+        """
+        Skills of the given gaps, each preceded by its missing prerequisites.
+        Skills already in `scheduled` are skipped; `scheduled` is updated.
+        """
+        missing = [g['skill'] for g in (all_gaps if all_gaps is not None else gaps)]
+
+        skills = self.skills_dataset.prerequisite_graph.learning_order(
+            [g['skill'] for g in gaps], known=scheduled, pending=missing
+        )
+        scheduled.update(skills)
+        return skills
+
     def _estimate_time_to_ready(self, prioritized_gaps: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Estimate time needed to become job-ready"""
         critical_count = len([g for g in prioritized_gaps if g['priority'] == 'Critical'])
@@ -338,8 +373,9 @@ class SkillGapAnalyzer:
             'recommended_schedule': f'{hours_per_week} hours/week for {weeks_needed} weeks'
         }
 
-    def _get_market_insights(self, missing_skills: Set[str],
-                            matching_skills: Set[str]) -> Dict[str, Any]:
+    def _get_market_insights(self, missing_skills: List[str],
+                            matching_skills: List[str],
+                            mention_counts: Dict[str, int]) -> Dict[str, Any]:
         """Provide market insights for skills"""
         insights = {
             'high_demand_missing': [],
@@ -349,27 +385,29 @@ class SkillGapAnalyzer:
         }
 
         for skill in missing_skills:
-            market_info = self.market_data.get(skill, None)
+            market_info = self._market_info(skill)
             if market_info and market_info['demand'] >= 80:
                 insights['high_demand_missing'].append({
                     'skill': skill,
                     'demand': market_info['demand'],
-                    'trend': market_info['growth']
+                    'trend': market_info['growth'],
+                    'mentions_in_job': mention_counts.get(skill, 0)
                 })
 
         for skill in matching_skills:
-            market_info = self.market_data.get(skill, None)
+            market_info = self._market_info(skill)
             if market_info and market_info['demand'] >= 80:
                 insights['high_demand_present'].append({
                     'skill': skill,
                     'demand': market_info['demand'],
-                    'value': 'Strong asset for this role'
+                    'value': 'Strong asset for this role',
+                    'mentions_in_job': mention_counts.get(skill, 0)
                 })
 
         # Trending skills
-        all_skills = list(missing_skills) + list(matching_skills)
+        all_skills = missing_skills + matching_skills
         for skill in all_skills:
-            market_info = self.market_data.get(skill, None)
+            market_info = self._market_info(skill)
             if market_info and market_info['growth'] == 'Very High':
                 insights['trending_skills'].append({
                     'skill': skill,
@@ -379,18 +417,29 @@ class SkillGapAnalyzer:
 
         return insights
 
-    def _identify_transferable_skills(self, extra_skills: Set[str],
-                                     missing_skills: Set[str]) -> List[Dict[str, str]]:
+    def _market_info(self, skill: str) -> Optional[Dict[str, Any]]:
+        """Market data for a skill, with demand taken from analyzed postings when available"""
+        static_info = self.market_data.get(skill)
+        demand = self.market_demand.demand(skill) if self.market_demand else None
+        if demand is None:
+            return static_info
+
+        market_info = dict(static_info or {'growth': 'Medium', 'avg_salary_boost': '10%'})
+        market_info['demand'] = demand
+        return market_info
+
+    def _identify_transferable_skills(self, extra_skills: List[str],
+                                     missing_skills: List[str]) -> List[Dict[str, str]]:
         """Identify transferable skills that could bridge gaps"""
         transferable = []
 
-        # Skill relationships (simplified)
+        # Skill relationships (simplified), by canonical name like the skills compared
         skill_relations = {
             'python': ['java', 'javascript', 'ruby'],
             'javascript': ['typescript', 'node.js', 'react'],
             'react': ['vue', 'angular', 'frontend'],
             'sql': ['postgresql', 'mysql', 'database'],
-            'aws': ['azure', 'gcp', 'cloud']
+            'aws': ['azure', 'google cloud', 'cloud']
         }
 
         for extra in extra_skills:
@@ -409,7 +458,7 @@ class SkillGapAnalyzer:
 
     def _generate_recommendations(self, readiness_score: Dict[str, Any],
                                  prioritized_gaps: List[Dict[str, Any]],
-                                 matching_skills: Set[str]) -> List[Dict[str, str]]:
+                                 matching_skills: List[str]) -> List[Dict[str, str]]:
         """Generate actionable recommendations"""
         recommendations = []
 
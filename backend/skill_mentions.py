@@ -0,0 +1,91 @@
+"""
+Skill Mention Counter
+Counts how often skills are mentioned in a text using a single tokenization pass
+"""
+
+from typing import Dict, Iterable, List, Tuple
+from collections import Counter
+import functools
+import re
+
+
+# Tokens keep the punctuation that appears inside skill names
+# ("node.js", "c++", "c#", "ci/cd") but drop trailing sentence punctuation.
+TOKEN_PATTERN = re.compile(r'[a-z0-9+#]+(?:[./\-][a-z0-9+#]+)*')
+# Every ASCII character that can't be part of a token, mapped to a space
+SEPARATORS = str.maketrans({chr(code): ' ' for code in range(128)
+                            if not (chr(code).isalnum() or chr(code) in '+#./-')})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, skill-name aware"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+@functools.lru_cache(maxsize=4096)
+def _phrase(skill: str) -> Tuple[str, ...]:
+    # Skill names repeat across requests; tokenizing each is most of a lookup
+    return tuple(tokenize(skill))
+
+
+class SkillMentionCounter:
+    """
+    Word-boundary aware mention counts for any number of skills.
+
+    The text is split on separator characters with str.translate and
+    str.split, and its words counted, all in C; only the few distinct
+    chunks that aren't a single clean token ("python.", "c++/c#") go
+    through the token pattern, so the words come out exactly as
+    tokenize() would give them. A one-word skill is then a dict hit, and
+    a phrase such as "machine learning" is only looked for where its first
+    word occurs. "go" no longer matches inside "good", and multi-word
+    skills are matched as whole phrases.
+    """
+
+    def __init__(self, text: str):
+        self._chunks = (text or '').lower().translate(SEPARATORS).split()
+        words = Counter(self._chunks)
+        self._split = {chunk: TOKEN_PATTERN.findall(chunk) for chunk in words
+                       if not TOKEN_PATTERN.fullmatch(chunk)}
+        for chunk, tokens in self._split.items():
+            occurrences = words.pop(chunk)
+            for token in tokens:
+                words[token] += occurrences
+        self._words = words
+        self._tokens = None  # the token sequence, built for the first phrase lookup
+
+    def count(self, skill: str) -> int:
+        """Number of times the skill appears as a whole phrase"""
+        phrase = _phrase(skill)
+        if not phrase:
+            return 0
+        first = self._words.get(phrase[0], 0)
+        if first == 0 or len(phrase) == 1:
+            return first
+
+        tokens, n = self._token_list(), len(phrase)
+        count, index = 0, -1
+        for _ in range(first):
+            index = tokens.index(phrase[0], index + 1)
+            if tuple(tokens[index:index + n]) == phrase:
+                count += 1
+        return count
+
+    def counts(self, skills: Iterable[str]) -> Dict[str, int]:
+        """Mention counts for many skills at once"""
+        return {skill: self.count(skill) for skill in skills}
+
+    def _token_list(self) -> List[str]:
+        if self._tokens is None:
+            split = self._split
+            if not split:
+                self._tokens = self._chunks
+            else:
+                tokens = []
+                for chunk in self._chunks:
+                    if chunk in split:
+                        tokens.extend(split[chunk])
+                    else:
+                        tokens.append(chunk)
+                self._tokens = tokens
+        return self._tokens
@@ -0,0 +1,183 @@
+"""
+Skill Taxonomy
+Canonical skill IDs and bitset skill sets shared by the matching, gap and scoring modules
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from datasets.skills_dataset import SkillsDataset
+
+
+# Spelling variants mapped to the canonical (lowercase) skill name
+SKILL_ALIASES = {
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'angularjs': 'angular',
+    'nodejs': 'node.js',
+    'expressjs': 'express',
+    'express.js': 'express',
+    'nextjs': 'next.js',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'golang': 'go',
+    'postgres': 'postgresql',
+    'mongo': 'mongodb',
+    'k8s': 'kubernetes',
+    'amazon web services': 'aws',
+    'gcp': 'google cloud',
+    'google cloud platform': 'google cloud',
+    'microsoft azure': 'azure',
+    'ml': 'machine learning',
+    'sklearn': 'scikit-learn',
+    'ci cd': 'ci/cd',
+    'cicd': 'ci/cd'
+}
+
+
+class SkillMatch:
+    """
+    Result of comparing a resume's skills with a job's skills.
+    The sets are bitsets over taxonomy IDs; names come out in ID order.
+    """
+    __slots__ = ('taxonomy', 'extra_ids', 'resume', 'job', 'matching', 'missing', 'extra')
+
+    def __init__(self, taxonomy: 'SkillTaxonomy', resume: int, job: int, extra_ids: Dict[str, int] = None):
+        self.taxonomy = taxonomy
+        self.extra_ids = extra_ids
+        self.resume = resume
+        self.job = job
+        self.matching = resume & job
+        self.missing = job & ~resume
+        self.extra = resume & ~job
+
+    def names(self, bits: int) -> List[str]:
+        return self.taxonomy.names(bits, self.extra_ids)
+
+    @property
+    def match_ratio(self) -> float:
+        """Share of the job's skills found on the resume"""
+        job_count = self.job.bit_count()
+        return self.matching.bit_count() / job_count if job_count else 0.0
+
+
+class SkillTaxonomy:
+    """
+    Maps every skill name and alias of the skills dataset to a dense
+    integer ID.
+
+    A set of skills is a Python int with bit `id` set for each skill, so
+    intersections and differences are single bitwise operations and set
+    sizes are `int.bit_count()`. The IDs are fixed when the taxonomy is
+    built. Skills outside it (parsers find more than the dataset lists,
+    and some noise) get IDs past the taxonomy's from an `extra_ids` dict
+    that lives only as long as the comparison using it, so neither the
+    taxonomy nor the width of its bitsets grows with the input.
+    """
+
+    # Raw spellings ("ReactJS", "React ") remembered, at most
+    MAX_RAW_SPELLINGS = 10000
+
+    def __init__(self, skills: Iterable[str] = (), aliases: Dict[str, str] = None):
+        self._ids: Dict[str, int] = {}
+        # Raw spelling as received -> ID, or canonical name for skills
+        # outside the taxonomy, so repeated lookups skip normalization
+        self._raw_ids: Dict[str, Union[int, str]] = {}
+        self._names: List[str] = []
+        self._aliases = {alias: canonical.lower() for alias, canonical in (aliases or {}).items()}
+        self._spellings: Dict[str, Tuple[str, ...]] = {}
+        for alias, canonical in self._aliases.items():
+            self._spellings[canonical] = self._spellings.get(canonical, (canonical,)) + (alias,)
+
+        for skill in list(skills) + list(self._aliases.values()):
+            name = self.canonical(skill)
+            if name not in self._ids:
+                self._ids[name] = len(self._names)
+                self._names.append(name)
+
+    @classmethod
+    def from_skills_dataset(cls) -> 'SkillTaxonomy':
+        dataset = SkillsDataset()
+        skills = [name for category in dataset.skills_data.values() for name in category]
+        return cls(skills, SKILL_ALIASES)
+
+    def canonical(self, skill: str) -> str:
+        """Lowercase canonical name of a skill or alias"""
+        name = ' '.join(skill.lower().split())
+        return self._aliases.get(name, name)
+
+    def skill_id(self, skill: str, extra_ids: Optional[Dict[str, int]] = None) -> Optional[int]:
+        """
+        ID of a skill. One outside the taxonomy takes the next free ID in
+        `extra_ids` (None without it).
+        """
+        name = self.canonical(skill)
+        skill_id = self._ids.get(name)
+        if skill_id is None and extra_ids is not None:
+            skill_id = extra_ids.get(name)
+            if skill_id is None:
+                skill_id = extra_ids[name] = len(self._names) + len(extra_ids)
+        return skill_id
+
+    def to_bits(self, skills: Iterable[str], extra_ids: Optional[Dict[str, int]] = None) -> int:
+        """
+        Bitset of a list of skill names. Skills outside the taxonomy are
+        numbered in `extra_ids`, which must be shared by the bitsets being
+        compared; without it they are left out.
+        """
+        raw_ids = self._raw_ids
+        bits = 0
+        for skill in skills:
+            skill_id = raw_ids.get(skill)
+            if skill_id is None:
+                if not skill or not skill.strip():
+                    continue
+                name = self.canonical(skill)
+                skill_id = self._ids.get(name, name)
+                if len(raw_ids) < self.MAX_RAW_SPELLINGS:
+                    raw_ids[skill] = skill_id
+            if isinstance(skill_id, str):
+                if extra_ids is None:
+                    continue
+                name = skill_id
+                skill_id = extra_ids.get(name)
+                if skill_id is None:
+                    skill_id = extra_ids[name] = len(self._names) + len(extra_ids)
+            bits |= 1 << skill_id
+        return bits
+
+    def contains(self, bits: int, skill: str, extra_ids: Optional[Dict[str, int]] = None) -> bool:
+        name = self.canonical(skill)
+        skill_id = self._ids.get(name)
+        if skill_id is None and extra_ids:
+            skill_id = extra_ids.get(name)
+        return skill_id is not None and bool(bits >> skill_id & 1)
+
+    def names(self, bits: int, extra_ids: Optional[Dict[str, int]] = None) -> List[str]:
+        """Canonical names of the skills in a bitset, in ID order"""
+        extra_names = {skill_id: name for name, skill_id in extra_ids.items()} if extra_ids else {}
+        known = len(self._names)
+        names = []
+        while bits:
+            low = bits & -bits
+            skill_id = low.bit_length() - 1
+            names.append(self._names[skill_id] if skill_id < known else extra_names[skill_id])
+            bits ^= low
+        return names
+
+    def spellings(self, skill: str) -> Tuple[str, ...]:
+        """The canonical name of a skill followed by all of its aliases"""
+        name = self.canonical(skill)
+        return self._spellings.get(name, (name,))
+
+    def compare(self, resume_skills: Iterable[str], job_skills: Iterable[str]) -> SkillMatch:
+        extra_ids = {}
+        return SkillMatch(self, self.to_bits(resume_skills, extra_ids), self.to_bits(job_skills, extra_ids), extra_ids)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+# Shared by every module so IDs (and therefore bitsets) are comparable
+skill_taxonomy = SkillTaxonomy.from_skills_dataset()
@@ -0,0 +1,174 @@
+"""
+Staged Executor
+Runs independent stages concurrently on a thread or process pool, with per-stage timeouts and timings
+"""
+
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextvars import copy_context
+import multiprocessing
+import os
+import threading
+import time
+
+from tracing import clear_trace
+
+
+class Stage:
+    """
+    One unit of work: func(*args). For a process pool, func must be a
+    module-level function and args picklable.
+    """
+    __slots__ = ('func', 'args', 'timeout')
+
+    def __init__(self, func: Callable, *args, timeout: Optional[float] = None):
+        self.func = func
+        self.args = args
+        self.timeout = timeout
+
+
+class StageOutcome:
+    """Result of a stage: status is 'ok', 'error' or 'timeout'"""
+    __slots__ = ('name', 'status', 'result', 'error', 'duration_ms', 'elapsed_ms')
+
+    def __init__(self, name: str, status: str, result: Any = None, error: Optional[BaseException] = None,
+                 duration_ms: Optional[float] = None, elapsed_ms: float = 0.0):
+        self.name = name
+        self.status = status
+        self.result = result
+        self.error = error
+        self.duration_ms = duration_ms  # the stage's own run time, in the worker
+        self.elapsed_ms = elapsed_ms  # since the run started, queueing included
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'ok'
+
+    def timing(self) -> Dict[str, Any]:
+        timing = {'status': self.status, 'duration_ms': self.duration_ms, 'elapsed_ms': self.elapsed_ms}
+        if self.error is not None:
+            timing['error'] = str(self.error) or type(self.error).__name__
+        return timing
+
+
+def _init_worker(worker_init: Optional[Callable]):
+    # Workers fork from a request thread; don't let them keep its trace
+    clear_trace()
+    if worker_init is not None:
+        worker_init()
+
+
+def _timed(func: Callable, args: Tuple) -> Tuple[Any, float]:
+    # Module level so process pools can pickle it
+    start = time.perf_counter()
+    result = func(*args)
+    return result, round((time.perf_counter() - start) * 1000, 3)
+
+
+class StagedExecutor:
+    """
+    Submits a dict of stages to a shared pool and yields their outcomes in
+    completion order. A stage that fails or passes its timeout is reported
+    as such while the others carry on, so callers always get the partial
+    results.
+
+    'thread' pools share the app's analyzers and their live state but run
+    pure-Python stages one at a time (the GIL). 'process' pools run them in
+    parallel; workers are forked from the app, so they see the analyzers as
+    they were at fork time, and state a stage updates (score distribution,
+    market demand) stays in the worker.
+
+    `worker_init` runs once in each forked worker, e.g. to stop it writing
+    its copy of shared state to files the app owns.
+
+    A timed-out stage can't be interrupted: its worker finishes it in the
+    background and the result is discarded.
+    """
+
+    def __init__(self, kind: str = 'thread', max_workers: int = 4, timeout: Optional[float] = None,
+                 worker_init: Optional[Callable] = None):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"kind must be 'thread' or 'process', not {kind!r}")
+        if kind == 'process' and 'fork' not in multiprocessing.get_all_start_methods():
+            print("⚠️  Process pools need fork; running stages on threads")
+            kind = 'thread'
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.timeout = timeout  # default for stages without their own
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._outcomes = {'ok': 0, 'error': 0, 'timeout': 0}
+        if kind == 'process':
+            self._pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('fork'),
+                                             initializer=_init_worker, initargs=(worker_init,))
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='stage')
+
+    @classmethod
+    def from_env(cls, prefix: str, worker_init: Optional[Callable] = None) -> 'StagedExecutor':
+        """Configured by <prefix>_EXECUTOR, <prefix>_WORKERS and <prefix>_STAGE_TIMEOUT"""
+        timeout = os.environ.get(f'{prefix}_STAGE_TIMEOUT')
+        return cls(
+            kind=os.environ.get(f'{prefix}_EXECUTOR', 'thread'),
+            max_workers=int(os.environ.get(f'{prefix}_WORKERS', 4)),
+            timeout=float(timeout) if timeout else None,
+            worker_init=worker_init
+        )
+
+    def run(self, stages: Dict[str, Stage]) -> Iterator[StageOutcome]:
+        for outcome in self._run(stages):
+            with self._lock:
+                self._outcomes[outcome.status] += 1
+            yield outcome
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'kind': self.kind,
+                'max_workers': self.max_workers,
+                'runs': self._runs,
+                'stages_ok': self._outcomes['ok'],
+                'stages_error': self._outcomes['error'],
+                'stages_timeout': self._outcomes['timeout']
+            }
+
+    def _run(self, stages: Dict[str, Stage]) -> Iterator[StageOutcome]:
+        with self._lock:
+            self._runs += 1
+        start = time.perf_counter()
+        pending = {}
+        for name, stage in stages.items():
+            timeout = stage.timeout if stage.timeout is not None else self.timeout
+            deadline = start + timeout if timeout is not None else None
+            if self.kind == 'thread':
+                # Spans opened by the stage nest under the caller's trace
+                future = self._pool.submit(copy_context().run, _timed, stage.func, stage.args)
+            else:
+                future = self._pool.submit(_timed, stage.func, stage.args)
+            pending[future] = (name, deadline)
+
+        while pending:
+            deadlines = [deadline for _, deadline in pending.values() if deadline is not None]
+            wait_for = max(min(deadlines) - time.perf_counter(), 0) if deadlines else None
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            now = time.perf_counter()
+            elapsed_ms = round((now - start) * 1000, 3)
+            for future in done:
+                name, _ = pending.pop(future)
+                try:
+                    result, duration_ms = future.result()
+                    yield StageOutcome(name, 'ok', result, duration_ms=duration_ms, elapsed_ms=elapsed_ms)
+                except Exception as e:
+                    yield StageOutcome(name, 'error', error=e, elapsed_ms=elapsed_ms)
+
+            for future, (name, deadline) in list(pending.items()):
+                if deadline is not None and deadline <= now:
+                    del pending[future]
+                    future.cancel()
+                    yield StageOutcome(name, 'timeout', error=TimeoutError(f'{name} timed out'),
+                                       elapsed_ms=elapsed_ms)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,175 @@
+"""
+Request Tracing
+Nested timing spans per request, returned on a debug header and logged for slow requests
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import json
+import os
+import time
+
+from flask import Flask, current_app, request
+
+# Requests slower than this are logged with their span tree; 0 turns it off
+SLOW_REQUEST_MS = float(os.environ.get('TRACE_SLOW_MS', 1000))
+DEBUG_REQUEST_HEADER = 'X-Debug-Trace'
+TRACE_RESPONSE_HEADER = 'X-Trace'
+
+_current_span: ContextVar[Optional['Span']] = ContextVar('current_span', default=None)
+
+
+class Span:
+    """A named, timed section of work and the spans opened inside it"""
+    __slots__ = ('name', 'attributes', 'start', 'duration_ms', 'error', 'children')
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.duration_ms = None
+        self.error = None
+        self.children: List['Span'] = []
+
+    def finish(self):
+        self.duration_ms = round((time.perf_counter() - self.start) * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        span = {'name': self.name, 'duration_ms': self.duration_ms}
+        if self.attributes:
+            span['attributes'] = self.attributes
+        if self.error:
+            span['error'] = self.error
+        if self.children:
+            span['children'] = [child.to_dict() for child in self.children]
+        return span
+
+    def format(self, depth: int = 0) -> str:
+        """Indented text tree, one span per line, with offsets from this span's start"""
+        lines = []
+        self._format_lines(lines, depth, self.start)
+        return '\n'.join(lines)
+
+    def _format_lines(self, lines: List[str], depth: int, origin: float):
+        offset_ms = (self.start - origin) * 1000
+        duration = f'{self.duration_ms:.1f} ms' if self.duration_ms is not None else 'unfinished'
+        line = f"{'  ' * depth}{self.name}  {duration}  (+{offset_ms:.1f} ms)"
+        if self.attributes:
+            line += '  ' + ' '.join(f'{key}={value}' for key, value in self.attributes.items())
+        if self.error:
+            line += f'  error={self.error}'
+        lines.append(line)
+        for child in self.children:
+            child._format_lines(lines, depth + 1, origin)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Time a block as a child of the current span. Outside a trace (CLI,
+    benchmarks, background threads) it does nothing and yields None.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(name, attributes or None)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = type(e).__name__
+        raise
+    finally:
+        child.finish()
+        _current_span.reset(token)
+
+
+def traced(name: str) -> Callable:
+    """Decorator: run the function inside span(name) when a trace is active"""
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def start_trace(name: str, **attributes):
+    """Open a root span; returns the span and the token for end_trace()"""
+    root = Span(name, attributes or None)
+    return root, _current_span.set(root)
+
+
+def end_trace(root: Span, token) -> Span:
+    root.finish()
+    _current_span.reset(token)
+    if SLOW_REQUEST_MS and root.duration_ms >= SLOW_REQUEST_MS:
+        print(f"⚠️  Slow: {root.name} took {root.duration_ms:.1f} ms\n{root.format(depth=1)}")
+    return root
+
+
+@contextmanager
+def trace(name: str, **attributes):
+    """Root span for work outside a request, such as a background job"""
+    root, token = start_trace(name, **attributes)
+    try:
+        yield root
+    except BaseException as e:
+        root.error = type(e).__name__
+        raise
+    finally:
+        end_trace(root, token)
+
+
+def clear_trace():
+    """Detach the calling context from any trace (e.g. a freshly forked worker)"""
+    _current_span.set(None)
+
+
+def install_tracing(app: Flask):
+    """
+    Trace every request under a root span named after its route. With
+    the X-Debug-Trace: 1 request header, and when the app runs in debug
+    mode or TRACE_DEBUG_HEADER=1, the span tree comes back as compact
+    JSON in the X-Trace response header.
+    """
+    debug_header = os.environ.get('TRACE_DEBUG_HEADER', '').lower() in ('1', 'true', 'yes')
+
+    def start():
+        req = request._get_current_object()
+        rule = req.url_rule
+        req._trace = start_trace(f"{req.method} {rule.rule if rule is not None else req.path}")
+
+    def finish(response):
+        req = request._get_current_object()
+        started = req.__dict__.pop('_trace', None)
+        if started is None:
+            return response
+        root = end_trace(*started)
+        if (req.headers.get(DEBUG_REQUEST_HEADER) == '1'
+                and (debug_header or current_app.debug)):
+            response.headers[TRACE_RESPONSE_HEADER] = json.dumps(root.to_dict(), separators=(',', ':'))
+        return response
+
+    def teardown(exc):
+        # after_request didn't run: still close the trace
+        started = request._get_current_object().__dict__.pop('_trace', None)
+        if started is not None:
+            started[0].error = type(exc).__name__ if exc else 'NoResponse'
+            end_trace(*started)
+
+    app.before_request(start)
+    app.after_request(finish)
+    app.teardown_request(teardown)
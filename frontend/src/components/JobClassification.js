@@ -13,17 +13,17 @@ const JobClassification = ({ sessionId }) => {
   const fetchJobClassification = async () => {
     setLoading(true);
     try {
-      // First get the session data to get job description
-      const sessionResponse = await fetch(`http://localhost:5000/api/session-history/${sessionId}`);
+      // First get the session details to get job description
+      const sessionResponse = await fetch(`http://localhost:5000/api/session/${sessionId}`);
       const sessionData = await sessionResponse.json();
 
-      if (!sessionData.success || !sessionData.sessions || sessionData.sessions.length === 0) {
+      if (!sessionData.success || !sessionData.session) {
         console.error('No session data found');
         setLoading(false);
         return;
       }
 
-      const session = sessionData.sessions[0];
+      const session = sessionData.session;
 
       // Now classify the job
       const response = await fetch('http://localhost:5000/api/classify-job', {
@@ -33,7 +33,7 @@ const JobClassification = ({ sessionId }) => {
         },
         body: JSON.stringify({
           session_id: sessionId,
-          job_description: session.job_description || '',
+          job_description: session.job_data.description || '',
           job_title: ''
         }),
       });